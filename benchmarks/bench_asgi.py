@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from example.app import app
+
+REQUESTS = {
+    "empty": {},
+    "sort-page": {
+        "sortField": "players__mainTeam",
+        "sortOrder": "desc",
+        "offset": 20,
+        "limit": 50,
+    },
+    "full": {
+        "filter": json.dumps([
+            ["players__mainTeam", "eq", "red"],
+            "and",
+            ["players__mainTeam", "contains_all", ["red", "blue"]],
+        ]),
+        "search": "red",
+        "sortField": "players__mainTeam",
+        "includeFields": ["id", "teams", "teams__name"],
+        "offset": 0,
+        "limit": 10,
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("params", REQUESTS.values(), ids=REQUESTS.keys())
+def test_round_trip(benchmark, client, params):
+    benchmark.group = "asgi"
+    response = benchmark(client.get, "/root", params=params)
+    assert response.status_code == 200
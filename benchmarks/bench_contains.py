@@ -0,0 +1,55 @@
+import json
+import random
+from typing import List
+
+import pytest
+
+from src.fastapi_filter import FilterField, SimpleFiltration
+from src.fastapi_filter.engines.python import PythonEngine
+
+ROWS = 20_000
+ROW_VALUES = 20
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {"tags": FilterField(field_type=List[int])}
+    MAX_FILTER_BYTES = None
+
+
+# Малый домен — идентификаторы тегов, для которых используются битовые
+# карты; большой — произвольные идентификаторы.
+DOMAINS = (1 << 10, 1 << 20)
+
+
+def _get_rows(domain):
+    generator = random.Random(0)
+    return [
+        {"id": index, "tags": generator.sample(range(domain), ROW_VALUES)}
+        for index in range(ROWS)
+    ]
+
+
+@pytest.fixture(scope="module", params=DOMAINS, ids=("small", "large"))
+def rows(request):
+    return request.param, _get_rows(request.param)
+
+
+def _get_filter(operator, size, domain):
+    generator = random.Random(size)
+    values = generator.sample(range(domain), min(size, domain))
+    values += generator.choices(range(domain), k=size - len(values))
+    return Filters(filter_=json.dumps(["tags", operator, values]))
+
+
+@pytest.mark.parametrize("size", (10, 1000, 100_000))
+@pytest.mark.parametrize("operator", ("contains_any", "contains_all"))
+@pytest.mark.parametrize(
+    "options", ({}, {"row_cache_size": ROWS}), ids=("plain", "row-cache"),
+)
+def test_contains(benchmark, rows, operator, size, options):
+    domain, rows = rows
+    benchmark.group = f"{operator}-{size}-{domain}"
+    filtration = _get_filter(operator, size, domain)
+    engine = PythonEngine(**options)
+    list(engine.apply(rows, filtration=filtration))
+    benchmark(lambda: list(engine.apply(rows, filtration=filtration)))
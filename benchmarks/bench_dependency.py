@@ -0,0 +1,45 @@
+from fastapi import Depends, FastAPI
+
+from example.filters import (
+    RootFiltration,
+    RootIncluding,
+    RootPagination,
+    RootSearching,
+    RootSorting,
+)
+
+ROUTES = 200
+
+
+def _build_app():
+    app = FastAPI()
+    for index in range(ROUTES):
+
+        @app.get(f"/route{index}")
+        async def route(
+            sorting=Depends(RootSorting.as_dependency()),
+            searching=Depends(RootSearching.as_dependency()),
+            filters=Depends(RootFiltration.as_dependency()),
+            pagination=Depends(RootPagination.as_dependency()),
+            include=Depends(RootIncluding.as_dependency()),
+        ):
+            return {}
+
+    return app
+
+
+def test_startup(benchmark):
+    benchmark.group = "startup"
+    app = benchmark(_build_app)
+    assert len(app.routes) > ROUTES
+
+
+def test_openapi(benchmark):
+    benchmark.group = "startup"
+
+    def openapi():
+        app = _build_app()
+        return app.openapi()
+
+    schema = benchmark.pedantic(openapi, rounds=5)
+    assert len(schema["paths"]) == ROUTES
@@ -0,0 +1,52 @@
+import pytest
+
+from src.fastapi_filter import (
+    IncludeField,
+    SimpleInclude,
+    SimpleSort,
+    SortField,
+)
+
+FIELDS = 50
+
+
+def _new_sort_class():
+    class Sort(SimpleSort):
+        SORT_FIELDS = {
+            f"field{index}": SortField(alias=f"field{index}")
+            for index in range(FIELDS)
+        }
+
+    return Sort
+
+
+def _new_include_class():
+    class Include(SimpleInclude):
+        INCLUDE_FIELDS = {
+            f"field{index}": IncludeField(alias=f"field{index}")
+            for index in range(FIELDS)
+        }
+
+    return Include
+
+
+@pytest.mark.parametrize(
+    "new_class", (_new_sort_class, _new_include_class),
+    ids=("sort", "include"),
+)
+def test_enum_build(benchmark, new_class):
+    """Первое построение зависимости: создание Enum полей."""
+    benchmark.group = "enum-build"
+    assert benchmark(lambda: new_class().as_dependency())
+
+
+@pytest.mark.parametrize(
+    "new_class", (_new_sort_class, _new_include_class),
+    ids=("sort", "include"),
+)
+def test_enum_cached(benchmark, new_class):
+    """Повторные вызовы `as_dependency` берут Enum из кэша класса."""
+    benchmark.group = "enum-cached"
+    cls = new_class()
+    dependency = cls.as_dependency()
+    assert benchmark(cls.as_dependency) is dependency
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from src.fastapi_filter import FilterField, SimpleFiltration
+from src.fastapi_filter.filters import FilterResponse
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+    }
+
+
+def _get_filter(leaves):
+    filter_ = []
+    for index in range(leaves):
+        filter_.append(["age", "gte", str(index)])
+        filter_.append("and")
+    filter_.pop()
+    return json.dumps(filter_)
+
+
+def _pydantic_get_filter(self, operator, value):
+    """Путь до отказа от pydantic: модель на каждый лист фильтра."""
+    if not isinstance(operator, str) or operator not in self.operators:
+        raise ValueError(operator)
+    return FilterResponse(
+        field_name=self.field_name,
+        operator=operator,
+        value=self.converter(value),
+    ).dict()
+
+
+class PydanticFilters(Filters):
+    def create_filter(self, filter_):
+        field, operator, value = filter_
+        return _pydantic_get_filter(
+            self._compiled_fields[field], operator, value,
+        )
+
+
+@pytest.mark.parametrize("leaves", (1, 10, 100))
+@pytest.mark.parametrize(
+    "filtration",
+    (Filters, PydanticFilters),
+    ids=("dict", "pydantic"),
+)
+def test_filter_leaf(benchmark, filtration, leaves):
+    filter_ = _get_filter(leaves)
+    benchmark.group = f"filter-leaf-{leaves}"
+    result = benchmark(filtration, filter_=filter_)
+    assert result.filters
@@ -0,0 +1,68 @@
+import pytest
+
+from src.fastapi_filter import IncludeField, SimpleInclude
+from src.fastapi_filter.engines.python import PythonEngine
+
+ROWS = 10_000
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+        "players": IncludeField(alias="players"),
+        "players__id": IncludeField(alias="players.id"),
+        "team__name": IncludeField(alias="team.name"),
+    }
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return [
+        {
+            "id": index,
+            "name": f"name-{index}",
+            "description": "x" * 100,
+            "players": [{"id": player, "age": 20} for player in range(5)],
+            "team": {"name": "red", "city": "Paris", "founded": 1900},
+            **{f"extra{field}": field for field in range(20)},
+        }
+        for index in range(ROWS)
+    ]
+
+
+def _post_filter(include):
+    paths = [field.split(".") for field in include.fields]
+
+    def project(document):
+        result = {}
+        for path in paths:
+            source, target = document, result
+            for key in path[:-1]:
+                source = source.get(key)
+                if not isinstance(source, dict):
+                    break
+                target = target.setdefault(key, {})
+            else:
+                if path[-1] in source:
+                    target[path[-1]] = source[path[-1]]
+        return result
+
+    return project
+
+
+def _engine(include):
+    return PythonEngine().compile_projection(include)
+
+
+def _pruner(include):
+    return include.get_projection().prune
+
+
+@pytest.mark.parametrize("compile_", (_post_filter, _engine, _pruner))
+def test_prune(benchmark, documents, compile_):
+    benchmark.group = "include-prune"
+    include = Include(fields=set(Include.INCLUDE_FIELDS) - {"players__id"})
+    prune = compile_(include)
+    result = benchmark(lambda: list(map(prune, documents)))
+    assert result[1]["team"] == {"name": "red"}
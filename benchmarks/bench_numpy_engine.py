@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.fastapi_filter import (
+    FilterField,
+    SimpleFiltration,
+    SimplePagination,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.engines.numpy import NumpyEngine
+
+ROWS = 10_000_000
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "age": FilterField(field_type=int),
+        "score": FilterField(field_type=float),
+        "city": FilterField(
+            field_type=str, operators=["eq", "has", "contains_any"],
+        ),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {
+        "id": SortField(alias="id"),
+        "score": SortField(alias="score"),
+    }
+
+
+@pytest.fixture(scope="module")
+def engine():
+    generator = np.random.default_rng(0)
+    cities = np.array(["Oslo", "Rome", "Kyiv", "Lima", "Baku", "Riga"])
+    return NumpyEngine({
+        "id": np.arange(ROWS),
+        "age": generator.integers(18, 90, ROWS),
+        "score": generator.random(ROWS),
+        "city": cities[generator.integers(0, len(cities), ROWS)],
+    })
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+@pytest.mark.parametrize(
+    "request_filters",
+    (
+        [["age", "gte", 30], "and", ["score", "lt", 0.5]],
+        ["city", "contains_any", ["Oslo", "Rome", "Lima"]],
+        [["city", "has", "i"], "or", ["age", "eq", 40]],
+    ),
+    ids=("range", "contains_any", "has"),
+)
+def test_mask(benchmark, engine, request_filters):
+    benchmark.group = "numpy-mask"
+    filtration = _get_filter(request_filters)
+    mask = benchmark.pedantic(engine.mask, args=(filtration,), rounds=3)
+    assert mask.any()
+
+
+def _full_sort(engine, filtration, sort, pagination):
+    """Полная устойчивая сортировка отобранных строк и срез."""
+    rows = engine.indices(filtration, sort=sort)
+    return rows[pagination.offset:pagination.offset + pagination.limit]
+
+
+def _partition(engine, filtration, sort, pagination):
+    return engine.indices(filtration, sort=sort, pagination=pagination)
+
+
+@pytest.mark.parametrize("indices", (_full_sort, _partition))
+def test_top_page(benchmark, engine, indices):
+    benchmark.group = "numpy-top-10"
+    filtration = _get_filter(["age", "gte", 30])
+    sort = Sort(None, None, sort=["score:desc", "id:asc"])
+    pagination = SimplePagination(offset=0, limit=10)
+    rows = benchmark.pedantic(
+        indices, args=(engine, filtration, sort, pagination), rounds=3,
+    )
+    assert len(rows) == 10
@@ -0,0 +1,111 @@
+import json
+from typing import List
+
+import pytest
+
+from src.fastapi_filter import (
+    FilterField,
+    IncludeField,
+    Order,
+    PerfCounterObserver,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "tags": FilterField(field_type=List[int]),
+    }
+    MAX_FILTER_BYTES = None
+    MAX_DEPTH = None
+    MAX_LEAVES = None
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {
+        "name": SortField(alias="name"),
+        "age": SortField(alias="age"),
+    }
+    TIEBREAKER_FIELD = "id"
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "team.name"]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+        "teams": IncludeField(alias="teams"),
+        "teams__name": IncludeField(alias="teams.name"),
+    }
+
+
+def _get_nested_filter(depth, leaves):
+    """Фильтр из `leaves` условий в группах вложенности `depth`."""
+    filter_ = ["age", "gte", 1]
+    for level in range(depth - 1):
+        filter_ = [filter_, "or" if level % 2 else "and", ["name", "eq", "a"]]
+    group = [filter_]
+    for index in range(leaves - depth):
+        group.extend(("and", ["age", "lt", index]))
+    return json.dumps(group)
+
+
+@pytest.mark.parametrize("depth", (1, 4, 16))
+@pytest.mark.parametrize("leaves", (16, 128))
+def test_parse_filter(benchmark, depth, leaves):
+    benchmark.group = f"parse-filter-{leaves}"
+    filter_ = _get_nested_filter(depth, leaves)
+    result = benchmark(Filters, filter_=filter_)
+    assert result.filters
+
+
+@pytest.mark.parametrize("size", (10, 1000, 10_000))
+def test_parse_contains_any(benchmark, size):
+    benchmark.group = "parse-contains-any"
+    filter_ = json.dumps(["tags", "contains_any", list(range(size))])
+    result = benchmark(Filters, filter_=filter_)
+    assert len(result.filters["value"]) == size
+
+
+@pytest.mark.parametrize(
+    "observer", (None, PerfCounterObserver()), ids=("off", "perf-counter"),
+)
+def test_parse_observed(benchmark, observer):
+    benchmark.group = "parse-observed"
+    filtration = type("ObservedFilters", (Filters,), {"OBSERVER": observer})
+    filter_ = _get_nested_filter(4, 16)
+    assert benchmark(filtration, filter_=filter_).filters
+
+
+def test_sort(benchmark):
+    benchmark.group = "dependencies"
+    result = benchmark(
+        Sort, sort_field="age", sort_order=Order.desc, sort=["name:asc"],
+    )
+    assert len(result.fields) == 3
+
+
+def test_search(benchmark):
+    benchmark.group = "dependencies"
+    assert benchmark(Search, search="red").value == "red"
+
+
+def test_pagination(benchmark):
+    benchmark.group = "dependencies"
+    assert benchmark(SimplePagination, offset=10, limit=20).limit == 20
+
+
+def test_include(benchmark):
+    benchmark.group = "dependencies"
+    fields = set(Include.INCLUDE_FIELDS)
+    assert len(benchmark(Include, fields=fields).fields) == len(fields)
@@ -0,0 +1,79 @@
+import json
+import random
+
+import pytest
+
+from src.fastapi_filter import (
+    FilterField,
+    SimpleFiltration,
+    SimplePagination,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.engines.python import PythonEngine
+
+ROWS = 1_000_000
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "age": FilterField(field_type=int),
+        "name": FilterField(field_type=str),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age"), "id": SortField(alias="id")}
+
+
+@pytest.fixture(scope="module")
+def rows():
+    random.seed(0)
+    return [
+        {"id": index, "age": random.randint(0, 100), "name": f"name{index}"}
+        for index in range(ROWS)
+    ]
+
+
+def _handwritten(rows, filtration, sort, pagination):
+    """Условия, записанные вручную: фильтр, полная сортировка и срез."""
+    result = [
+        row for row in rows if row["age"] >= 50 and "1" in row["name"]
+    ]
+    result.sort(key=lambda row: (row["age"], row["id"]), reverse=True)
+    return result[pagination.offset:pagination.offset + pagination.limit]
+
+
+def _full_sort(rows, filtration, sort, pagination):
+    """Движок без пагинации: полная сортировка и срез списка."""
+    result = list(PythonEngine().apply(rows, filtration=filtration, sort=sort))
+    return result[pagination.offset:pagination.offset + pagination.limit]
+
+
+def _engine(rows, filtration, sort, pagination):
+    return list(PythonEngine().apply(
+        rows, filtration=filtration, sort=sort, pagination=pagination,
+    ))
+
+
+@pytest.mark.parametrize("apply", (_handwritten, _full_sort, _engine))
+def test_top_page(benchmark, rows, apply):
+    benchmark.group = "python-engine-top-10"
+    filtration = Filters(filter_=json.dumps(
+        [["age", "gte", 50], "and", ["name", "has", "1"]],
+    ))
+    sort = Sort(None, None, sort=["age:desc", "id:desc"])
+    pagination = SimplePagination(offset=0, limit=10)
+    page = benchmark.pedantic(
+        apply, args=(rows, filtration, sort, pagination), rounds=3,
+    )
+    assert len(page) == 10
+    assert page[0]["age"] == 100
+
+
+def test_first_page_unsorted(benchmark, rows):
+    benchmark.group = "python-engine-first-page"
+    filtration = Filters(filter_=json.dumps(["age", "eq", 7]))
+    pagination = SimplePagination(offset=0, limit=10)
+    page = benchmark(_engine, rows, filtration, None, pagination)
+    assert [row["age"] for row in page] == [7] * 10
@@ -0,0 +1,73 @@
+from datetime import date
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, parse_obj_as
+
+from src.fastapi_filter import IncludeField, IncludeResponse, SimpleInclude
+
+ROWS = 1000
+
+
+class Player(BaseModel):
+    id: int
+    name: str
+    birthday: date
+
+
+class Team(BaseModel):
+    id: int
+    name: str
+    city: str
+    founded: date
+    description: str
+    players: List[Player]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        name: IncludeField(alias=name) for name in Team.__fields__
+    }
+
+
+@pytest.fixture(scope="module")
+def teams():
+    return [
+        Team(
+            id=index,
+            name=f"team-{index}",
+            city="Paris",
+            founded=date(1900, 1, 1),
+            description="x" * 200,
+            players=[
+                Player(id=player, name="name", birthday=date(2000, 1, 1))
+                for player in range(10)
+            ],
+        )
+        for index in range(ROWS)
+    ]
+
+
+def _full(teams, include):
+    # Как FastAPI с response_model: валидация, полное кодирование,
+    # затем отбрасывание лишних полей.
+    items = jsonable_encoder(parse_obj_as(List[Team], teams))
+    fields = set(include.fields)
+    return JSONResponse([
+        {key: value for key, value in item.items() if key in fields}
+        for item in items
+    ]).body
+
+
+def _sparse(teams, include):
+    return IncludeResponse(teams, include=include).body
+
+
+@pytest.mark.parametrize("render", (_full, _sparse))
+def test_render(benchmark, teams, render):
+    benchmark.group = "include-response"
+    include = Include(fields={"id", "name", "city"})
+    body = benchmark(render, teams, include)
+    assert body.count(b'"city"') == ROWS
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from src.fastapi_filter import SimpleSearch
+from src.fastapi_filter.engines.python import PythonEngine
+from src.fastapi_filter.search_index import SearchIndex
+
+ROWS = 100_000
+
+WORDS = [
+    "".join(random.Random(index).choices("abcdefghijklmnop", k=7))
+    for index in range(5000)
+]
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "city"]
+
+
+@pytest.fixture(scope="module")
+def documents():
+    generator = random.Random(0)
+    return [
+        {
+            "id": index,
+            "name": " ".join(generator.choices(WORDS, k=3)),
+            "city": generator.choice(WORDS),
+        }
+        for index in range(ROWS)
+    ]
+
+
+@pytest.fixture(scope="module")
+def index(documents):
+    return SearchIndex.for_search(
+        Search, ((document["id"], document) for document in documents),
+    )
+
+
+def _scan(documents, index, search):
+    predicate = PythonEngine().compile_search(search)
+    return [document["id"] for document in documents if predicate(document)]
+
+
+def _index(documents, index, search):
+    return index.search(search)
+
+
+@pytest.mark.parametrize("find", (_scan, _index))
+def test_search(benchmark, documents, index, find):
+    benchmark.group = "search-index"
+    search = Search(search=WORDS[42][1:6].upper())
+    ids = benchmark(find, documents, index, search)
+    assert ids
@@ -0,0 +1,132 @@
+"""
+Сравнивает результаты pytest-benchmark с базовыми.
+
+Пример::
+
+    python benchmarks/compare.py save benchmarks/results.json \\
+        benchmarks/baselines/hot_paths.json
+    python benchmarks/compare.py check benchmarks/baselines/hot_paths.json \\
+        benchmarks/results.json --threshold 0.2
+
+`check` возвращает код 1, если хотя бы один тест замедлился больше
+порога.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+STATS = ("min", "mean", "median")
+
+
+def load_stats(path: str, stat: str) -> Dict[str, float]:
+    """
+    Читает результаты pytest-benchmark (`--benchmark-json`).
+
+    :param str path: Путь к файлу результатов.
+    :param str stat: Сравниваемая статистика.
+    :return: Значения статистики в секундах по полному имени теста.
+    """
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    return {
+        benchmark["fullname"]: benchmark["stats"][stat]
+        for benchmark in report["benchmarks"]
+    }
+
+
+def save_baseline(results: str, baseline: str) -> None:
+    """
+    Сохраняет результаты как базовые без сырых замеров.
+
+    :param str results: Путь к файлу результатов pytest-benchmark.
+    :param str baseline: Путь к файлу базовых результатов.
+    """
+    with open(results, encoding="utf-8") as file:
+        report = json.load(file)
+    for benchmark in report["benchmarks"]:
+        benchmark["stats"].pop("data", None)
+    with open(baseline, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def compare(
+    baseline: Dict[str, float],
+    current: Dict[str, float],
+    threshold: float,
+) -> Tuple[List[Tuple[str, float, float, float]], List[str]]:
+    """
+    Сравнивает результаты с базовыми.
+
+    :param baseline: Базовые значения.
+    :param current: Текущие значения.
+    :param float threshold: Допустимое относительное замедление.
+    :return: Строки (тест, базовое, текущее, изменение) для общих
+    тестов и список замедлившихся тестов.
+    """
+    rows = []
+    regressions = []
+    for name in sorted(baseline.keys() & current.keys()):
+        change = current[name] / baseline[name] - 1
+        rows.append((name, baseline[name], current[name], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="сохранить базовые результаты")
+    save.add_argument("current", help="результаты pytest-benchmark (JSON)")
+    save.add_argument("baseline", help="файл базовых результатов")
+
+    check = commands.add_parser("check", help="сравнить с базовыми")
+    check.add_argument("baseline", help="базовые результаты (JSON)")
+    check.add_argument("current", help="текущие результаты (JSON)")
+    check.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="допустимое относительное замедление, по умолчанию 0.2",
+    )
+    check.add_argument(
+        "--stat", choices=STATS, default="min",
+        help="сравниваемая статистика, по умолчанию min",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "save":
+        save_baseline(args.current, args.baseline)
+        return 0
+
+    baseline = load_stats(args.baseline, args.stat)
+    current = load_stats(args.current, args.stat)
+    rows, regressions = compare(baseline, current, args.threshold)
+
+    width = max((len(name) for name, *_ in rows), default=0)
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(
+            f"{name:<{width}}  {before * 1e6:12.2f} us  "
+            f"{after * 1e6:12.2f} us  {change:+8.1%}{flag}",
+        )
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name}: missing in current results")
+    for name in sorted(current.keys() - baseline.keys()):
+        print(f"{name}: no baseline")
+
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) slower than baseline by more "
+            f"than {args.threshold:.0%} ({args.stat}).",
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
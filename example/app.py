@@ -1,5 +1,6 @@
 import uvicorn
 from fastapi import Depends, FastAPI
+from src.fastapi_filter import validate_and_compile
 from .filters import (
     RootSorting,
     RootSearching,
@@ -8,6 +9,8 @@ from .filters import (
     RootIncluding,
 )
 
+validate_and_compile()
+
 app = FastAPI()
 
 
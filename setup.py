@@ -6,9 +6,17 @@ with open('requirements.txt') as f:
 setup(
     name='fastapi-filter',
     version='0.0.1',
-    packages=find_packages(where='src', include=['fastapi_filter']),
+    packages=find_packages(
+        where='src',
+        include=['fastapi_filter', 'fastapi_filter.*'],
+    ),
     package_dir={'': 'src'},
     install_requires=install_requires,
+    extras_require={
+        'sqlalchemy': ['SQLAlchemy>=2.0'],
+        'numpy': ['numpy>=1.22'],
+        'opentelemetry': ['opentelemetry-api>=1.20'],
+    },
     author='Aleksandr Andrukhov',
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
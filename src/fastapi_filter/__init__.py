@@ -1,18 +1,48 @@
-from .sort import SimpleSort, SortField, Order
-from .search import SimpleSearch
-from .filters import SimpleFiltration, FilterField, FilterOperator
-from .pagination import SimplePagination
-from .include import SimpleInclude, IncludeField
+from importlib import import_module
 
-__all__ = [
-    Order,
-    SortField,
-    SimpleSort,
-    FilterField,
-    SimpleSearch,
-    FilterOperator,
-    SimpleFiltration,
-    SimplePagination,
-    SimpleInclude,
-    IncludeField,
-]
+# Подмодули загружаются при первом обращении к атрибуту пакета, поэтому
+# `import fastapi_filter` не импортирует FastAPI и pydantic.
+_EXPORTS = {
+    "Order": ".sort",
+    "SortField": ".sort",
+    "SimpleSort": ".sort",
+    "SimpleSearch": ".search",
+    "FilterField": ".filters",
+    "FilterOperator": ".filters",
+    "SimpleFiltration": ".filters",
+    "SimplePagination": ".pagination",
+    "CursorPagination": ".pagination",
+    "SimpleInclude": ".include",
+    "IncludeField": ".include",
+    "IncludeResponse": ".response",
+    "BatchFiltration": ".batch",
+    "BatchResponse": ".batch",
+    "ExportResponse": ".export",
+    "Page": ".page",
+    "CountCache": ".page",
+    "paginate": ".page",
+    "ResponseCache": ".cache",
+    "CacheStorage": ".cache",
+    "MemoryStorage": ".cache",
+    "RedisStorage": ".cache",
+    "FilterObserver": ".instrumentation",
+    "PerfCounterObserver": ".instrumentation",
+    "FilterProfiler": ".profiler",
+    "ConfigurationError": ".base",
+    "validate_and_compile": ".base",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
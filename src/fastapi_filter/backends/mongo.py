@@ -0,0 +1,298 @@
+import re
+from typing import (
+    Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Union,
+)
+
+from ..filters import FilterField, FilterOperator, SimpleFiltration
+from ..include import Projection, SimpleInclude
+from ..pagination import CursorPagination, Seek, SimplePagination
+from ..search import SimpleSearch
+from ..sort import Order, SimpleSort
+from ..tree import AND, FilterCondition, FilterGroup, FilterNode
+
+_OPERATORS = {
+    FilterOperator.eq: "$eq",
+    FilterOperator.ne: "$ne",
+    FilterOperator.gt: "$gt",
+    FilterOperator.lt: "$lt",
+    FilterOperator.gte: "$gte",
+    FilterOperator.lte: "$lte",
+    FilterOperator.contains_any: "$in",
+    FilterOperator.contains_all: "$all",
+}
+
+
+class MongoQuery(NamedTuple):
+    """
+    Аргументы запроса `collection.find()`.
+
+    :param dict filter: Документ фильтра.
+    :param list sort: Спецификация сортировки `[(путь, 1 | -1), ...]`.
+    :param int skip: Количество пропускаемых документов.
+    :param int limit: Максимальное количество документов (0 — без
+    ограничения).
+    :param dict projection: Проекция или None, если нужны все поля.
+    """
+    filter: Dict[str, Any]
+    sort: Optional[List[tuple]]
+    skip: int
+    limit: int
+    projection: Optional[Dict[str, int]]
+
+    def as_kwargs(self) -> Dict[str, Any]:
+        """
+        Возвращает именованные аргументы для `collection.find()`.
+
+        :return: dict: Аргументы без пустых значений.
+        """
+        kwargs = {"filter": self.filter, "skip": self.skip}
+        if self.limit:
+            kwargs["limit"] = self.limit
+        if self.sort:
+            kwargs["sort"] = self.sort
+        if self.projection:
+            kwargs["projection"] = self.projection
+        return kwargs
+
+
+def _merge_documents(documents: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Объединяет документы, которые должны выполняться одновременно.
+
+    Условия по одному полю собираются в один документ операторов, чтобы
+    диапазоны вида `{"$gt": 1, "$lt": 5}` попадали в один индекс.
+    Конфликтующие условия переносятся в `$and`.
+
+    :param documents: Документы фильтра.
+    :return: Один документ фильтра.
+    """
+    result: Dict[str, Any] = {}
+    conflicts = []
+    for document in documents:
+        for key, value in document.items():
+            current = result.get(key)
+            if key not in result:
+                result[key] = value
+            elif (
+                _is_operator_document(current)
+                and _is_operator_document(value)
+                and not current.keys() & value.keys()
+            ):
+                result[key] = {**current, **value}
+            else:
+                conflicts.append({key: value})
+    if conflicts:
+        result["$and"] = result.get("$and", []) + conflicts
+    return _simplify_document(result)
+
+
+def _is_operator_document(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and bool(value)
+        and all(key.startswith("$") for key in value)
+    )
+
+
+def _simplify(value: Any) -> Any:
+    """Заменяет `{"$eq": значение}` на само значение."""
+    if (
+        _is_operator_document(value)
+        and len(value) == 1
+        and "$eq" in value
+        and not isinstance(value["$eq"], dict)
+    ):
+        return value["$eq"]
+    return value
+
+
+def _simplify_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: _simplify(value) for key, value in document.items()}
+
+
+class MongoCompiler:
+    """
+    Компилирует фильтрацию, сортировку, поиск, пагинацию и включаемые
+    поля в аргументы `find()` MongoDB.
+
+    Имена полей переводятся в точечные пути: `a->b` становится `a.b`.
+    С `CursorPagination` документы упорядочиваются по полям курсора,
+    а фильтр дополняется условием продолжения страницы.
+
+    :param Mapping fields: Явное соответствие имён полей путям документа.
+    :param Iterable prefix_fields: Поля, для которых `has` проверяет
+    начало строки, а не любую подстроку. Как и в остальных бэкендах,
+    `has` не учитывает регистр; индекс по такому полю ускоряет поиск,
+    только если у него регистронезависимая collation.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[Mapping[str, str]] = None,
+        prefix_fields: Iterable[str] = (),
+    ) -> None:
+        """
+        Инициализирует компилятор.
+
+        :param fields: Соответствие имён полей путям документа.
+        :param prefix_fields: Поля с поиском по началу строки.
+        """
+        self.fields = dict(fields or {})
+        self.prefix_fields = frozenset(prefix_fields)
+
+    def get_path(self, field_name: str) -> str:
+        """
+        Получает путь поля в документе.
+
+        :param str field_name: Имя поля или псевдоним.
+        :return: str: Путь через точку.
+        """
+        path = self.fields.get(field_name)
+        if path is None:
+            path = field_name.replace(FilterField.SWAP_NESTING_SIMBOL, ".")
+        return path
+
+    def compile(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+    ) -> MongoQuery:
+        """
+        Собирает аргументы запроса для переданных зависимостей.
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :return: MongoQuery: Аргументы `find()`.
+        """
+        filter_ = self.filter(filtration, search)
+        if isinstance(pagination, CursorPagination):
+            seek = pagination.get_seek(sort)
+            if seek.values is not None:
+                filter_ = _merge_documents([filter_, self.seek(seek)])
+            return MongoQuery(
+                filter=filter_,
+                sort=[
+                    (self.get_path(field), -1 if order == Order.desc else 1)
+                    for field, order in seek.fields
+                ],
+                skip=0,
+                limit=pagination.limit,
+                projection=self.projection(
+                    include, (field for field, _ in seek.fields),
+                ),
+            )
+        return MongoQuery(
+            filter=filter_,
+            sort=self.sort(sort),
+            skip=pagination.offset if pagination is not None else 0,
+            limit=pagination.limit if pagination is not None else 0,
+            projection=self.projection(include),
+        )
+
+    def seek(self, seek: Seek) -> Dict[str, Any]:
+        """
+        Собирает условие продолжения keyset-пагинации.
+
+        :param Seek seek: Поля упорядочивания и значения курсора.
+        :return: dict: Документ `{"$or": [...]}`, эквивалентный
+        `(поле, тайбрейкер) > (значение, ...)`.
+        """
+        paths = [self.get_path(field) for field, _ in seek.fields]
+        alternatives = []
+        for index, (_, order) in enumerate(seek.fields):
+            document = {
+                paths[prev]: seek.values[prev] for prev in range(index)
+            }
+            document[paths[index]] = {
+                "$lt" if order == Order.desc else "$gt": seek.values[index],
+            }
+            alternatives.append(document)
+        return {"$or": alternatives}
+
+    def filter(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        search: Optional[SimpleSearch] = None,
+    ) -> Dict[str, Any]:
+        """
+        Собирает документ фильтра.
+
+        :param filtration: Фильтрация.
+        :param search: Поиск.
+        :return: dict: Документ фильтра.
+        """
+        documents = []
+        tree = filtration.as_tree() if filtration is not None else None
+        if tree is not None:
+            documents.append(self._compile_node(tree))
+        if search is not None and search.value:
+            pattern = re.escape(search.value)
+            documents.append({"$or": [
+                {self.get_path(field): {"$regex": pattern, "$options": "i"}}
+                for field in search.fields
+            ]})
+        return _merge_documents(documents)
+
+    def sort(self, sort: Optional[SimpleSort]) -> Optional[List[tuple]]:
+        """
+        Собирает спецификацию сортировки.
+
+        :param sort: Сортировка.
+        :return: Список `[(путь, направление)]` или None.
+        """
+        if sort is None or not sort.fields:
+            return None
+        return [
+            (self.get_path(field), -1 if order == Order.desc else 1)
+            for field, order in sort.fields
+        ]
+
+    def projection(
+        self,
+        include: Optional[SimpleInclude],
+        fields: Iterable[str] = (),
+    ) -> Optional[Dict[str, int]]:
+        """
+        Собирает проекцию из включаемых полей.
+
+        Вложенные пути, уже покрытые родительским полем, отбрасываются
+        (см. `Projection`): MongoDB не допускает пересекающихся путей
+        в проекции.
+
+        :param include: Включаемые поля.
+        :param fields: Поля, которые нужны всегда, например поля курсора
+        для `CursorPagination.get_next_cursor`.
+        :return: Проекция или None, если нужны все поля.
+        """
+        if include is None or not include.fields:
+            return None
+        return Projection.from_paths(
+            self.get_path(field).split(".")
+            for field in (*include.fields, *fields)
+        ).mongo
+
+    def _compile_node(self, node: FilterNode) -> Dict[str, Any]:
+        if isinstance(node, FilterGroup):
+            documents = [self._compile_node(child) for child in node.children]
+            if node.operator == AND:
+                return _merge_documents(documents)
+            return {"$or": list(map(_simplify_document, documents))}
+        return self._compile_condition(node)
+
+    def _compile_condition(self, condition: FilterCondition) -> Dict[str, Any]:
+        path = self.get_path(condition.field_name)
+        value = condition.value
+        if isinstance(value, tuple):
+            value = list(value)
+        if condition.operator == FilterOperator.has:
+            pattern = re.escape(str(value))
+            if condition.field_name in self.prefix_fields:
+                pattern = "^" + pattern
+            return {path: {"$regex": pattern, "$options": "i"}}
+        return {path: {_OPERATORS[condition.operator]: value}}
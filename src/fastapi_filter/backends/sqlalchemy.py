@@ -0,0 +1,383 @@
+from itertools import count
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from sqlalchemy import (
+    ColumnElement,
+    FromClause,
+    Select,
+    and_,
+    bindparam,
+    exists,
+    func,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.types import ARRAY
+
+from ..cache import LRUCache
+from ..filters import FilterOperator, SimpleFiltration
+from ..include import PATH_SEPARATOR, Projection, SimpleInclude
+from ..pagination import CursorPagination, SimplePagination
+from ..search import SimpleSearch
+from ..sort import Order, SimpleSort
+from ..tree import AND, FilterCondition, FilterGroup, FilterNode
+
+COLUMN_NOT_FOUND_MESSAGE = "Столбец для поля '{field_name}' не найден."
+CONTAINS_ALL_NOT_ARRAY_MESSAGE = (
+    "Оператор contains_all для поля '{field_name}' требует столбец ARRAY."
+)
+
+LIKE_ESCAPE = "/"
+
+
+def _like_pattern(value: Any) -> str:
+    """
+    Создаёт шаблон LIKE для поиска подстроки.
+
+    :param value: Искомая подстрока.
+    :return: Экранированный шаблон вида `%value%`.
+    """
+    value = (
+        str(value)
+        .replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+    return f"%{value}%"
+
+
+class SQLAlchemyCompiler:
+    """
+    Компилирует фильтрацию, сортировку, поиск, пагинацию и включаемые
+    поля в один `Select` SQLAlchemy Core.
+
+    Пагинация может быть как `SimplePagination` (OFFSET/LIMIT), так и
+    `CursorPagination`: тогда запрос упорядочивается по полям курсора и
+    продолжается условием `WHERE (поле, тайбрейкер) > (:seek0, :seek1)`.
+
+    Все значения передаются связанными параметрами. Запрос с
+    параметрами-заглушками кэшируется по форме (структура дерева
+    фильтров, поля и операторы, сортировка, поиск, пагинация и
+    включаемые поля),
+    а для конкретного запроса подставляются только значения. Поэтому
+    запросы одной формы дают один ключ кэша SQLAlchemy, в том числе для
+    списков разной длины в `contains_any`.
+
+    :param FromClause selectable: Таблица или другой источник строк.
+    :param Mapping columns: Соответствие имён полей (псевдонимов из
+    фильтров, сортировки и поиска) столбцам. Если поле не указано,
+    используется столбец `selectable` с тем же именем.
+    :param Select statement: Базовый запрос. По умолчанию
+    `select(selectable)`.
+    :param int cache_size: Количество кэшируемых форм запроса.
+    """
+
+    def __init__(
+        self,
+        selectable: FromClause,
+        columns: Optional[Mapping[str, ColumnElement]] = None,
+        statement: Optional[Select] = None,
+        cache_size: int = 256,
+    ) -> None:
+        """
+        Инициализирует компилятор.
+
+        :param selectable: Таблица или другой источник строк.
+        :param columns: Соответствие имён полей столбцам.
+        :param statement: Базовый запрос.
+        :param cache_size: Количество кэшируемых форм запроса.
+        """
+        self.selectable = selectable
+        self.columns = dict(columns or {})
+        self.statement = (
+            statement if statement is not None else select(selectable)
+        )
+        self.cache = LRUCache(cache_size)
+
+    def get_column(self, field_name: str) -> ColumnElement:
+        """
+        Получает столбец по имени поля.
+
+        :param str field_name: Имя поля или псевдоним.
+        :return: Столбец SQLAlchemy.
+        :raises ValueError: Если столбец не найден.
+        """
+        column = self.columns.get(field_name)
+        if column is None:
+            column = self.selectable.c.get(field_name)
+        if column is None:
+            raise ValueError(
+                COLUMN_NOT_FOUND_MESSAGE.format(field_name=field_name),
+            )
+        return column
+
+    def compile(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+    ) -> Select:
+        """
+        Собирает запрос для переданных зависимостей.
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :return: Select: Запрос со связанными значениями параметров.
+        """
+        statement, params = self.compile_with_params(
+            filtration, sort, pagination, search, include,
+        )
+        return statement.params(params)
+
+    def compile_with_params(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        Собирает запрос с именованными параметрами и их значения.
+
+        Возвращённый запрос общий для всех вызовов одной формы; его можно
+        выполнять как `connection.execute(statement, params)`.
+
+        С `include` запрос выбирает только нужные столбцы (см.
+        `SimpleInclude.get_projection`), названные псевдонимами полей;
+        для `CursorPagination` к ним добавляются поля курсора.
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :return: Запрос и словарь значений параметров.
+        """
+        tree = filtration.as_tree() if filtration is not None else None
+        values: List[Any] = []
+        params = {}
+        sort_shape = self._get_sort_shape(sort)
+        pagination_shape = None
+        if isinstance(pagination, CursorPagination):
+            seek = pagination.get_seek(sort)
+            sort_shape = seek.fields
+            pagination_shape = "limit"
+            if seek.values is not None:
+                pagination_shape = "seek"
+                params.update(
+                    (f"seek{index}", value)
+                    for index, value in enumerate(seek.values)
+                )
+            params["limit"] = pagination.limit
+        elif pagination is not None:
+            pagination_shape = "offset"
+            params["offset"] = pagination.offset
+            params["limit"] = pagination.limit
+
+        shape = (
+            self._get_shape(tree, values),
+            sort_shape,
+            tuple(search.fields) if search is not None and search.value
+            else (),
+            pagination_shape,
+            self._get_include_shape(include),
+        )
+        params.update(
+            (f"p{index}", value) for index, value in enumerate(values)
+        )
+        if shape[2]:
+            params["search"] = _like_pattern(search.value)
+
+        statement = self.cache.get(shape)
+        if statement is None:
+            statement = self._build_statement(tree, shape)
+            self.cache.set(shape, statement)
+        return statement, params
+
+    def _build_statement(self, tree, shape) -> Select:
+        statement = self.statement
+        if tree is not None:
+            statement = statement.where(self._build_clause(tree, count()))
+        if shape[2]:
+            statement = statement.where(or_(*(
+                self.get_column(field).ilike(
+                    bindparam("search"), escape=LIKE_ESCAPE,
+                )
+                for field in shape[2]
+            )))
+        if shape[3] == "seek":
+            statement = statement.where(self._build_seek(shape[1]))
+        for field, order in shape[1]:
+            column = self.get_column(field)
+            statement = statement.order_by(
+                column.desc() if order == Order.desc else column.asc(),
+            )
+        if shape[3] == "offset":
+            statement = statement.offset(bindparam("offset"))
+        if shape[3]:
+            statement = statement.limit(bindparam("limit"))
+        if shape[4]:
+            fields = list(shape[4])
+            if shape[3] in ("limit", "seek"):
+                fields.extend(
+                    field for field, _ in shape[1] if field not in fields
+                )
+            statement = statement.with_only_columns(
+                *(self.get_column(field).label(field) for field in fields),
+                maintain_column_froms=True,
+            )
+        return statement
+
+    def _build_seek(self, fields) -> ColumnElement:
+        """
+        Строит условие продолжения keyset-пагинации.
+
+        При одинаковом направлении всех полей используется сравнение
+        кортежей, которое база данных может выполнить по составному
+        индексу; иначе — эквивалентная цепочка OR.
+        """
+        columns = [self.get_column(field) for field, _ in fields]
+        params = [
+            bindparam(f"seek{index}", type_=column.type)
+            for index, column in enumerate(columns)
+        ]
+        orders = [order for _, order in fields]
+        if len(set(orders)) == 1:
+            left, right = tuple_(*columns), tuple_(*params)
+            return left < right if orders[0] == Order.desc else left > right
+        return or_(*(
+            and_(
+                *(columns[prev] == params[prev] for prev in range(index)),
+                (
+                    columns[index] < params[index]
+                    if orders[index] == Order.desc
+                    else columns[index] > params[index]
+                ),
+            )
+            for index in range(len(columns))
+        ))
+
+    def _get_include_shape(self, include: Optional[SimpleInclude]) -> Tuple:
+        """
+        Получает имена выбираемых столбцов.
+
+        Поля, для которых задан столбец в `columns`, выбираются как есть;
+        для остальных берётся поле верхнего уровня пути.
+        """
+        projection = include.get_projection() if include is not None else None
+        if projection is None:
+            return ()
+        mapped = tuple(
+            field for field in sorted(include.fields) if field in self.columns
+        )
+        if mapped:
+            projection = Projection.from_paths(
+                PATH_SEPARATOR.split(field)
+                for field in include.fields if field not in self.columns
+            )
+        return mapped + projection.columns
+
+    @staticmethod
+    def _get_sort_shape(sort: Optional[SimpleSort]) -> Tuple:
+        if sort is None:
+            return ()
+        return tuple(sort.fields)
+
+    def _get_shape(self, node: Optional[FilterNode], values: List[Any]):
+        """
+        Получает форму дерева фильтров и собирает значения параметров
+        в порядке обхода.
+        """
+        if node is None:
+            return ()
+        if isinstance(node, FilterGroup):
+            return (node.operator, tuple(
+                self._get_shape(child, values) for child in node.children
+            ))
+        value = node.value
+        is_array = isinstance(
+            getattr(self.get_column(node.field_name), "type", None), ARRAY,
+        )
+        variant = None
+        if node.operator == FilterOperator.has:
+            value = _like_pattern(value)
+        elif isinstance(value, tuple):
+            value = list(value)
+            if node.operator == FilterOperator.contains_all and not is_array:
+                variant = len(set(value)) == 1
+                value = value[0] if variant else None
+        values.append(value)
+        return (node.field_name, node.operator, is_array, variant)
+
+    def _build_clause(self, node: FilterNode, names) -> ColumnElement:
+        """
+        Строит условие WHERE с именованными параметрами `p0`, `p1`, ...
+        """
+        if isinstance(node, FilterGroup):
+            clauses = [
+                self._build_clause(child, names) for child in node.children
+            ]
+            return and_(*clauses) if node.operator == AND else or_(*clauses)
+        return self._build_condition(node, f"p{next(names)}")
+
+    def _build_condition(
+        self,
+        condition: FilterCondition,
+        name: str,
+    ) -> ColumnElement:
+        column = self.get_column(condition.field_name)
+        operator = condition.operator
+        is_array = isinstance(column.type, ARRAY)
+        is_list = isinstance(condition.value, tuple)
+
+        if operator == FilterOperator.has:
+            if is_array:
+                elements = func.unnest(column).table_valued(
+                    "element",
+                ).render_derived()
+                return exists().select_from(elements).where(
+                    elements.c.element.ilike(
+                        bindparam(name), escape=LIKE_ESCAPE,
+                    ),
+                )
+            return column.ilike(bindparam(name), escape=LIKE_ESCAPE)
+        if operator == FilterOperator.contains_any:
+            if is_array:
+                return column.overlap(bindparam(name, type_=column.type))
+            return column.in_(bindparam(name, expanding=True))
+        if operator == FilterOperator.contains_all:
+            if not is_array:
+                raise ValueError(CONTAINS_ALL_NOT_ARRAY_MESSAGE.format(
+                    field_name=condition.field_name,
+                ))
+            return column.contains(bindparam(name, type_=column.type))
+
+        if is_array and not is_list:
+            element = (
+                bindparam(name, type_=column.type.item_type)
+                == column.any_()
+            )
+            if operator == FilterOperator.eq:
+                return element
+            if operator == FilterOperator.ne:
+                return ~element
+
+        parameter = bindparam(name, type_=column.type)
+        if operator == FilterOperator.eq:
+            return column == parameter
+        if operator == FilterOperator.ne:
+            return column != parameter
+        if operator == FilterOperator.gt:
+            return column > parameter
+        if operator == FilterOperator.lt:
+            return column < parameter
+        if operator == FilterOperator.gte:
+            return column >= parameter
+        return column <= parameter
@@ -1,8 +1,65 @@
+from functools import wraps
+from itertools import count
+from typing import Any, Iterator, List, Type
+from weakref import WeakValueDictionary
+
+_PACKAGE = __name__.rpartition(".")[0]
+
+_SCHEMA_NAMES: "WeakValueDictionary[str, type]" = WeakValueDictionary()
+
+
+def get_schema_name(cls, suffix: str) -> str:
+    """
+    Получает уникальное имя схемы OpenAPI для типа, созданного классом.
+
+    Имя строится как `<ИмяКласса><suffix>`; если оно уже занято другим
+    классом, добавляется порядковый номер.
+
+    :param cls: Класс-владелец схемы.
+    :param str suffix: Суффикс имени.
+    :return: str: Имя схемы.
+    """
+    base_name = f"{cls.__name__}{suffix}"
+    for index in count(1):
+        name = base_name if index == 1 else f"{base_name}{index}"
+        owner = _SCHEMA_NAMES.setdefault(name, cls)
+        if owner is cls:
+            return name
+
+
+def cached_per_class(method):
+    """
+    Превращает метод в метод класса, результат которого вычисляется
+    один раз для каждого класса.
+
+    Результат хранится в атрибуте самого класса, поэтому подклассы
+    не наследуют его, а получают собственный.
+    """
+    attribute = f"_cached_{method.__name__}"
+
+    @wraps(method)
+    def wrapper(cls):
+        if attribute not in cls.__dict__:
+            setattr(cls, attribute, method(cls))
+        return cls.__dict__[attribute]
+
+    return classmethod(wrapper)
+
+
 class Base:
     """
     Базовый класс для всех классов, которые могут
     быть использованы как зависимости.
+
+    Подклассы объявляют `as_dependency` через `cached_per_class`, чтобы
+    FastAPI получал одну и ту же функцию-зависимость на всех маршрутах.
+
+    Промежуточный базовый класс, который сам не используется как
+    зависимость, объявляет `ABSTRACT = True`: `validate_and_compile` его
+    пропускает. Атрибут не наследуется — подклассы такого класса
+    проверяются как обычно.
     """
+    ABSTRACT: bool = False
 
     @classmethod
     def as_dependency(cls):
@@ -10,3 +67,102 @@ class Base:
         raise NotImplementedError(
             "Метод as_dependency должен быть реализован в подклассе",
         )
+
+    @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет атрибуты конфигурации класса.
+
+        :return: Список описаний найденных ошибок.
+        """
+        return []
+
+    @classmethod
+    def is_abstract(cls) -> bool:
+        """
+        Проверяет, объявлен ли класс абстрактным.
+
+        :return: True, если `ABSTRACT = True` задан в самом классе.
+        """
+        return bool(cls.__dict__.get("ABSTRACT", False))
+
+    @classmethod
+    def precompile(cls) -> None:
+        """
+        Заранее строит всё, что класс иначе строит при первом запросе:
+        функцию-зависимость и созданные для неё типы.
+        """
+        cls.as_dependency()
+
+    def get_cache_key(self) -> Any:
+        """
+        Возвращает каноническое состояние параметров для ключей кэша.
+
+        Равнозначные запросы должны давать результаты с одинаковым
+        `repr`, чтобы ключ совпадал и между процессами.
+
+        :return: Состояние параметров.
+        """
+        raise NotImplementedError(
+            "Метод get_cache_key должен быть реализован в подклассе",
+        )
+
+
+class ConfigurationError(Exception):
+    """
+    Ошибка в атрибутах конфигурации классов-зависимостей.
+
+    :param List[str] errors: Описания всех найденных ошибок.
+    """
+
+    def __init__(self, errors: List[str]) -> None:
+        """
+        Инициализирует исключение.
+
+        :param errors: Описания всех найденных ошибок.
+        """
+        super().__init__("\n".join(errors))
+        self.errors = list(errors)
+
+
+def _iter_subclasses(cls: type) -> Iterator[type]:
+    """Обходит все подклассы, объявленные вне пакета."""
+    seen = set()
+    stack = list(cls.__subclasses__())
+    while stack:
+        subclass = stack.pop()
+        if subclass in seen:
+            continue
+        seen.add(subclass)
+        stack.extend(subclass.__subclasses__())
+        module = subclass.__module__
+        if module != _PACKAGE and not module.startswith(_PACKAGE + "."):
+            yield subclass
+
+
+def validate_and_compile(*classes: Type[Base]) -> None:
+    """
+    Проверяет конфигурацию классов-зависимостей и заранее строит их
+    зависимости.
+
+    Вызывается один раз при запуске приложения, чтобы ошибки
+    конфигурации обнаруживались сразу, а не на первом запросе.
+
+    :param classes: Проверяемые классы. Если не переданы, проверяются
+    все подклассы `Base`, объявленные вне пакета. Абстрактные классы
+    (см. `Base.is_abstract`) пропускаются.
+    :raises ConfigurationError: Со всеми найденными ошибками.
+    """
+    classes = tuple(
+        cls for cls in classes or _iter_subclasses(Base)
+        if not cls.is_abstract()
+    )
+    errors = [
+        f"{cls.__module__}.{cls.__qualname__}: {error}"
+        for cls in classes
+        for error in cls.get_config_errors()
+    ]
+    if errors:
+        raise ConfigurationError(errors)
+    for cls in classes:
+        cls.precompile()
@@ -0,0 +1,327 @@
+import asyncio
+import logging
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping,
+    NamedTuple, Optional, Tuple, Type,
+)
+
+from fastapi import Body, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import Extra, Field, create_model
+
+from . import jsonlib
+from .base import Base, cached_per_class, get_schema_name
+from .cache import get_cache_key
+from .filters import SimpleFiltration
+from .include import SimpleInclude
+from .pagination import SimplePagination
+from .response import serialize_include
+from .search import SimpleSearch
+from .sort import SimpleSort
+
+logger = logging.getLogger(__name__)
+
+TOO_MANY_SPECS_MESSAGE = "Пакет может содержать не более {max_specs} запросов."
+DUPLICATE_NAMES_MESSAGE = "Имена запросов {names} повторяются."
+INTERNAL_ERROR_MESSAGE = "Внутренняя ошибка."
+CONFIG_WRONG_DEPENDENCY_MESSAGE \
+    = "{attribute} должен быть подклассом {base}."
+CONFIG_WRONG_MAX_SPECS_MESSAGE \
+    = "MAX_SPECS должен быть положительным целым числом."
+
+_MISSING = object()
+
+
+class BatchQuery(NamedTuple):
+    """
+    Разобранный запрос из пакета.
+
+    :param str name: Имя запроса в пакете.
+    :param SimpleFiltration filtration: Фильтрация.
+    :param SimpleSort sort: Сортировка или None.
+    :param SimplePagination pagination: Пагинация.
+    :param SimpleSearch search: Поиск или None.
+    :param SimpleInclude include: Включаемые поля или None.
+    """
+    name: str
+    filtration: SimpleFiltration
+    sort: Optional[SimpleSort]
+    pagination: SimplePagination
+    search: Optional[SimpleSearch]
+    include: Optional[SimpleInclude]
+
+    def as_kwargs(self) -> Dict[str, Any]:
+        """
+        Возвращает параметры запроса как именованные аргументы.
+
+        :return: dict: `filtration`, `sort`, `pagination`, `search`
+        и `include`.
+        """
+        kwargs = self._asdict()
+        del kwargs["name"]
+        return kwargs
+
+
+class BatchFiltration(Base):
+    """
+    Пакет именованных запросов к одной коллекции в теле POST.
+
+    Тело — массив объектов `{"name", "filter", "sort", "search",
+    "offset", "limit", "include"}`; поля `sort`, `search` и `include`
+    доступны, только если заданы классы `SORT`, `SEARCH` и `INCLUDE`.
+    Каждый запрос разбирается классами из атрибутов, поэтому
+    скомпилированные поля фильтрации общие для всех запросов, а
+    одинаковые строки фильтров и другие параметры разбираются один раз.
+    Ошибки всех запросов возвращаются вместе одним ответом 422.
+
+    Выполнить пакет можно через `iter_batch` или `BatchResponse`.
+
+    :param List[BatchQuery] queries: Разобранные запросы.
+    """
+    FILTRATION: Type[SimpleFiltration] = SimpleFiltration
+    SORT: Optional[Type[SimpleSort]] = None
+    SEARCH: Optional[Type[SimpleSearch]] = None
+    PAGINATION: Type[SimplePagination] = SimplePagination
+    INCLUDE: Optional[Type[SimpleInclude]] = None
+    MAX_SPECS = 50
+
+    @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет классы запросов и MAX_SPECS.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors()
+        for attribute, base, required in (
+            ("FILTRATION", SimpleFiltration, True),
+            ("SORT", SimpleSort, False),
+            ("SEARCH", SimpleSearch, False),
+            ("PAGINATION", SimplePagination, True),
+            ("INCLUDE", SimpleInclude, False),
+        ):
+            value = getattr(cls, attribute)
+            if value is None and not required:
+                continue
+            if not (isinstance(value, type) and issubclass(value, base)):
+                errors.append(CONFIG_WRONG_DEPENDENCY_MESSAGE.format(
+                    attribute=attribute, base=base.__name__,
+                ))
+        if not isinstance(cls.MAX_SPECS, int) or cls.MAX_SPECS < 1:
+            errors.append(CONFIG_WRONG_MAX_SPECS_MESSAGE)
+        return errors
+
+    @cached_per_class
+    def _get_spec_model(cls):
+        """Динамически создаёт модель запроса в теле пакета"""
+        fields = {
+            "name": (str, ...),
+            "filter": (Optional[str], None),
+            "offset": (int, Field(cls.PAGINATION.OFFSET, ge=0)),
+            "limit": (
+                int, Field(cls.PAGINATION.LIMIT_DEFAULT, ge=0,
+                           le=cls.PAGINATION.LIMIT_MAX),
+            ),
+        }
+        if cls.SORT is not None:
+            fields["sort"] = (Optional[List[str]], None)
+        if cls.SEARCH is not None:
+            fields["search"] = (Optional[str], None)
+        if cls.INCLUDE is not None:
+            fields["include"] = (Optional[List[str]], None)
+
+        class Config:
+            extra = Extra.forbid
+
+        return create_model(
+            get_schema_name(cls, "Spec"),
+            __config__=Config,
+            __module__=cls.__module__,
+            **fields,
+        )
+
+    @cached_per_class
+    def as_dependency(cls):
+        """Фабрика для создания зависимости"""
+        SpecModel = cls._get_spec_model()
+
+        async def wrapper(
+            specs: List[SpecModel] = Body(      # type: ignore
+                ...,
+                max_items=cls.MAX_SPECS,
+                description=(
+                    "Именованные запросы, "
+                    f"не более {cls.MAX_SPECS}."
+                ),
+            ),
+        ) -> "BatchFiltration":
+            return cls(specs=[spec.dict() for spec in specs])
+
+        return wrapper
+
+    def __init__(self, specs: List[Mapping[str, Any]]) -> None:
+        """
+        Разбирает запросы пакета.
+
+        В зависимости (`as_dependency`) количество запросов ограничивает
+        схема тела, проверка `MAX_SPECS` здесь — для прямого создания.
+
+        :param specs: Описания запросов.
+        :raises HTTPException: Если запросов слишком много, имена
+        повторяются или хотя бы один запрос некорректен; `detail`
+        содержит ошибки всех запросов.
+        """
+        if len(specs) > self.MAX_SPECS:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                TOO_MANY_SPECS_MESSAGE.format(max_specs=self.MAX_SPECS),
+            )
+        names = [spec["name"] for spec in specs]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                DUPLICATE_NAMES_MESSAGE.format(names=duplicates),
+            )
+
+        parsed: Dict[Tuple, Any] = {}
+        queries = []
+        errors = []
+        for spec in specs:
+            try:
+                queries.append(self._build_query(spec, parsed))
+            except HTTPException as error:
+                errors.append({"name": spec["name"], "detail": error.detail})
+        if errors:
+            raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, errors)
+        self.queries = queries
+
+    def _build_query(
+        self,
+        spec: Mapping[str, Any],
+        parsed: Dict[Tuple, Any],
+    ) -> BatchQuery:
+        """
+        Разбирает один запрос; одинаковые параметры берутся из `parsed`.
+
+        :raises HTTPException: Если параметры некорректны.
+        """
+        def get(kind, key, create):
+            value = parsed.get((kind, key), _MISSING)
+            if value is _MISSING:
+                value = parsed[kind, key] = create()
+            return value
+
+        filter_ = spec.get("filter")
+        sort = spec.get("sort")
+        search = spec.get("search")
+        include = spec.get("include")
+        offset, limit = spec["offset"], spec["limit"]
+        return BatchQuery(
+            name=spec["name"],
+            filtration=get(
+                "filter", filter_, lambda: self.FILTRATION(filter_=filter_),
+            ),
+            sort=get(
+                "sort", tuple(sort),
+                lambda: self.SORT(sort_field=None, sort_order=None, sort=sort),
+            ) if sort else None,
+            pagination=get(
+                "pagination", (offset, limit),
+                lambda: self.PAGINATION(offset=offset, limit=limit),
+            ),
+            search=get(
+                "search", search, lambda: self.SEARCH(search=search),
+            ) if search else None,
+            include=get(
+                "include", frozenset(include),
+                lambda: self.INCLUDE(fields=set(include)),
+            ) if include else None,
+        )
+
+
+async def iter_batch(
+    batch: BatchFiltration,
+    fetch: Callable[..., Awaitable[Any]],
+    concurrency: int = 8,
+) -> AsyncIterator[bytes]:
+    """
+    Выполняет запросы пакета параллельно и отдаёт результаты в формате
+    NDJSON по мере готовности.
+
+    Одинаковые запросы (с одним ключом `cache.get_cache_key`)
+    выполняются один раз. Каждая строка — `{"name", "items"}`, где
+    `items` сериализованы с учётом включаемых полей запроса (см.
+    `response.serialize_include`), или `{"name", "error"}`, если запрос
+    завершился исключением.
+
+    :param batch: Пакет запросов.
+    :param fetch: Асинхронная функция получения результата; вызывается
+    с именованными аргументами `filtration`, `sort`, `pagination`,
+    `search` и `include`.
+    :param int concurrency: Наибольшее количество одновременных вызовов
+    `fetch`.
+    :return: Асинхронный итератор строк NDJSON.
+    """
+    groups: Dict[str, List[BatchQuery]] = {}
+    for query in batch.queries:
+        key = get_cache_key(**query.as_kwargs())
+        groups.setdefault(key, []).append(query)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(queries: List[BatchQuery]):
+        async with semaphore:
+            try:
+                return queries, await fetch(**queries[0].as_kwargs()), None
+            except HTTPException as error:
+                return queries, None, error.detail
+            except Exception:
+                logger.exception("Batch query %r failed.", queries[0].name)
+                return queries, None, INTERNAL_ERROR_MESSAGE
+
+    tasks = list(map(asyncio.ensure_future, map(run, groups.values())))
+    try:
+        for future in asyncio.as_completed(tasks):
+            queries, items, error = await future
+            for query in queries:
+                if error is not None:
+                    line = {"name": query.name, "error": error}
+                else:
+                    line = {
+                        "name": query.name,
+                        "items": serialize_include(items, query.include),
+                    }
+                yield jsonlib.dumps(line) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class BatchResponse(StreamingResponse):
+    """
+    Потоковый ответ NDJSON с результатами пакета (см. `iter_batch`).
+
+    :param BatchFiltration batch: Пакет запросов.
+    :param Callable fetch: Асинхронная функция получения результата.
+    :param int concurrency: Наибольшее количество одновременных вызовов
+    `fetch`.
+    """
+    media_type = "application/x-ndjson"
+
+    def __init__(
+        self,
+        batch: BatchFiltration,
+        fetch: Callable[..., Awaitable[Any]],
+        concurrency: int = 8,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Инициализирует ответ.
+
+        :param batch: Пакет запросов.
+        :param fetch: Асинхронная функция получения результата.
+        :param concurrency: Наибольшее количество одновременных вызовов.
+        :param kwargs: Аргументы `StreamingResponse`.
+        """
+        super().__init__(iter_batch(batch, fetch, concurrency), **kwargs)
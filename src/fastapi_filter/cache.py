@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from . import jsonlib
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class LRUCache:
+    """
+    Ограниченный кэш с вытеснением давно неиспользуемых записей (LRU).
+
+    Потокобезопасен: синхронные зависимости FastAPI выполняются
+    в пуле потоков.
+
+    :param int maxsize: Максимальное количество записей в кэше.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Инициализирует пустой кэш.
+
+        :param int maxsize: Максимальное количество записей в кэше.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу и отмечает запись как недавно
+        использованную.
+
+        :param key: Ключ записи.
+        :param default: Значение, возвращаемое при промахе.
+        :return: Значение из кэша или `default`.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        :param key: Ключ записи.
+        :param value: Значение для сохранения.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удаляет все записи и сбрасывает счётчики."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Возвращает статистику кэша.
+
+        :return: CacheInfo: Попадания, промахи, размер и заполненность.
+        """
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._data),
+            )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStorage:
+    """
+    Хранилище для `ResponseCache`.
+
+    Ключи — строки, значение None означает отсутствие записи, поэтому
+    результат None не кэшируется. Реализации должны сами удалять
+    записи по истечении `ttl`.
+    """
+
+    async def get(self, key: str) -> Any:
+        """
+        Получает значение по ключу.
+
+        :param str key: Ключ записи.
+        :return: Значение или None, если записи нет или она устарела.
+        """
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Сохраняет значение.
+
+        :param str key: Ключ записи.
+        :param value: Значение.
+        :param float ttl: Время жизни записи в секундах.
+        """
+        raise NotImplementedError
+
+
+class MemoryStorage(CacheStorage):
+    """
+    Хранилище в памяти процесса с вытеснением по LRU.
+
+    Значения хранятся без копирования: изменять полученные из кэша
+    объекты нельзя.
+
+    :param int maxsize: Максимальное количество записей.
+    :param Callable timer: Источник времени, по умолчанию
+    `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Инициализирует пустое хранилище.
+
+        :param maxsize: Максимальное количество записей.
+        :param timer: Источник времени.
+        """
+        self.timer = timer
+        self._cache = LRUCache(maxsize)
+
+    async def get(self, key: str) -> Any:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= self.timer():
+            return None
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, (self.timer() + ttl, value))
+
+    def info(self) -> CacheInfo:
+        """
+        Возвращает статистику хранилища.
+
+        :return: CacheInfo: Попадания, промахи, размер и заполненность.
+        """
+        return self._cache.info()
+
+
+class RedisStorage(CacheStorage):
+    """
+    Хранилище в Redis, общее для всех процессов приложения.
+
+    Подходит асинхронный клиент с методами `get(name)` и
+    `set(name, value, px=...)`, например `redis.asyncio.Redis`.
+    Значения сериализуются в JSON, поэтому должны состоять из
+    JSON-совместимых типов (см. `fastapi.encoders.jsonable_encoder`).
+
+    :param client: Асинхронный клиент Redis.
+    :param str prefix: Префикс ключей.
+    """
+
+    def __init__(self, client: Any, prefix: str = "fastapi_filter:") -> None:
+        """
+        Инициализирует хранилище.
+
+        :param client: Асинхронный клиент Redis.
+        :param prefix: Префикс ключей.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        value = await self.client.get(self.prefix + key)
+        return None if value is None else jsonlib.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(
+            self.prefix + key,
+            jsonlib.dumps(value),
+            px=max(int(ttl * 1000), 1),
+        )
+
+
+def get_cache_key(**params: Any) -> str:
+    """
+    Строит ключ кэша по параметрам запроса.
+
+    Ключ — хеш SHA-256 от имён классов и канонического состояния
+    параметров (см. `Base.get_cache_key`), поэтому он не зависит
+    от порядка условий фильтра и одинаков во всех процессах.
+
+    :param params: Параметры запроса (фильтрация, сортировка, поиск,
+    пагинация, включаемые поля); None пропускаются.
+    :return: str: Шестнадцатеричный ключ.
+    """
+    state = tuple(
+        (
+            name,
+            f"{type(param).__module__}.{type(param).__qualname__}",
+            param.get_cache_key(),
+        )
+        for name, param in sorted(params.items())
+        if param is not None
+    )
+    return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """Запрос, получавший данные для ожидающих, был отменён."""
+
+
+class ResponseCache:
+    """
+    Кэш результатов запросов с ограниченным временем жизни.
+
+    Одновременные промахи по одному ключу объединяются: данные
+    получает первый запрос, остальные ждут его результат. Если первый
+    запрос отменён, ожидающие не отменяются: один из них получает данные
+    сам. Объединение действует в пределах процесса.
+
+    :param CacheStorage storage: Хранилище, по умолчанию
+    `MemoryStorage`.
+    :param float ttl: Время жизни записи в секундах.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[CacheStorage] = None,
+        ttl: float = 30.0,
+    ) -> None:
+        """
+        Инициализирует кэш.
+
+        :param storage: Хранилище.
+        :param ttl: Время жизни записи в секундах.
+        """
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.ttl = ttl
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def get_or_fetch(
+        self,
+        fetch: Callable[..., Awaitable[Any]],
+        **params: Any,
+    ) -> Any:
+        """
+        Получает результат из кэша или вызывает `fetch`.
+
+        :param fetch: Асинхронная функция получения результата; она
+        вызывается с теми же именованными аргументами `params`.
+        :param params: Параметры запроса, например `filtration`,
+        `sort`, `pagination`, `search` и `include`.
+        :return: Результат запроса.
+        """
+        key = get_cache_key(**params)
+        while True:
+            pending = self._pending.get(key)
+            if pending is None:
+                value = await self.storage.get(key)
+                if value is not None:
+                    return value
+                pending = self._pending.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # Первый запрос отменён (например, клиент отключился):
+                # повторяем, став первым или дождавшись нового.
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await fetch(**params)
+            if value is not None:
+                await self.storage.set(key, value, self.ttl)
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Ожидающих запросов может не быть.
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._pending[key]
+        return value
@@ -0,0 +1,399 @@
+import operator
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..filters import FilterOperator, SimpleFiltration
+from ..include import SimpleInclude
+from ..pagination import CursorPagination, SimplePagination
+from ..search import SimpleSearch
+from ..sort import Order, SimpleSort
+from ..tree import AND, FilterCondition, FilterGroup, FilterNode
+from .python import compile_condition
+
+COLUMN_NOT_FOUND_MESSAGE = "Столбец для поля '{field_name}' не найден."
+
+_COMPARISONS = {
+    FilterOperator.eq: operator.eq,
+    FilterOperator.gt: operator.gt,
+    FilterOperator.lt: operator.lt,
+    FilterOperator.gte: operator.ge,
+    FilterOperator.lte: operator.le,
+}
+
+_STRING_KINDS = "US"
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _coerce(column: np.ndarray, value: Any) -> Any:
+    """Приводит значение условия к типу столбца дат и интервалов."""
+    if column.dtype.kind in "mM" and not isinstance(value, np.generic):
+        return column.dtype.type(value)
+    return value
+
+
+def _compare(compare, column: np.ndarray, value: Any) -> np.ndarray:
+    """
+    Сравнивает столбец со значением.
+
+    :return: Булева маска; несравнимые типы не совпадают ни в одной строке.
+    """
+    try:
+        result = np.asarray(compare(column, value))
+    except (TypeError, ValueError):
+        return np.zeros(len(column), dtype=bool)
+    if result.shape != column.shape:
+        return np.zeros(len(column), dtype=bool)
+    return result
+
+
+def _matches_text(value: Any, needle: str) -> bool:
+    """
+    Проверяет вхождение подстроки без учёта регистра, как
+    `PythonEngine.compile_search`: список подходит, если подходит
+    хотя бы один элемент.
+    """
+    if type(value) is list:
+        return any(_matches_text(element, needle) for element in value)
+    return isinstance(value, str) and needle in value.casefold()
+
+
+def _casefold(column: np.ndarray) -> np.ndarray:
+    """Приводит строковый столбец к виду для сравнения без учёта регистра."""
+    if column.dtype.kind == "U":
+        return np.array(
+            [value.casefold() for value in column.tolist()], dtype=str,
+        )
+    return np.char.lower(column)
+
+
+def _ranks(column: np.ndarray) -> np.ndarray:
+    """
+    Заменяет значения столбца с dtype object их рангами.
+
+    None получает наименьший ранг, как в `PythonEngine`: такие значения
+    идут первыми по возрастанию и последними по убыванию.
+    """
+    present = np.fromiter(
+        (value is not None for value in column),
+        dtype=bool,
+        count=len(column),
+    )
+    ranks = np.zeros(len(column), dtype=np.int64)
+    if present.any():
+        ranks[present] = np.unique(
+            column[present], return_inverse=True,
+        )[1].reshape(-1) + 1
+    return ranks
+
+
+def _descending(column: np.ndarray) -> np.ndarray:
+    """
+    Преобразует столбец так, что сортировка по возрастанию результата
+    упорядочивает исходные значения по убыванию.
+    """
+    kind = column.dtype.kind
+    if kind in "biu":
+        return ~column
+    if kind == "f":
+        return -column
+    if kind in "mM":
+        return ~column.view(np.int64)
+    return -np.unique(column, return_inverse=True)[1]
+
+
+class NumpyEngine:
+    """
+    Применяет фильтрацию, поиск, сортировку, пагинацию и включаемые поля
+    к колоночным данным: словарю одинаковых по длине массивов NumPy
+    (например, `{name: df[name].to_numpy() for name in df}`).
+
+    Дерево фильтров вычисляется как булевы маски по столбцам:
+    сравнения — операциями над массивами, `contains_any` — `np.isin`,
+    `has` — векторным поиском подстроки, группы "and" и "or" — `&` и `|`.
+    Столбцы с dtype object (например, списки значений в строке)
+    проверяются построчно с семантикой `PythonEngine`.
+
+    Сортировка выполняется `np.lexsort`/`np.argsort` с устойчивым
+    порядком. При пагинации первые `offset + limit` строк сначала
+    отбираются `np.partition` по первому полю сортировки, и сортируются
+    только они. Значения NaN и NaT оказываются в конце при любом
+    направлении.
+
+    Поиск и `has` не учитывают регистр (`str.casefold`, как в
+    `PythonEngine`). Приведённые копии строковых столбцов кэшируются,
+    поэтому массивы не должны изменяться после создания движка.
+    Значения None в столбцах с dtype object при сортировке идут первыми
+    по возрастанию и последними по убыванию, как в `PythonEngine`.
+
+    :param Mapping columns: Столбцы по имени.
+    :param Mapping fields: Соответствие имён полей (псевдонимов из
+    фильтров, сортировки, поиска и включаемых полей) именам столбцов.
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, Any],
+        fields: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        Инициализирует движок.
+
+        :param columns: Столбцы по имени.
+        :param fields: Соответствие имён полей именам столбцов.
+        """
+        self.columns = {
+            name: np.asarray(column) for name, column in columns.items()
+        }
+        self.fields = dict(fields or {})
+        self.size = len(next(iter(self.columns.values()), ()))
+        self._folded: Dict[str, np.ndarray] = {}
+
+    def get_column(self, field_name: str) -> np.ndarray:
+        """
+        Получает столбец по имени поля.
+
+        :param str field_name: Имя поля или псевдоним.
+        :return: Массив значений столбца.
+        :raises ValueError: Если столбец не найден.
+        """
+        column = self.columns.get(self.fields.get(field_name, field_name))
+        if column is None:
+            raise ValueError(
+                COLUMN_NOT_FOUND_MESSAGE.format(field_name=field_name),
+            )
+        return column
+
+    def apply(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Применяет переданные зависимости к столбцам.
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :return: Столбцы страницы по имени поля; без `include` —
+        все столбцы. С `CursorPagination` в них всегда есть поля курсора.
+        """
+        rows = self.indices(filtration, sort, pagination, search)
+        if include is not None and include.fields:
+            names = list(include.fields)
+            if isinstance(pagination, CursorPagination):
+                names.extend(
+                    field for field, _ in pagination.get_fields(sort)
+                )
+            names = list(dict.fromkeys(names))
+        else:
+            names = list(self.columns)
+        return {name: self.get_column(name)[rows] for name in names}
+
+    def indices(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+    ) -> np.ndarray:
+        """
+        Получает номера строк страницы в порядке сортировки.
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :return: Массив номеров строк.
+        """
+        mask = self.mask(filtration, search)
+        fields = sort.fields if sort is not None else ()
+        offset, limit = 0, None
+        if isinstance(pagination, CursorPagination):
+            seek = pagination.get_seek(sort)
+            fields, limit = seek.fields, pagination.limit
+            if seek.values is not None:
+                seek_mask = self.seek_mask(seek.fields, seek.values)
+                mask = seek_mask if mask is None else mask & seek_mask
+        elif pagination is not None:
+            offset, limit = pagination.offset, pagination.limit
+
+        if mask is None:
+            rows = np.arange(self.size)
+        else:
+            rows = np.flatnonzero(mask)
+        if fields:
+            rows = self.order(
+                rows, fields, None if limit is None else offset + limit,
+            )
+        if limit is not None:
+            rows = rows[offset:offset + limit]
+        elif offset:
+            rows = rows[offset:]
+        return rows
+
+    def mask(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        search: Optional[SimpleSearch] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Вычисляет маску строк, подходящих под фильтрацию и поиск.
+
+        :param filtration: Фильтрация.
+        :param search: Поиск.
+        :return: Булева маска или None, если условий нет.
+        """
+        masks = []
+        tree = filtration.as_tree() if filtration is not None else None
+        if tree is not None:
+            masks.append(self.node_mask(tree))
+        if search is not None and search.value:
+            masks.append(self.search_mask(search))
+        if not masks:
+            return None
+        return np.logical_and.reduce(masks)
+
+    def node_mask(self, node: FilterNode) -> np.ndarray:
+        """
+        Вычисляет маску узла дерева фильтров.
+
+        :param node: Узел дерева.
+        :return: Булева маска.
+        """
+        if isinstance(node, FilterGroup):
+            masks = [self.node_mask(child) for child in node.children]
+            if node.operator == AND:
+                return np.logical_and.reduce(masks)
+            return np.logical_or.reduce(masks)
+        return self.condition_mask(node)
+
+    def condition_mask(self, condition: FilterCondition) -> np.ndarray:
+        """
+        Вычисляет маску условия фильтрации.
+
+        :param condition: Условие.
+        :return: Булева маска.
+        """
+        column = self.get_column(condition.field_name)
+        operator_ = condition.operator
+        value = condition.value
+        if column.dtype.kind == "O":
+            test = compile_condition(_identity, operator_, value)
+            return np.fromiter(
+                map(test, column), dtype=bool, count=len(column),
+            )
+
+        if operator_ == FilterOperator.ne:
+            return ~self.condition_mask(
+                condition._replace(operator=FilterOperator.eq),
+            )
+        if operator_ == FilterOperator.has:
+            if column.dtype.kind not in _STRING_KINDS:
+                return np.zeros(len(column), dtype=bool)
+            folded = self._get_folded(condition.field_name)
+            return np.char.find(folded, str(value).casefold()) >= 0
+        if operator_ == FilterOperator.contains_any:
+            values = list(value) if isinstance(value, tuple) else [value]
+            return np.isin(column, [_coerce(column, v) for v in values])
+        if operator_ == FilterOperator.contains_all:
+            values = list(value) if isinstance(value, tuple) else [value]
+            if len(set(values)) != 1:
+                return np.zeros(len(column), dtype=bool)
+            value = values[0]
+        elif isinstance(value, tuple):
+            return np.zeros(len(column), dtype=bool)
+        compare = _COMPARISONS.get(operator_, operator.eq)
+        return _compare(compare, column, _coerce(column, value))
+
+    def search_mask(self, search: SimpleSearch) -> np.ndarray:
+        """
+        Вычисляет маску поиска подстроки без учёта регистра.
+
+        :param search: Поиск.
+        :return: Булева маска.
+        """
+        needle = search.value.casefold()
+        mask = np.zeros(self.size, dtype=bool)
+        for field in search.fields:
+            column = self.get_column(field)
+            if column.dtype.kind == "O":
+                mask |= np.fromiter(
+                    (_matches_text(value, needle) for value in column),
+                    dtype=bool,
+                    count=len(column),
+                )
+            elif column.dtype.kind in _STRING_KINDS:
+                mask |= np.char.find(self._get_folded(field), needle) >= 0
+        return mask
+
+    def seek_mask(
+        self,
+        fields: Sequence[Tuple[str, Order]],
+        values: Sequence[Any],
+    ) -> np.ndarray:
+        """
+        Вычисляет маску продолжения keyset-пагинации.
+
+        :param fields: Пары (поле, порядок сортировки).
+        :param values: Значения полей последней строки предыдущей страницы.
+        :return: Маска строк, следующих за курсором.
+        """
+        result = np.zeros(self.size, dtype=bool)
+        equal = np.ones(self.size, dtype=bool)
+        for (field, order), value in zip(fields, values):
+            column = self.get_column(field)
+            value = _coerce(column, value)
+            compare = operator.lt if order == Order.desc else operator.gt
+            result |= equal & _compare(compare, column, value)
+            equal &= _compare(operator.eq, column, value)
+        return result
+
+    def order(
+        self,
+        rows: np.ndarray,
+        fields: Sequence[Tuple[str, Order]],
+        count: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Упорядочивает строки устойчивой сортировкой.
+
+        :param rows: Номера строк.
+        :param fields: Пары (поле, порядок сортировки).
+        :param count: Сколько первых строк нужно; остальные могут быть
+        отброшены без сортировки.
+        :return: Номера строк в порядке сортировки.
+        """
+        keys: List[np.ndarray] = []
+        for field, order in fields:
+            key = self.get_column(field)[rows]
+            if key.dtype.kind == "O":
+                key = _ranks(key)
+            keys.append(_descending(key) if order == Order.desc else key)
+        if count is not None and 0 < count < len(rows):
+            primary = keys[0]
+            kth = np.partition(primary, count - 1)[count - 1]
+            if kth == kth:
+                candidates = np.flatnonzero(primary <= kth)
+                rows = rows[candidates]
+                keys = [key[candidates] for key in keys]
+        if len(keys) == 1:
+            positions = np.argsort(keys[0], kind="stable")
+        else:
+            positions = np.lexsort(keys[::-1])
+        return rows[positions[:count]]
+
+    def _get_folded(self, field: str) -> np.ndarray:
+        folded = self._folded.get(field)
+        if folded is None:
+            folded = _casefold(self.get_column(field))
+            self._folded[field] = folded
+        return folded
@@ -0,0 +1,637 @@
+import heapq
+import operator
+from itertools import islice
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, Iterator, Mapping, Optional,
+    Sequence, Tuple, Union,
+)
+
+from ..filters import FilterOperator, SimpleFiltration
+from ..include import (
+    MISSING, PATH_SEPARATOR, Projection, SimpleInclude, get_key,
+)
+from ..pagination import CursorPagination, SimplePagination
+from ..search import SimpleSearch
+from ..sort import Order, SimpleSort
+from ..tree import AND, FilterCondition, FilterGroup, FilterNode
+
+Predicate = Callable[[Any], bool]
+
+_COMPARISONS = {
+    FilterOperator.gt: operator.gt,
+    FilterOperator.lt: operator.lt,
+    FilterOperator.gte: operator.ge,
+    FilterOperator.lte: operator.le,
+}
+
+_COLLECTIONS = (list, tuple, set, frozenset)
+
+# Наибольшее значение для битовых карт: карта строки занимает не более
+# BITMAP_MAX_VALUE / 8 байт.
+BITMAP_MAX_VALUE = 1 << 12
+
+
+def _resolve(item: Any, keys: Sequence[str]) -> Any:
+    """
+    Получает значение по пути.
+
+    Как и в MongoDB, путь через список применяется к каждому его
+    элементу, а результаты собираются в один список.
+    """
+    for index, key in enumerate(keys):
+        if isinstance(item, list):
+            values = []
+            for element in item:
+                value = _resolve(element, keys[index:])
+                if isinstance(value, list):
+                    values.extend(value)
+                elif value is not MISSING:
+                    values.append(value)
+            return values
+        item = get_key(item, key)
+        if item is MISSING:
+            break
+    return item
+
+
+def _compile_getter(keys: Tuple[str, ...]) -> Callable[[Any], Any]:
+    if len(keys) == 1:
+        key = keys[0]
+
+        def get(item):
+            if type(item) is dict:
+                return item.get(key, MISSING)
+            return get_key(item, key)
+
+        return get
+
+    def get(item):
+        return _resolve(item, keys)
+
+    return get
+
+
+def _make_set(values: Iterable[Any]):
+    """
+    Готовит значения запроса для проверки вхождения.
+
+    :return: frozenset или кортеж, если значения не хешируемы.
+    """
+    values = tuple(values)
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+def _make_bitmap(values: Iterable[Any]) -> Optional[int]:
+    """
+    Собирает битовую карту целых значений.
+
+    :return: int, в котором выставлен бит каждого значения, или None,
+    если есть значения вне `[0, BITMAP_MAX_VALUE)`.
+    """
+    values = list(values)
+    if not all(
+        type(value) is int and 0 <= value < BITMAP_MAX_VALUE
+        for value in values
+    ):
+        return None
+    bitmap = bytearray(max(values, default=0) // 8 + 1)
+    for value in values:
+        bitmap[value >> 3] |= 1 << (value & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+class RowSetCache:
+    """
+    Кэш множеств значений списковых полей строк.
+
+    Запись ищется по `id` списка и хранит сам список, поэтому
+    не может относиться к другому объекту. Изменение списка после
+    попадания в кэш не отслеживается: кэш рассчитан на неизменяемые
+    данные в памяти. При переполнении кэш очищается целиком.
+
+    :param int maxsize: Максимальное количество записей.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Инициализирует пустой кэш.
+
+        :param int maxsize: Максимальное количество записей.
+        """
+        self.maxsize = maxsize
+        self._data: Dict[int, Tuple[Any, FrozenSet, Optional[int]]] = {}
+
+    def get(self, values: Iterable[Any]) -> Tuple[FrozenSet, Optional[int]]:
+        """
+        Получает множество и битовую карту значений строки.
+
+        :param values: Список значений поля строки.
+        :return: frozenset значений и битовая карта или None.
+        :raises TypeError: Если значения не хешируемы.
+        """
+        entry = self._data.get(id(values))
+        if entry is None or entry[0] is not values:
+            if len(self._data) >= self.maxsize:
+                self._data.clear()
+            entry = (values, frozenset(values), _make_bitmap(values))
+            self._data[id(values)] = entry
+        return entry[1], entry[2]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _contains(values, value) -> bool:
+    try:
+        return value in values
+    except TypeError:
+        return False
+
+
+class _Descending:
+    """Обёртка значения, сравнение которой инвертировано."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other) -> bool:
+        return other.value < self.value
+
+
+def _sort_value(value: Any) -> Tuple[int, Any]:
+    """
+    Ключ значения поля: отсутствующие значения и None идут первыми,
+    как в MongoDB, и не сравниваются с остальными.
+    """
+    if value is MISSING or value is None:
+        return (0, None)
+    return (1, value)
+
+
+class PythonEngine:
+    """
+    Применяет фильтрацию, поиск, сортировку, пагинацию и включаемые поля
+    к последовательности словарей или объектов в памяти.
+
+    Дерево фильтров компилируется в одну функцию-предикат из замыканий;
+    группы "and" и "or" вычисляются с коротким замыканием. Семантика
+    совпадает с `MongoCompiler`: сравнение со списком в документе истинно,
+    если подходит хотя бы один элемент, а путь через список применяется
+    к каждому элементу.
+
+    `apply` возвращает ленивый итератор. Без сортировки пагинация
+    прекращает чтение источника после последнего элемента страницы;
+    с сортировкой и пагинацией первые `offset + limit` строк выбираются
+    через `heapq.nsmallest`/`nlargest` без сортировки всего источника.
+
+    :param Mapping fields: Явное соответствие имён полей путям в
+    элементах. По умолчанию путь получается из имени: `a->b` и `a.b`
+    становятся ключами `a`, `b`.
+    :param int row_cache_size: Размер кэша множеств значений списковых
+    полей (см. `RowSetCache`); 0 отключает кэш. Полезен, когда один и тот
+    же неизменяемый набор строк фильтруется многими запросами.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[Mapping[str, str]] = None,
+        row_cache_size: int = 0,
+    ) -> None:
+        """
+        Инициализирует движок.
+
+        :param fields: Соответствие имён полей путям в элементах.
+        :param row_cache_size: Размер кэша множеств значений строк.
+        """
+        self.fields = dict(fields or {})
+        self.row_sets = RowSetCache(row_cache_size) if row_cache_size else None
+
+    def get_path(self, field_name: str) -> Tuple[str, ...]:
+        """
+        Получает путь поля в элементе.
+
+        :param str field_name: Имя поля или псевдоним.
+        :return: Ключи пути.
+        """
+        path = self.fields.get(field_name, field_name)
+        return tuple(PATH_SEPARATOR.split(path))
+
+    def get_getter(self, field_name: str) -> Callable[[Any], Any]:
+        """
+        Создаёт функцию получения значения поля из элемента.
+
+        :param str field_name: Имя поля или псевдоним.
+        :return: Функция, возвращающая значение поля.
+        """
+        return _compile_getter(self.get_path(field_name))
+
+    def apply(
+        self,
+        items: Iterable[Any],
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        pagination: Union[SimplePagination, CursorPagination, None] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+    ) -> Iterator[Any]:
+        """
+        Применяет переданные зависимости к элементам.
+
+        :param items: Исходные элементы: словари или объекты.
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param pagination: Пагинация.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :return: Ленивый итератор элементов страницы.
+        """
+        predicate = self.compile_filter(filtration, search)
+        fields = sort.fields if sort is not None else ()
+        offset, limit = 0, None
+        required = ()
+        if isinstance(pagination, CursorPagination):
+            seek = pagination.get_seek(sort)
+            fields, limit = seek.fields, pagination.limit
+            required = [field for field, _ in seek.fields]
+            if seek.values is not None:
+                predicate = _compile_and(list(filter(None, (
+                    predicate, self.compile_seek(seek.fields, seek.values),
+                ))))
+        elif pagination is not None:
+            offset, limit = pagination.offset, pagination.limit
+
+        rows = iter(items)
+        if predicate is not None:
+            rows = filter(predicate, rows)
+        if fields:
+            rows = self._sort(rows, fields, offset, limit)
+        if offset or limit is not None:
+            rows = islice(
+                rows, offset, offset + limit if limit is not None else None,
+            )
+        projection = self.compile_projection(include, required)
+        if projection is not None:
+            rows = map(projection, rows)
+        return rows
+
+    def _sort(self, rows, fields, offset, limit) -> Iterator[Any]:
+        """
+        Сортирует строки при первом обращении к итератору.
+
+        При заданном `limit` выбираются только первые `offset + limit`
+        строк.
+        """
+        key, reverse = self.compile_sort_key(fields)
+        if limit is None:
+            yield from sorted(rows, key=key, reverse=reverse)
+        else:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            yield from select(offset + limit, rows, key=key)
+
+    def compile_filter(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        search: Optional[SimpleSearch] = None,
+    ) -> Optional[Predicate]:
+        """
+        Компилирует фильтрацию и поиск в один предикат.
+
+        :param filtration: Фильтрация.
+        :param search: Поиск.
+        :return: Предикат или None, если условий нет.
+        """
+        predicates = []
+        tree = filtration.as_tree() if filtration is not None else None
+        if tree is not None:
+            predicates.append(self.compile_node(tree))
+        if search is not None and search.value:
+            predicates.append(self.compile_search(search))
+        if not predicates:
+            return None
+        return _compile_and(predicates)
+
+    def compile_node(self, node: FilterNode) -> Predicate:
+        """
+        Компилирует узел дерева фильтров.
+
+        :param node: Узел дерева.
+        :return: Предикат.
+        """
+        if isinstance(node, FilterGroup):
+            predicates = [self.compile_node(child) for child in node.children]
+            if node.operator == AND:
+                return _compile_and(predicates)
+            return _compile_or(predicates)
+        return self.compile_condition(node)
+
+    def compile_condition(self, condition: FilterCondition) -> Predicate:
+        """
+        Компилирует условие фильтрации.
+
+        :param condition: Условие.
+        :return: Предикат.
+        """
+        return compile_condition(
+            self.get_getter(condition.field_name),
+            condition.operator,
+            condition.value,
+            self.row_sets,
+        )
+
+    def compile_search(self, search: SimpleSearch) -> Predicate:
+        """
+        Компилирует поиск подстроки без учёта регистра.
+
+        :param search: Поиск.
+        :return: Предикат.
+        """
+        needle = search.value.casefold()
+        getters = [self.get_getter(field) for field in search.fields]
+
+        def matches(value):
+            return isinstance(value, str) and needle in value.casefold()
+
+        def predicate(item):
+            for get in getters:
+                value = get(item)
+                if type(value) is list:
+                    if any(map(matches, value)):
+                        return True
+                elif matches(value):
+                    return True
+            return False
+
+        return predicate
+
+    def compile_sort_key(
+        self,
+        fields: Sequence[Tuple[str, Order]],
+    ) -> Tuple[Callable[[Any], Tuple], bool]:
+        """
+        Компилирует ключ сортировки.
+
+        Если все поля сортируются по убыванию, возвращается ключ по
+        возрастанию и признак обратного порядка; при смешанных
+        направлениях значения полей по убыванию оборачиваются.
+
+        :param fields: Пары (поле, порядок сортировки).
+        :return: Функция-ключ и признак обратного порядка.
+        """
+        getters = [self.get_getter(field) for field, _ in fields]
+        reverse = all(order == Order.desc for _, order in fields)
+        if len(set(order for _, order in fields)) == 1:
+            if len(getters) == 1:
+                get = getters[0]
+                return lambda item: (_sort_value(get(item)),), reverse
+            if len(getters) == 2:
+                first, second = getters
+                return lambda item: (
+                    _sort_value(first(item)), _sort_value(second(item)),
+                ), reverse
+        make_key = self._compile_key_maker(fields)
+        return (
+            lambda item: make_key([get(item) for get in getters]),
+            reverse,
+        )
+
+    def compile_seek(
+        self,
+        fields: Sequence[Tuple[str, Order]],
+        values: Sequence[Any],
+    ) -> Predicate:
+        """
+        Компилирует условие продолжения keyset-пагинации.
+
+        :param fields: Пары (поле, порядок сортировки).
+        :param values: Значения полей последней строки предыдущей страницы.
+        :return: Предикат, истинный для строк после курсора.
+        """
+        key, reverse = self.compile_sort_key(fields)
+        after = self._compile_key_maker(fields)(values)
+        if reverse:
+            return lambda item: _compare(operator.lt, key(item), after)
+        return lambda item: _compare(operator.gt, key(item), after)
+
+    def compile_projection(
+        self,
+        include: Optional[SimpleInclude],
+        required: Iterable[str] = (),
+    ) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        """
+        Компилирует проекцию по включаемым полям.
+
+        Элементы превращаются в словари только с указанными путями;
+        путь, покрытый родительским полем, не учитывается (см.
+        `include.compile_pruner`). Если для полей не заданы пути в
+        `fields` и нет обязательных полей, используется проекция,
+        закэшированная в `SimpleInclude.get_projection`.
+
+        :param include: Включаемые поля.
+        :param required: Поля, которые нужны всегда, например поля
+        курсора для `CursorPagination.get_next_cursor`.
+        :return: Функция проекции или None, если нужны все поля.
+        """
+        if include is None or not include.fields:
+            return None
+        fields = [*include.fields, *required]
+        if len(fields) == len(include.fields) and not any(
+            field in self.fields for field in fields
+        ):
+            return include.get_projection().prune
+        return Projection.from_paths(map(self.get_path, fields)).prune
+
+    @staticmethod
+    def _compile_key_maker(fields: Sequence[Tuple[str, Order]]):
+        orders = [order for _, order in fields]
+        if len(set(orders)) == 1:
+            return lambda values: tuple(map(_sort_value, values))
+        return lambda values: tuple(
+            _Descending(_sort_value(value)) if order == Order.desc
+            else _sort_value(value)
+            for value, order in zip(values, orders)
+        )
+
+
+def compile_condition(
+    get: Callable[[Any], Any],
+    operator_: FilterOperator,
+    value: Any,
+    row_sets: Optional["RowSetCache"] = None,
+) -> Predicate:
+    """
+    Компилирует условие фильтрации для значений, получаемых функцией
+    `get`.
+
+    Значения `contains_any` и `contains_all` один раз на запрос
+    собираются в frozenset, и проверка строки сводится к
+    `isdisjoint`/`issubset`. С кэшем `row_sets` для `contains_all`
+    множества строк переиспользуются между запросами, а небольшие
+    неотрицательные целые значения проверяются побитовым AND.
+
+    :param get: Функция получения значения поля из элемента.
+    :param operator_: Оператор фильтрации.
+    :param value: Значение условия.
+    :param row_sets: Кэш множеств значений строк.
+    :return: Предикат.
+    """
+    if isinstance(value, tuple):
+        value = list(value)
+
+    if operator_ in (FilterOperator.eq, FilterOperator.ne):
+        equals = _compile_equals(get, value)
+        if operator_ == FilterOperator.eq:
+            return equals
+        return lambda item: not equals(item)
+
+    if operator_ in _COMPARISONS:
+        compare = _COMPARISONS[operator_]
+
+        def predicate(item):
+            actual = get(item)
+            if type(actual) is list:
+                return any(_compare(compare, element, value)
+                           for element in actual)
+            try:
+                return compare(actual, value)
+            except TypeError:
+                return False
+
+        return predicate
+
+    if operator_ == FilterOperator.has:
+        needle = str(value).casefold()
+
+        def predicate(item):
+            actual = get(item)
+            if type(actual) is list:
+                return any(
+                    isinstance(element, str) and needle in element.casefold()
+                    for element in actual
+                )
+            return isinstance(actual, str) and needle in actual.casefold()
+
+        return predicate
+
+    values = _make_set(value if isinstance(value, list) else [value])
+    if not isinstance(values, frozenset):
+        return _compile_contains_unhashable(get, operator_, values)
+
+    if operator_ == FilterOperator.contains_any:
+        # isdisjoint перебирает короткий список строки и останавливается
+        # на первом совпадении; кэш множества строки здесь не быстрее.
+
+        def predicate(item):
+            actual = get(item)
+            if type(actual) not in _COLLECTIONS:
+                return _contains(values, actual)
+            try:
+                return not values.isdisjoint(actual)
+            except TypeError:
+                return any(_contains(values, element) for element in actual)
+
+        return predicate
+
+    bits = _make_bitmap(values) if row_sets is not None else None
+
+    def predicate(item):
+        actual = get(item)
+        if not values:
+            return False
+        if type(actual) not in _COLLECTIONS:
+            return len(values) == 1 and _contains(values, actual)
+        try:
+            if row_sets is None:
+                return values.issubset(actual)
+            row_set, row_bits = row_sets.get(actual)
+            if bits is not None and row_bits is not None:
+                return row_bits & bits == bits
+            return values <= row_set
+        except TypeError:
+            return all(_contains(actual, element) for element in values)
+
+    return predicate
+
+
+def _compile_contains_unhashable(get, operator_, values) -> Predicate:
+    """Проверка вхождения для нехешируемых значений запроса."""
+    if operator_ == FilterOperator.contains_any:
+
+        def predicate(item):
+            actual = get(item)
+            if type(actual) in _COLLECTIONS:
+                return any(element in values for element in actual)
+            return actual in values
+
+        return predicate
+
+    def predicate(item):
+        actual = get(item)
+        if not values:
+            return False
+        if type(actual) in _COLLECTIONS:
+            return all(element in actual for element in values)
+        return all(element == actual for element in values)
+
+    return predicate
+
+
+def _compare(compare, actual, value) -> bool:
+    if actual is MISSING or actual is None:
+        return False
+    try:
+        return compare(actual, value)
+    except TypeError:
+        return False
+
+
+def _compile_equals(get, value) -> Predicate:
+    if value is None:
+        return lambda item: get(item) in (None, MISSING)
+
+    def predicate(item):
+        actual = get(item)
+        if actual == value:
+            return True
+        return type(actual) is list and value in actual
+
+    return predicate
+
+
+def _compile_and(predicates) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda item: first(item) and second(item)
+
+    def predicate(item):
+        for check in predicates:
+            if not check(item):
+                return False
+        return True
+
+    return predicate
+
+
+def _compile_or(predicates) -> Predicate:
+    if len(predicates) == 1:
+        return predicates[0]
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda item: first(item) or second(item)
+
+    def predicate(item):
+        for check in predicates:
+            if check(item):
+                return True
+        return False
+
+    return predicate
@@ -0,0 +1,243 @@
+import csv
+import io
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Type,
+)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from . import jsonlib
+from .filters import SimpleFiltration
+from .include import SimpleInclude
+from .pagination import CursorPagination
+from .search import SimpleSearch
+from .sort import SimpleSort
+
+FetchPage = Callable[..., Awaitable[Sequence[Any]]]
+
+WRONG_FORMAT_MESSAGE = "Неизвестный формат выгрузки {format!r}."
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def iter_batches(
+    fetch_page: FetchPage,
+    filtration: Optional[SimpleFiltration] = None,
+    sort: Optional[SimpleSort] = None,
+    search: Optional[SimpleSearch] = None,
+    include: Optional[SimpleInclude] = None,
+    batch_size: int = 1000,
+    pagination_class: Type[CursorPagination] = CursorPagination,
+) -> AsyncIterator[Sequence[Any]]:
+    """
+    Получает все строки выборки пачками через keyset-пагинацию.
+
+    `fetch_page` вызывается с именованными аргументами `filtration`,
+    `sort`, `pagination`, `search` и `include`, где `pagination` —
+    `CursorPagination` с позицией после последней строки предыдущей
+    пачки. Каждая пачка стоит одинаково независимо от глубины. Следующая
+    пачка запрашивается, только когда потребитель запросил следующий
+    элемент, поэтому в памяти находится одна пачка.
+
+    Элементы должны содержать поля сортировки и `TIEBREAKER_FIELD`
+    `pagination_class`; бэкенды и движки пакета добавляют их к включаемым
+    полям сами при `CursorPagination`. Эти поля не должны содержать NULL (см.
+    `CursorPagination`): если None попадает в последнюю строку пачки,
+    выгрузка прерывается ValueError, а не завершается молча.
+
+    :param fetch_page: Асинхронная функция получения пачки.
+    :param filtration: Фильтрация.
+    :param sort: Сортировка.
+    :param search: Поиск.
+    :param include: Включаемые поля.
+    :param int batch_size: Размер пачки.
+    :param pagination_class: Класс пагинации, задающий тайбрейкер.
+    :return: Асинхронный итератор непустых пачек.
+    :raises ValueError: Если поле упорядочивания равно None.
+    """
+    pagination = pagination_class(limit=batch_size)
+    while pagination is not None:
+        items = await fetch_page(
+            filtration=filtration,
+            sort=sort,
+            pagination=pagination,
+            search=search,
+            include=include,
+        )
+        if items:
+            yield items
+        pagination = pagination.get_next_page(items, sort)
+
+
+def _get_serializer(
+    include: Optional[SimpleInclude],
+) -> Callable[[Any], Any]:
+    projection = include.get_projection() if include is not None else None
+    return projection.serialize if projection is not None else (
+        jsonable_encoder
+    )
+
+
+async def iter_ndjson(
+    batches: AsyncIterator[Sequence[Any]],
+    include: Optional[SimpleInclude] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Сериализует пачки в NDJSON: одна строка на элемент, один фрагмент
+    ответа на пачку.
+
+    :param batches: Асинхронный итератор пачек (см. `iter_batches`).
+    :param include: Включаемые поля; сериализация как в
+    `response.serialize_include`.
+    :return: Асинхронный итератор фрагментов.
+    """
+    serialize = _get_serializer(include)
+    dumps = jsonlib.dumps
+    async for items in batches:
+        yield b"".join(dumps(serialize(item)) + b"\n" for item in items)
+
+
+def _get_cell(value: Any, path: Sequence[str]) -> Any:
+    for key in path:
+        if not isinstance(value, dict):
+            break
+        value = value.get(key)
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return jsonlib.dumps(value).decode("utf-8")
+    return value
+
+
+async def iter_csv(
+    batches: AsyncIterator[Sequence[Any]],
+    include: Optional[SimpleInclude] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Сериализует пачки в CSV с заголовком: один фрагмент ответа на пачку.
+
+    Столбцы — пути через точку. По умолчанию это пути проекции `include`
+    (см. `Projection.paths`), а без включаемых полей — ключи первого
+    элемента. Вложенные объекты и списки записываются как JSON, None —
+    как пустая строка.
+
+    :param batches: Асинхронный итератор пачек (см. `iter_batches`).
+    :param include: Включаемые поля.
+    :param columns: Явный список столбцов.
+    :return: Асинхронный итератор фрагментов в UTF-8.
+    """
+    serialize = _get_serializer(include)
+    if columns is None and include is not None:
+        projection = include.get_projection()
+        if projection is not None:
+            columns = projection.paths
+    paths: Optional[List[List[str]]] = None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    async for items in batches:
+        rows = list(map(serialize, items))
+        if paths is None:
+            if columns is None:
+                columns = list(rows[0])
+            paths = [column.split(".") for column in columns]
+            writer.writerow(columns)
+        writer.writerows(
+            [_get_cell(row, path) for path in paths] for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if paths is None and columns is not None:
+        writer.writerow(columns)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class ExportResponse(StreamingResponse):
+    """
+    Потоковая выгрузка всей выборки в NDJSON или CSV.
+
+    Принимает те же зависимости, что и обычный список, но вместо
+    страницы отдаёт все строки: они читаются пачками по `batch_size`
+    через keyset-пагинацию (см. `iter_batches`) и кодируются по одной
+    пачке. Следующая пачка запрашивается только после того, как сервер
+    ASGI отправил предыдущую, поэтому медленный клиент замедляет чтение
+    из базы, а память ограничена одной пачкой.
+
+    Пример::
+
+        @app.get("/users/export")
+        async def export(
+            filtration: Filters = Depends(Filters.as_dependency()),
+            sort: Sort = Depends(Sort.as_dependency()),
+            include: Include = Depends(Include.as_dependency()),
+        ):
+            return ExportResponse(
+                fetch_page, filtration, sort, include=include,
+                format="csv", filename="users.csv",
+            )
+
+    :param Callable fetch_page: Асинхронная функция получения пачки.
+    :param SimpleFiltration filtration: Фильтрация.
+    :param SimpleSort sort: Сортировка.
+    :param SimpleSearch search: Поиск.
+    :param SimpleInclude include: Включаемые поля.
+    :param str format: `ndjson` или `csv`.
+    :param int batch_size: Размер пачки.
+    :param pagination_class: Класс пагинации, задающий тайбрейкер.
+    :param columns: Столбцы CSV.
+    :param str filename: Имя файла для заголовка Content-Disposition.
+    """
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+        search: Optional[SimpleSearch] = None,
+        include: Optional[SimpleInclude] = None,
+        format: str = "ndjson",
+        batch_size: int = 1000,
+        pagination_class: Type[CursorPagination] = CursorPagination,
+        columns: Optional[Sequence[str]] = None,
+        filename: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Инициализирует ответ.
+
+        :param fetch_page: Асинхронная функция получения пачки.
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :param search: Поиск.
+        :param include: Включаемые поля.
+        :param format: `ndjson` или `csv`.
+        :param batch_size: Размер пачки.
+        :param pagination_class: Класс пагинации.
+        :param columns: Столбцы CSV.
+        :param filename: Имя файла.
+        :param kwargs: Аргументы `StreamingResponse`.
+        :raises ValueError: Если формат неизвестен.
+        """
+        if format not in MEDIA_TYPES:
+            raise ValueError(WRONG_FORMAT_MESSAGE.format(format=format))
+        batches = iter_batches(
+            fetch_page, filtration, sort, search, include,
+            batch_size, pagination_class,
+        )
+        if format == "csv":
+            content = iter_csv(batches, include, columns)
+        else:
+            content = iter_ndjson(batches, include)
+        if filename is not None:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["content-disposition"] = (
+                f'attachment; filename="{filename}"'
+            )
+            kwargs["headers"] = headers
+        kwargs.setdefault("media_type", MEDIA_TYPES[format])
+        super().__init__(content, **kwargs)
@@ -1,11 +1,18 @@
-import json
+import re
 from enum import Enum
-from typing import Any, AnyStr, Dict, List, Union, get_args, get_origin
+from types import MappingProxyType
+from typing import (
+    Any, AnyStr, Callable, Dict, FrozenSet, List, Mapping, NamedTuple,
+    Optional, Tuple, Union, get_args, get_origin,
+)
 
 from fastapi import HTTPException, Query, status
 from pydantic import BaseModel
 
-from .base import Base
+from . import jsonlib
+from .base import Base, cached_per_class
+from .cache import CacheInfo, LRUCache
+from .instrumentation import FilterObserver
 
 WRONG_FORMAT_MESSAGE = "Неверный формат фильтров."
 WRONG_FILER_SIZE_MESSAGE = "Фильтрация — это список списков из 3 элементов."
@@ -16,6 +23,18 @@ WRONG_VALUE_FORMAT_MESSAGE = "Значение '{value}' имеет неверн
 WRONG_ARRAY_FORMAT_MESSAGE = "Значение должно быть в формате массива."
 LOGICAL_OPERATOR_NOT_FOUND \
     = "Логический оператор {operators} не найден на позиции {position}."
+FILTER_TOO_LARGE_MESSAGE = "Размер фильтров превышает {max_bytes} байт."
+FILTER_TOO_DEEP_MESSAGE \
+    = "Глубина вложенности фильтров превышает {max_depth}."
+TOO_MANY_FILTERS_MESSAGE \
+    = "Количество условий фильтрации превышает {max_leaves}."
+
+# Жёсткий предел вложенности: дерево фильтров и бэкенды обходят группы
+# рекурсивно (в том числе компилятор SQLAlchemy), поэтому более глубокие
+# фильтры отклоняются независимо от `MAX_DEPTH`.
+MAX_DEPTH_LIMIT = 64
+
+_JSON_BRACKETS = re.compile(r'"(?:\\.|[^"\\])*"|[\[\]{}]')
 
 
 class FilterOperator(str, Enum):
@@ -68,28 +87,130 @@ _TYPE_OPERATORS_MAP = {
     list: ["eq", "ne", "contains_any", "contains_all"],
 }
 
-FILTRATION = (
-    f"JSON-массив фильтров.\n"
-    f"\n**Форматы фильтров:**"
-    f"\n- Простой фильтр: `[[поле, значение, оператор], ...]`"
-    f"\n- Сложный фильтр: `[[поле, значение, оператор], and/or, "
-    f"[поле, значение, оператор], ...]`"
-    f"\n\n**Доступные общие операторы:**"
-    f"\n- `{FilterOperator.eq}` - равно"
-    f"\n- `{FilterOperator.has}` - содержит"
-    f"\n- `{FilterOperator.gte}` - нестрого больше или равно"
-    f"\n- `{FilterOperator.lte}` - нестрого меньше или равно"
-    f"\n- `{FilterOperator.gt}` - строго больше"
-    f"\n- `{FilterOperator.lt}` - строго меньше"
-    f"\n- `{FilterOperator.contains_any}` - содержит хотя бы одно из значений"
-    f"\n- `{FilterOperator.contains_all}` - содержит все значения"
+CONFIG_NOT_MAPPING_MESSAGE = "{attribute} должен быть словарём."
+CONFIG_NOT_FILTER_FIELD_MESSAGE \
+    = "FILTER_FIELDS['{name}'] не является FilterField."
+CONFIG_NO_OPERATORS_MESSAGE = (
+    "Для поля '{name}' не заданы операторы, а для типа {field_type!r} "
+    "нет операторов по умолчанию."
 )
+CONFIG_UNKNOWN_OPERATORS_MESSAGE \
+    = "Поле '{name}': неизвестные операторы {operators}."
+CONFIG_UNKNOWN_LOGICAL_MESSAGE \
+    = "Неизвестные логические операторы {operators}."
+CONFIG_WRONG_LIMIT_MESSAGE \
+    = "{attribute} должен быть неотрицательным целым числом или None."
+CONFIG_DEPTH_ABOVE_LIMIT_MESSAGE \
+    = "MAX_DEPTH не может превышать {limit}."
+CONFIG_WRONG_OBSERVER_MESSAGE \
+    = "OBSERVER должен быть экземпляром FilterObserver или None."
+
+
+def _get_filtration_description() -> str:
+    """
+    Собирает описание параметра `filters` для OpenAPI.
+
+    Строится при первом создании зависимости, а не при импорте модуля.
+
+    :return: str: Описание в формате Markdown.
+    """
+    return (
+        f"JSON-массив фильтров.\n"
+        f"\n**Форматы фильтров:**"
+        f"\n- Простой фильтр: `[[поле, значение, оператор], ...]`"
+        f"\n- Сложный фильтр: `[[поле, значение, оператор], and/or, "
+        f"[поле, значение, оператор], ...]`"
+        f"\n\n**Доступные общие операторы:**"
+        f"\n- `{FilterOperator.eq}` - равно"
+        f"\n- `{FilterOperator.has}` - содержит подстроку без учёта "
+        f"регистра"
+        f"\n- `{FilterOperator.gte}` - нестрого больше или равно"
+        f"\n- `{FilterOperator.lte}` - нестрого меньше или равно"
+        f"\n- `{FilterOperator.gt}` - строго больше"
+        f"\n- `{FilterOperator.lt}` - строго меньше"
+        f"\n- `{FilterOperator.contains_any}` - содержит хотя бы одно "
+        f"из значений"
+        f"\n- `{FilterOperator.contains_all}` - содержит все значения"
+    )
+
+
+def __getattr__(name):
+    if name == "FILTRATION":
+        return _get_filtration_description()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _freeze_filters(filters):
+    """
+    Преобразует разобранные фильтры в неизменяемую структуру.
+
+    Списки становятся кортежами, словари — MappingProxyType.
+    Используется для записей кэша, общих для всех запросов.
+
+    :param filters: Разобранные фильтры.
+    :return: Неизменяемая копия фильтров.
+    """
+    if isinstance(filters, list):
+        return tuple(_freeze_filters(item) for item in filters)
+    if isinstance(filters, dict):
+        return MappingProxyType(
+            {key: _freeze_filters(value) for key, value in filters.items()},
+        )
+    return filters
+
+
+def _measure_filters(filters) -> Tuple[int, int]:
+    """
+    Считает условия и глубину вложенности групп разобранного фильтра.
+
+    :param filters: Разобранные фильтры.
+    :return: Количество условий и глубина (0 для одного условия).
+    """
+    if not isinstance(filters, list):
+        return int(bool(filters)), 0
+    leaves = depth = 0
+    stack = [(filters, 1)]
+    while stack:
+        group, level = stack.pop()
+        depth = max(depth, level)
+        for item in group[::2]:
+            if isinstance(item, list):
+                stack.append((item, level + 1))
+            else:
+                leaves += 1
+    return leaves, depth
+
+
+def _measure_nesting(filter_: str) -> int:
+    """
+    Считает глубину вложенности скобок в строке JSON без декодирования.
+
+    Скобки внутри строк не учитываются; строка может быть некорректной.
+
+    :param str filter_: Строка фильтров.
+    :return: Наибольшая глубина вложенности.
+    """
+    depth = max_depth = 0
+    for match in _JSON_BRACKETS.finditer(filter_):
+        bracket = match.group()[0]
+        if bracket in "[{":
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif bracket in "]}":
+            depth -= 1
+    return max_depth
+
+
+_MISSING = object()
 
 
 class FilterResponse(BaseModel):
     """
     Модель Pydantic для ответа фильтрации.
 
+    Не используется при разборе запросов: фильтры собираются в обычные
+    словари с теми же ключами. Оставлена для обратной совместимости.
+
     :param str field_name: Имя поля, по которому проводится фильтрация.
     :param FilterOperator operator: Оператор фильтрации,
     который будет использоваться.
@@ -100,6 +221,82 @@ class FilterResponse(BaseModel):
     value: Any
 
 
+def _build_converter(value_type) -> Callable[[Any], Any]:
+    """
+    Создаёт функцию преобразования скалярного значения в тип поля.
+
+    :param value_type: Тип, к которому приводится значение.
+    :return: Функция преобразования.
+    """
+
+    def convert(value):
+        try:
+            return value_type(value)
+        except Exception:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                WRONG_VALUE_FORMAT_MESSAGE.format(value=value),
+            )
+
+    return convert
+
+
+class CompiledFilterField(NamedTuple):
+    """
+    Неизменяемое описание поля, подготовленное при объявлении класса.
+
+    :param str field_name: Итоговое имя поля (псевдоним или путь).
+    :param FrozenSet[str] operators: Разрешённые операторы.
+    :param Callable converter: Преобразователь скалярного значения.
+    """
+    field_name: str
+    operators: FrozenSet[str]
+    converter: Callable[[Any], Any]
+
+    def get_filter(self, operator, value):
+        """
+        Получает ответ фильтрации для поля.
+
+        :param str operator: Оператор фильтрации.
+        :param value: Значение для фильтрации.
+        :return: dict: Словарь, представляющий ответ фильтра.
+        :raises HTTPException: Если оператор не разрешён или значение
+        имеет неверный формат.
+        """
+        self.check_operator(operator)
+        return {
+            "field_name": self.field_name,
+            "operator": FilterOperator(operator),
+            "value": self.convert(value),
+        }
+
+    def check_operator(self, operator) -> None:
+        """
+        Проверяет, что оператор разрешён для поля.
+
+        :param str operator: Оператор фильтрации.
+        :raises HTTPException: Если оператор не разрешён.
+        """
+        if not isinstance(operator, str) or operator not in self.operators:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                OPERATOR_IS_NOT_ALLOWED_MESSAGE.format(operator=operator),
+            )
+
+    def convert(self, value):
+        """
+        Приводит значение или каждый элемент списка к типу поля.
+
+        :param value: Значение для фильтрации.
+        :return: Преобразованное значение.
+        :raises HTTPException: Если значение имеет неверный формат.
+        """
+        converter = self.converter
+        if isinstance(value, list):
+            return [converter(item) for item in value]
+        return converter(value)
+
+
 class FilterField:
     """
     Представляет поле с логикой фильтрации.
@@ -129,59 +326,30 @@ class FilterField:
         self.field_type = field_type
         self.operators = operators
 
-    def __get_operator(self, operator):
+    def get_operators(self) -> FrozenSet[str]:
         """
-        Проверяет и возвращает оператор.
+        Получает разрешённые операторы: заданные явно или по типу поля.
 
-        :param str operator: Оператор фильтрации.
-        :return: Подтверждённый оператор.
-        :raises HTTPException: Если оператор не разрешён.
+        :return: Множество значений разрешённых операторов.
         """
         _type = get_origin(self.field_type) or self.field_type
         if self.operators:
             operators = self.operators
         else:
             operators = _TYPE_OPERATORS_MAP.get(_type, [])
-        if operator in operators:
-            return operator
-
-        raise HTTPException(
-            status.HTTP_422_UNPROCESSABLE_ENTITY,
-            OPERATOR_IS_NOT_ALLOWED_MESSAGE.format(operator=operator),
-        )
-
-    def __convert_value(self, value):
-        """
-        Преобразует переданное значение в тип поля.
-
-        :param value: Значение для преобразования.
-        :return: Преобразованное значение.
-        :raises HTTPException: Если значение не может быть преобразовано.
-        """
-        try:
-            _type = self.field_type
-            if get_origin(self.field_type) is list:
-                _type = get_args(self.field_type)[0]
-            return _type(value)
-        except Exception:
-            raise HTTPException(
-                status.HTTP_422_UNPROCESSABLE_ENTITY,
-                WRONG_VALUE_FORMAT_MESSAGE.format(value=value),
-            )
+        return frozenset(getattr(op, "value", op) for op in operators)
 
-    def __get_value(self, value):
+    def get_value_type(self):
         """
-        Получает значение после применения необходимых преобразований.
+        Получает тип скалярного значения (тип элемента для списков).
 
-        :param value: Значение для преобразования.
-        :return: Преобразованное значение.
-        :raises HTTPException: Если формат значения некорректен.
+        :return: Тип, к которому приводятся значения фильтра.
         """
-        if isinstance(value, list):
-            return list(map(self.__convert_value, value))
-        return self.__convert_value(value)
+        if get_origin(self.field_type) is list:
+            return get_args(self.field_type)[0]
+        return self.field_type
 
-    def __get_field_name(self, name):
+    def get_field_name(self, name):
         """
         Получает имя поля, заменяя символы вложенности, если это необходимо.
 
@@ -196,6 +364,19 @@ class FilterField:
             )
         )
 
+    def compile(self, name) -> CompiledFilterField:
+        """
+        Готовит неизменяемое описание поля для разбора запросов.
+
+        :param str name: Имя поля в запросе.
+        :return: CompiledFilterField: Скомпилированное поле.
+        """
+        return CompiledFilterField(
+            field_name=self.get_field_name(name),
+            operators=self.get_operators(),
+            converter=_build_converter(self.get_value_type()),
+        )
+
     def get_filter(self, name, operator, value):
         """
         Получает ответ фильтрации для поля.
@@ -205,11 +386,7 @@ class FilterField:
         :param value: Значение для фильтрации.
         :return: dict: Словарь, представляющий ответ фильтра.
         """
-        return FilterResponse(
-            field_name=self.__get_field_name(name),
-            operator=self.__get_operator(operator),
-            value=self.__get_value(value),
-        ).dict()
+        return self.compile(name).get_filter(operator, value)
 
 
 class SimpleFiltration(Base):
@@ -219,18 +396,166 @@ class SimpleFiltration(Base):
     :param str filter_: Строка фильтров, представляющая условия,
     по умолчанию Query(default="[]", alias="filters").
     :raises HTTPException: Если формат фильтра некорректен.
+
+    Стоимость разбора ограничена атрибутами `MAX_FILTER_BYTES`
+    (размер строки в байтах), `MAX_DEPTH` (вложенность групп) и
+    `MAX_LEAVES` (количество условий). По умолчанию это 64 КиБ, 16 и 256.
+    Значение None снимает ограничение, кроме вложенности: она не
+    превышает `MAX_DEPTH_LIMIT`.
+
+    Строка декодируется функцией `JSON_LOADS`. По умолчанию используется
+    бэкенд пакета (`jsonlib`): orjson или ujson, если они установлены,
+    иначе стандартный json.
+
+    Если задан `FILTER_CACHE_SIZE`, разобранные фильтры кэшируются
+    по исходной строке запроса в LRU-кэше подкласса. Из кэша
+    возвращается неизменяемое дерево: списки заменены кортежами,
+    словари — MappingProxyType.
+
+    `OBSERVER` (см. `instrumentation.FilterObserver`) получает время
+    этапов разбора и счётчики; без наблюдателя разбор не измеряется.
     """
     FILTER_FIELDS: Dict[str, FilterField] = {}
     LOGICAL_OPERATORS = {"and", "or"}
+    FILTER_CACHE_SIZE: int = 0
+    MAX_FILTER_BYTES: Optional[int] = 64 * 1024
+    MAX_DEPTH: Optional[int] = 16
+    MAX_LEAVES: Optional[int] = 256
+    JSON_LOADS: Optional[Callable[[str], Any]] = None
+    OBSERVER: Optional[FilterObserver] = None
+    _compiled_fields: Dict[str, CompiledFilterField] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """Компилирует поля фильтрации при объявлении подкласса."""
+        super().__init_subclass__(**kwargs)
+        cls._compiled_fields = cls.compile_fields()
+
+    @classmethod
+    def compile_fields(cls) -> Dict[str, CompiledFilterField]:
+        """
+        Компилирует FILTER_FIELDS в неизменяемые описания полей.
+
+        Некорректные записи пропускаются; о них сообщает
+        `get_config_errors`.
+
+        :return: Словарь скомпилированных полей по имени в запросе.
+        """
+        if not isinstance(cls.FILTER_FIELDS, Mapping):
+            return {}
+        return {
+            name: field.compile(name)
+            for name, field in cls.FILTER_FIELDS.items()
+            if isinstance(field, FilterField)
+        }
+
+    @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет FILTER_FIELDS, LOGICAL_OPERATORS и ограничения разбора.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors()
+        for attribute in (
+            "FILTER_CACHE_SIZE", "MAX_FILTER_BYTES", "MAX_DEPTH", "MAX_LEAVES",
+        ):
+            value = getattr(cls, attribute)
+            if value is not None and (
+                not isinstance(value, int) or value < 0
+            ):
+                errors.append(
+                    CONFIG_WRONG_LIMIT_MESSAGE.format(attribute=attribute),
+                )
+        if (
+            isinstance(cls.MAX_DEPTH, int)
+            and cls.MAX_DEPTH > MAX_DEPTH_LIMIT
+        ):
+            errors.append(CONFIG_DEPTH_ABOVE_LIMIT_MESSAGE.format(
+                limit=MAX_DEPTH_LIMIT,
+            ))
+        if cls.OBSERVER is not None and not isinstance(
+            cls.OBSERVER, FilterObserver,
+        ):
+            errors.append(CONFIG_WRONG_OBSERVER_MESSAGE)
+        unknown = set(cls.LOGICAL_OPERATORS) - {"and", "or"}
+        if unknown:
+            errors.append(CONFIG_UNKNOWN_LOGICAL_MESSAGE.format(
+                operators=sorted(unknown),
+            ))
+        if not isinstance(cls.FILTER_FIELDS, Mapping):
+            errors.append(CONFIG_NOT_MAPPING_MESSAGE.format(
+                attribute="FILTER_FIELDS",
+            ))
+            return errors
+
+        known = {operator.value for operator in FilterOperator}
+        for name, field in cls.FILTER_FIELDS.items():
+            if not isinstance(field, FilterField):
+                errors.append(CONFIG_NOT_FILTER_FIELD_MESSAGE.format(
+                    name=name,
+                ))
+                continue
+            operators = field.get_operators()
+            if not operators:
+                errors.append(CONFIG_NO_OPERATORS_MESSAGE.format(
+                    name=name, field_type=field.field_type,
+                ))
+            elif operators - known:
+                errors.append(CONFIG_UNKNOWN_OPERATORS_MESSAGE.format(
+                    name=name, operators=sorted(operators - known),
+                ))
+        return errors
+
+    @classmethod
+    def precompile(cls) -> None:
+        """
+        Перекомпилирует поля (на случай изменения FILTER_FIELDS после
+        объявления класса), создаёт кэш фильтров и зависимость.
+        """
+        cls._compiled_fields = cls.compile_fields()
+        cls._get_filter_cache()
+        super().precompile()
+
+    @classmethod
+    def _get_filter_cache(cls) -> Optional[LRUCache]:
+        """
+        Возвращает кэш разобранных фильтров текущего подкласса.
+
+        :return: LRUCache или None, если кэширование отключено.
+        """
+        if not cls.FILTER_CACHE_SIZE:
+            return None
+        cache = cls.__dict__.get("_filter_cache")
+        if cache is None:
+            cache = LRUCache(cls.FILTER_CACHE_SIZE)
+            cls._filter_cache = cache
+        return cache
 
     @classmethod
+    def cache_info(cls) -> Optional[CacheInfo]:
+        """
+        Возвращает статистику кэша фильтров подкласса.
+
+        :return: CacheInfo или None, если кэширование отключено.
+        """
+        cache = cls._get_filter_cache()
+        return cache.info() if cache is not None else None
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """Очищает кэш фильтров подкласса."""
+        cache = cls._get_filter_cache()
+        if cache is not None:
+            cache.clear()
+
+    @cached_per_class
     def as_dependency(cls):
         """Фабрика для создания зависимости"""
 
         async def wrapper(
             filter: str = Query(
                 default=None,
-                description=FILTRATION,
+                description=_get_filtration_description(),
                 example="""[["phone","has","7"]]""",
             ),
         ) -> "SimpleFiltration":
@@ -246,54 +571,199 @@ class SimpleFiltration(Base):
         (по умолчанию "[]").
         :raises HTTPException: Если формат фильтра некорректен.
         """
+        if filter_ is None:
+            filter_ = "[]"
+        observer = self.OBSERVER
+        cache = self._get_filter_cache()
+        if cache is not None:
+            filters = cache.get(filter_, _MISSING)
+            hit = filters is not _MISSING
+            if observer is not None:
+                observer.on_count(
+                    type(self), "cache_hit" if hit else "cache_miss",
+                )
+            if hit:
+                self.filters = filters
+                return
+
+        if observer is None:
+            filters = self.decode_filter(filter_)
+            filters = filters and self.parse_filter(filters)
+        else:
+            filters = self.__parse_observed(filter_, observer)
+
+        if cache is not None:
+            filters = _freeze_filters(filters)
+            cache.set(filter_, filters)
+        self.filters = filters
+
+    def __parse_observed(self, filter_: str, observer: FilterObserver):
+        """
+        Разбирает фильтр теми же методами, сообщая наблюдателю время
+        этапов и счётчики.
+
+        На время разбора `validate_field` и `convert_value` экземпляра
+        заменяются обёртками, суммирующими время по всем условиям.
+
+        :param str filter_: Строка фильтра.
+        :param observer: Наблюдатель.
+        :return: Разобранный фильтр.
+        :raises HTTPException: Если формат фильтра некорректен.
+        """
+        cls = type(self)
+        timer = observer.timer
+        timings = [0.0, 0.0]
+
+        def timed(index, method):
+            def wrapper(*args):
+                started = timer()
+                try:
+                    return method(*args)
+                finally:
+                    timings[index] += timer() - started
+
+            return wrapper
+
+        self.validate_field = timed(0, self.validate_field)
+        self.convert_value = timed(1, self.convert_value)
         try:
-            filter_ = json.loads(filter_)
-        except json.decoder.JSONDecodeError:
+            start = timer()
+            filters = self.decode_filter(filter_)
+            decoded = timer()
+            observer.on_span(cls, "json_decode", decoded - start)
+            filters = filters and self.parse_filter(filters)
+            observer.on_span(cls, "parse", timer() - decoded)
+        except HTTPException:
+            observer.on_count(cls, "errors")
+            raise
+        finally:
+            del self.validate_field, self.convert_value
+
+        observer.on_span(cls, "validate_field", timings[0])
+        observer.on_span(cls, "convert_value", timings[1])
+        leaves, depth = _measure_filters(filters)
+        observer.on_count(cls, "leaves", leaves)
+        observer.on_count(cls, "depth", depth)
+        return filters
+
+    def decode_filter(self, filter_: str) -> Any:
+        """
+        Декодирует строку фильтра функцией `JSON_LOADS`.
+
+        Бэкенды JSON по-разному ведут себя на глубокой вложенности:
+        стандартный json падает с RecursionError, ujson — с ошибкой
+        формата, orjson декодирует строку. Поэтому при ошибке
+        декодирования глубина скобок проверяется отдельно, и слишком
+        глубокий фильтр всегда отклоняется с FILTER_TOO_DEEP_MESSAGE.
+
+        :param str filter_: Строка фильтра.
+        :return: Декодированный фильтр.
+        :raises HTTPException: Если строка слишком длинная, вложенность
+        слишком глубокая или JSON некорректен.
+        """
+        self.__check_size(filter_)
+        loads = type(self).JSON_LOADS or jsonlib.loads
+        try:
+            return loads(filter_)
+        except jsonlib.DECODE_ERRORS:
+            max_depth = self.get_max_depth()
+            if (
+                isinstance(filter_, str)
+                and _measure_nesting(filter_) > max_depth
+            ):
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    FILTER_TOO_DEEP_MESSAGE.format(max_depth=max_depth),
+                )
             raise HTTPException(
                 status.HTTP_422_UNPROCESSABLE_ENTITY,
                 WRONG_FORMAT_MESSAGE,
             )
-        self.filters = filter_ and self.parse_filter(filter_)
+
+    @classmethod
+    def get_max_depth(cls) -> int:
+        """
+        Возвращает действующее ограничение вложенности групп.
+
+        :return: `MAX_DEPTH`, но не больше `MAX_DEPTH_LIMIT`.
+        """
+        if not cls.MAX_DEPTH:
+            return MAX_DEPTH_LIMIT
+        return min(cls.MAX_DEPTH, MAX_DEPTH_LIMIT)
+
+    def get_cache_key(self) -> Any:
+        """
+        Возвращает фильтры в каноническом виде для ключей кэша.
+
+        :return: FilterNode (см. `tree.canonical_tree`) или None.
+        """
+        from .tree import canonical_tree
+
+        return canonical_tree(self.as_tree(optimize=False))
+
+    def as_tree(self, optimize: bool = True):
+        """
+        Возвращает фильтры в виде дерева с явным приоритетом операторов.
+
+        :param bool optimize: Упростить дерево (см. `tree.optimize_tree`).
+        :return: FilterNode или None, если фильтров нет.
+        """
+        from .tree import build_tree, optimize_tree
+
+        tree = build_tree(self.filters)
+        return optimize_tree(tree) if optimize else tree
 
     def parse_filter(self, filter_: Union[List, str]) -> Union[dict, List]:
         """
         Парсит строку фильтра в используемый формат фильтра.
 
+        Обходит вложенные группы с помощью явного стека, без рекурсии,
+        и проверяет ограничения `MAX_DEPTH` и `MAX_LEAVES`.
+
         :param filter_: Фильтр для парсинга.
         :return: Парсированный фильтр в виде словаря или списка.
-        :raises HTTPException: Если формат фильтра некорректен.
+        :raises HTTPException: Если формат фильтра некорректен или
+        превышены ограничения.
         """
-
         if self.__is_simple_filter(filter_):
             return self.create_filter(filter_)
 
+        self.__check_group(filter_)
+        max_depth = self.get_max_depth()
         result = []
-        if self.__is_group_of_filters(filter_):
-            for operator_index in range(1, len(filter_), 2):
-                logical_operator = (
-                    filter_[operator_index]
-                    if (
-                        isinstance(filter_[operator_index], str)
-                        and filter_[operator_index] in self.LOGICAL_OPERATORS
-                    )
-                    else None
-                )
-                if not logical_operator:
-                    raise HTTPException(
-                        status.HTTP_422_UNPROCESSABLE_ENTITY,
-                        LOGICAL_OPERATOR_NOT_FOUND.format(
-                            operators=sorted(self.LOGICAL_OPERATORS),
-                            position=operator_index + 1,
-                        ),
-                    )
-                result.append(self.parse_filter(filter_[operator_index - 1]))
-                result.append(filter_[operator_index])
-            result.append(self.parse_filter(filter_[-1]))
-            return result
-        raise HTTPException(
-            status.HTTP_422_UNPROCESSABLE_ENTITY,
-            WRONG_FORMAT_MESSAGE,
-        )
+        stack = [(enumerate(filter_), result)]
+        leaves = 0
+        while stack:
+            items, group = stack[-1]
+            for index, item in items:
+                if index % 2:
+                    group.append(item)
+                elif self.__is_simple_filter(item):
+                    leaves += 1
+                    if self.MAX_LEAVES and leaves > self.MAX_LEAVES:
+                        raise HTTPException(
+                            status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            TOO_MANY_FILTERS_MESSAGE.format(
+                                max_leaves=self.MAX_LEAVES,
+                            ),
+                        )
+                    group.append(self.create_filter(item))
+                else:
+                    self.__check_group(item)
+                    if len(stack) >= max_depth:
+                        raise HTTPException(
+                            status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            FILTER_TOO_DEEP_MESSAGE.format(
+                                max_depth=max_depth,
+                            ),
+                        )
+                    subgroup = []
+                    group.append(subgroup)
+                    stack.append((enumerate(item), subgroup))
+                    break
+            else:
+                stack.pop()
+        return result
 
     def create_filter(self, filter_: List[str]) -> dict:
         """
@@ -302,15 +772,45 @@ class SimpleFiltration(Base):
         :param filter_: Список, представляющий условие фильтра
         [поле, оператор, значение].
         :return: Словарь, представляющий фильтр.
-        :raises HTTPException: Если поле не разрешено.
+        :raises HTTPException: Если поле или оператор не разрешены или
+        значение имеет неверный формат.
         """
         field, operator, value = filter_
-        if field not in self.FILTER_FIELDS:
+        compiled_field = self.validate_field(field, operator)
+        return {
+            "field_name": compiled_field.field_name,
+            "operator": FilterOperator(operator),
+            "value": self.convert_value(compiled_field, value),
+        }
+
+    def validate_field(self, field: str, operator) -> CompiledFilterField:
+        """
+        Проверяет, что поле и оператор разрешены.
+
+        :param str field: Имя поля из запроса.
+        :param str operator: Оператор фильтрации.
+        :return: Скомпилированное поле.
+        :raises HTTPException: Если поле или оператор не разрешены.
+        """
+        compiled_field = self._compiled_fields.get(field)
+        if compiled_field is None:
             raise HTTPException(
                 status.HTTP_422_UNPROCESSABLE_ENTITY,
                 FIELD_IS_NOT_ALLOWED_MESSAGE.format(field_name=field),
             )
-        return self.FILTER_FIELDS[field].get_filter(field, operator, value)
+        compiled_field.check_operator(operator)
+        return compiled_field
+
+    def convert_value(self, compiled_field: CompiledFilterField, value):
+        """
+        Приводит значение условия к типу поля.
+
+        :param compiled_field: Скомпилированное поле.
+        :param value: Значение из запроса.
+        :return: Преобразованное значение.
+        :raises HTTPException: Если значение имеет неверный формат.
+        """
+        return compiled_field.convert(value)
 
     def __is_simple_filter(self, filter_: List) -> bool:
         """
@@ -325,11 +825,52 @@ class SimpleFiltration(Base):
             and isinstance(filter_[0], str)
         )
 
-    def __is_group_of_filters(self, filter_: List) -> bool:
+    def __check_group(self, filter_: List) -> None:
         """
-        Проверяет, является ли фильтр простым фильтром.
+        Проверяет, что фильтр является группой фильтров, разделённых
+        логическими операторами.
 
         :param filter_: Фильтр для проверки.
-        :return: True, если это простой фильтр, иначе False.
+        :raises HTTPException: Если фильтр не является группой или
+        логический оператор не найден.
+        """
+        if not isinstance(filter_, list) or len(filter_) % 2 != 1:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                WRONG_FORMAT_MESSAGE,
+            )
+        for operator_index in range(1, len(filter_), 2):
+            operator = filter_[operator_index]
+            if not (
+                isinstance(operator, str)
+                and operator in self.LOGICAL_OPERATORS
+            ):
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    LOGICAL_OPERATOR_NOT_FOUND.format(
+                        operators=sorted(self.LOGICAL_OPERATORS),
+                        position=operator_index + 1,
+                    ),
+                )
+
+    def __check_size(self, filter_: str) -> None:
         """
-        return isinstance(filter_, list) and len(filter_) % 2 == 1
+        Проверяет размер строки фильтров до её декодирования.
+
+        :param filter_: Строка фильтров.
+        :raises HTTPException: Если размер превышает `MAX_FILTER_BYTES`.
+        """
+        max_bytes = self.MAX_FILTER_BYTES
+        if not max_bytes or not isinstance(filter_, str):
+            return
+        if (
+            len(filter_) > max_bytes
+            or (
+                len(filter_) * 4 > max_bytes
+                and len(filter_.encode("utf-8")) > max_bytes
+            )
+        ):
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                FILTER_TOO_LARGE_MESSAGE.format(max_bytes=max_bytes),
+            )
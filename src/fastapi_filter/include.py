@@ -1,27 +1,268 @@
-from typing import Set
+import re
+from functools import lru_cache
+from typing import (
+    Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional,
+    Sequence, Set, Tuple,
+)
 from enum import Enum
 from fastapi import Query, status, HTTPException
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
-from .base import Base
+from .base import Base, cached_per_class, get_schema_name
+from .cache import LRUCache
+from .filters import FilterField
+
+PATH_SEPARATOR = re.compile(
+    "|".join(map(re.escape, (FilterField.SWAP_NESTING_SIMBOL, "."))),
+)
+
+# Значение отсутствует в элементе.
+MISSING = object()
+
+# Значения, в которые нельзя спуститься по вложенному пути.
+SCALARS = (str, bytes, int, float, bool, type(None))
+
+# Значения, которые кодируются в JSON как есть; bytes сюда не входят.
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+PathTree = Dict[str, Optional["PathTree"]]
+
+CONFIG_INCLUDE_FIELDS_NOT_MAPPING_MESSAGE \
+    = "INCLUDE_FIELDS должен быть словарём."
+CONFIG_NOT_INCLUDE_FIELD_MESSAGE \
+    = "INCLUDE_FIELDS['{name}'] не является IncludeField."
+CONFIG_WRONG_PROJECTION_CACHE_SIZE_MESSAGE \
+    = "PROJECTION_CACHE_SIZE должен быть неотрицательным целым числом."
 
 
 class IncludeField(BaseModel):
     alias: str
 
 
+@lru_cache(maxsize=None)
+def _get_item_kind(cls: type) -> int:
+    """
+    Определяет способ чтения полей элемента по его типу: 0 — Mapping,
+    1 — скаляр, 2 — атрибуты. Проверка `Mapping` через ABC медленная,
+    поэтому результат кэшируется.
+    """
+    if issubclass(cls, Mapping):
+        return 0
+    return 1 if issubclass(cls, SCALARS) else 2
+
+
+def get_key(item: Any, key: str) -> Any:
+    """
+    Получает значение ключа словаря или атрибута объекта.
+
+    :param item: Словарь, другой Mapping или объект.
+    :param str key: Ключ или имя атрибута.
+    :return: Значение или `MISSING`, если его нет.
+    """
+    kind = _get_item_kind(type(item))
+    if kind == 0:
+        return item.get(key, MISSING)
+    return MISSING if kind == 1 else getattr(item, key, MISSING)
+
+
+def _compile_projector(
+    tree: PathTree,
+    convert: Optional[Callable[[Any], Any]] = None,
+) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Создаёт функцию, превращающую элемент в словарь только с путями
+    из дерева.
+
+    Элементом может быть словарь, другой Mapping или объект с
+    атрибутами. Вложенные пути применяются к объектам и к каждому
+    нескалярному элементу списка; скалярное значение по вложенному пути
+    отбрасывается. Значения, взятые целиком, кроме скаляров JSON,
+    проходят через `convert`.
+    """
+    fields = tuple(
+        (
+            key,
+            _compile_projector(subtree, convert)
+            if subtree is not None else None,
+        )
+        for key, subtree in tree.items()
+    )
+
+    def project(item):
+        kind = _get_item_kind(type(item))
+        if kind == 1:
+            return {}
+        get = item.get if kind == 0 else None
+        result = {}
+        for key, project_value in fields:
+            value = (
+                get(key, MISSING) if get is not None
+                else getattr(item, key, MISSING)
+            )
+            if value is MISSING:
+                continue
+            if project_value is None:
+                result[key] = (
+                    value if convert is None or type(value) in _JSON_SCALARS
+                    else convert(value)
+                )
+            elif isinstance(value, (list, tuple)):
+                result[key] = [
+                    project_value(element) for element in value
+                    if not isinstance(element, SCALARS)
+                ]
+            elif not isinstance(value, SCALARS):
+                result[key] = project_value(value)
+        return result
+
+    if convert is not None or any(project for _, project in fields):
+        return project
+
+    keys = tuple(tree)
+
+    def project_flat(item):
+        if type(item) is dict:
+            return {key: item[key] for key in keys if key in item}
+        return project(item)
+
+    return project_flat
+
+
+def compile_pruner(tree: PathTree) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Создаёт функцию, оставляющую в элементе только пути из дерева.
+
+    Значения не копируются и не кодируются. Используется `PythonEngine`
+    для проекции строк.
+
+    :param tree: Дерево путей `{ключ: поддерево | None}`; None — значение
+    берётся целиком.
+    :return: Функция отсечения.
+    """
+    return _compile_projector(tree)
+
+
+def compile_serializer(tree: PathTree) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Создаёт функцию, превращающую элемент в JSON-совместимый словарь
+    только с путями из дерева.
+
+    Отбор путей такой же, как в `compile_pruner`. Скалярные значения
+    переносятся как есть, остальные выбранные значения кодируются
+    `jsonable_encoder`; невыбранные поля не читаются и не кодируются.
+    Используется `IncludeResponse` и выгрузкой (`export`).
+
+    :param tree: Дерево путей `{ключ: поддерево | None}`; None — значение
+    берётся целиком.
+    :return: Функция сериализации.
+    """
+    return _compile_projector(tree, jsonable_encoder)
+
+
+def _iter_paths(tree: PathTree, prefix: str = ""):
+    for key, subtree in tree.items():
+        if subtree is None:
+            yield prefix + key
+        else:
+            yield from _iter_paths(subtree, f"{prefix}{key}.")
+
+
+class Projection(NamedTuple):
+    """
+    Проекция по включаемым полям.
+
+    Строится по префиксному дереву путей: путь, покрытый родительским
+    полем, отбрасывается, поэтому `teams` и `teams.name` дают только
+    `teams`.
+
+    :param Tuple[str] paths: Пути через точку.
+    :param PathTree tree: Дерево путей `{ключ: поддерево | None}`.
+    :param Tuple[str] columns: Поля верхнего уровня — список столбцов
+    для SQL.
+    :param dict mongo: Проекция MongoDB.
+    :param Callable prune: Функция отсечения словаря (см.
+    `compile_pruner`).
+    :param Callable serialize: Функция сериализации элемента (см.
+    `compile_serializer`).
+    """
+    paths: Tuple[str, ...]
+    tree: PathTree
+    columns: Tuple[str, ...]
+    mongo: Dict[str, int]
+    prune: Callable[[dict], Dict[str, Any]]
+    serialize: Callable[[Any], Dict[str, Any]]
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[Sequence[str]]) -> "Projection":
+        """
+        Строит проекцию по путям.
+
+        :param paths: Пути в виде последовательностей ключей.
+        :return: Projection: Проекция.
+        """
+        tree: PathTree = {}
+        for path in sorted(set(map(tuple, paths)), key=lambda path: (
+            len(path), path,
+        )):
+            node = tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+                if node is None:
+                    break
+            else:
+                node[path[-1]] = None
+        flat_paths = tuple(_iter_paths(tree))
+        return cls(
+            paths=flat_paths,
+            tree=tree,
+            columns=tuple(tree),
+            mongo=dict.fromkeys(flat_paths, 1),
+            prune=compile_pruner(tree),
+            serialize=compile_serializer(tree),
+        )
+
+
 class SimpleInclude(Base):
     INCLUDE_FIELDS = {}
+    PROJECTION_CACHE_SIZE = 128
 
     @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет INCLUDE_FIELDS.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors()
+        if not isinstance(cls.INCLUDE_FIELDS, Mapping):
+            errors.append(CONFIG_INCLUDE_FIELDS_NOT_MAPPING_MESSAGE)
+            return errors
+        errors.extend(
+            CONFIG_NOT_INCLUDE_FIELD_MESSAGE.format(name=name)
+            for name, field in cls.INCLUDE_FIELDS.items()
+            if not isinstance(field, IncludeField)
+        )
+        size = cls.PROJECTION_CACHE_SIZE
+        if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+            errors.append(CONFIG_WRONG_PROJECTION_CACHE_SIZE_MESSAGE)
+        return errors
+
+    @cached_per_class
+    def _get_projection_cache(cls) -> LRUCache:
+        """Кэш проекций по набору включаемых полей"""
+        return LRUCache(cls.PROJECTION_CACHE_SIZE)
+
+    @cached_per_class
     def _get_include_fields_enum(cls) -> Enum:
         """Динамически создает Enum из ключей INCLUDE_FIELDS"""
         return Enum(
-            "IncludeFields",
+            get_schema_name(cls, "IncludeFields"),
             {field: field for field in cls.INCLUDE_FIELDS.keys()},
+            module=cls.__module__,
         )
 
-    @classmethod
+    @cached_per_class
     def as_dependency(cls):
         """Фабрика для создания зависимости"""
         IncludeFieldsEnum = cls._get_include_fields_enum()
@@ -37,7 +278,7 @@ class SimpleInclude(Base):
             ),
         ) -> "SimpleInclude":
 
-            return cls(fields={field.name for field in include_fields})
+            return cls(fields={field.name for field in include_fields or ()})
 
         return wrapper
 
@@ -55,3 +296,32 @@ class SimpleInclude(Base):
             ]
         else:
             self.fields = None
+
+    def get_cache_key(self) -> Optional[Tuple[str, ...]]:
+        """
+        Возвращает поля для включения в ответ для ключей кэша.
+
+        :return: Отсортированные имена полей или None.
+        """
+        return tuple(sorted(self.fields)) if self.fields else None
+
+    def get_projection(self) -> Optional[Projection]:
+        """
+        Возвращает проекцию по включаемым полям.
+
+        Псевдонимы разбиваются на ключи по "." и "->". Проекции
+        кэшируются для класса по набору полей.
+
+        :return: Projection или None, если нужны все поля.
+        """
+        if not self.fields:
+            return None
+        cache = self._get_projection_cache()
+        key = frozenset(self.fields)
+        projection = cache.get(key)
+        if projection is None:
+            projection = Projection.from_paths(
+                PATH_SEPARATOR.split(field) for field in key
+            )
+            cache.set(key, projection)
+        return projection
@@ -0,0 +1,114 @@
+import time
+from threading import Lock
+from typing import Callable, Dict, NamedTuple, Tuple
+
+PHASES = ("json_decode", "parse", "validate_field", "convert_value")
+
+
+class FilterObserver:
+    """
+    Наблюдатель за разбором фильтров.
+
+    Подключается атрибутом `SimpleFiltration.OBSERVER`. Для каждого
+    разобранного фильтра вызывается `on_span` с длительностью этапов
+    `PHASES` (`parse` включает `validate_field` и `convert_value`,
+    а те — суммы по всем условиям) и `on_count` со счётчиками `leaves`,
+    `depth`, `cache_hit`, `cache_miss` и `errors`. Методы по умолчанию
+    ничего не делают.
+
+    :param Callable timer: Источник времени в секундах.
+    """
+    timer: Callable[[], float] = time.perf_counter
+
+    def on_span(self, filtration: type, phase: str, duration: float) -> None:
+        """
+        Получает длительность этапа разбора.
+
+        :param type filtration: Класс фильтрации.
+        :param str phase: Этап разбора.
+        :param float duration: Длительность в секундах.
+        """
+
+    def on_count(self, filtration: type, name: str, value: int = 1) -> None:
+        """
+        Получает значение счётчика.
+
+        :param type filtration: Класс фильтрации.
+        :param str name: Имя счётчика.
+        :param int value: Прирост счётчика.
+        """
+
+
+class PhaseStats(NamedTuple):
+    """
+    Статистика этапа.
+
+    :param int count: Количество измерений.
+    :param float total: Суммарная длительность в секундах.
+    :param float max: Наибольшая длительность в секундах.
+    """
+    count: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        """Средняя длительность в секундах."""
+        return self.total / self.count if self.count else 0.0
+
+
+class PerfCounterObserver(FilterObserver):
+    """
+    Наблюдатель, собирающий статистику в памяти процесса.
+
+    Длительности измеряются `time.perf_counter` и агрегируются по
+    классу фильтрации и этапу; счётчики суммируются.
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустую статистику."""
+        self._lock = Lock()
+        self._spans: Dict[Tuple[str, str], PhaseStats] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def on_span(self, filtration: type, phase: str, duration: float) -> None:
+        key = (filtration.__qualname__, phase)
+        with self._lock:
+            stats = self._spans.get(key)
+            if stats is None:
+                self._spans[key] = PhaseStats(1, duration, duration)
+            else:
+                self._spans[key] = PhaseStats(
+                    stats.count + 1,
+                    stats.total + duration,
+                    max(stats.max, duration),
+                )
+
+    def on_count(self, filtration: type, name: str, value: int = 1) -> None:
+        key = (filtration.__qualname__, name)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + value
+
+    def spans(self) -> Dict[Tuple[str, str], PhaseStats]:
+        """
+        Возвращает статистику этапов.
+
+        :return: Статистика по паре (класс фильтрации, этап).
+        """
+        with self._lock:
+            return dict(self._spans)
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """
+        Возвращает счётчики.
+
+        :return: Значения по паре (класс фильтрации, счётчик).
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        """Сбрасывает статистику."""
+        with self._lock:
+            self._spans.clear()
+            self._counts.clear()
@@ -0,0 +1,69 @@
+import json
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+UNKNOWN_BACKEND_MESSAGE = "JSON-бэкенд '{name}' недоступен."
+
+# Ошибки orjson и ujson наследуются от ValueError, как и
+# json.JSONDecodeError; RecursionError возникает на глубокой вложенности.
+DECODE_ERRORS = (ValueError, RecursionError)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _ujson_dumps(obj: Any) -> bytes:
+    return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _get_backends() -> Dict[str, Tuple[Callable, Callable]]:
+    """
+    Собирает доступные бэкенды JSON в порядке предпочтения.
+
+    :return: Словарь {имя: (loads, dumps)}.
+    """
+    backends = {}
+    if orjson is not None:
+        backends["orjson"] = (orjson.loads, orjson.dumps)
+    if ujson is not None:
+        backends["ujson"] = (ujson.loads, _ujson_dumps)
+    backends["json"] = (json.loads, _json_dumps)
+    return backends
+
+
+BACKENDS = _get_backends()
+
+BACKEND: str
+loads: Callable[[Any], Any]
+dumps: Callable[[Any], bytes]
+
+
+def use_backend(name: Optional[str] = None) -> None:
+    """
+    Выбирает бэкенд JSON для всего пакета.
+
+    :param str name: "orjson", "ujson" или "json". Если не передано,
+    выбирается самый быстрый из установленных.
+    :raises ValueError: Если бэкенд не установлен.
+    """
+    global BACKEND, loads, dumps
+    name = name or next(iter(BACKENDS))
+    if name not in BACKENDS:
+        raise ValueError(UNKNOWN_BACKEND_MESSAGE.format(name=name))
+    BACKEND = name
+    loads, dumps = BACKENDS[name]
+
+
+use_backend()
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Optional
+
+from opentelemetry import metrics
+
+from .instrumentation import FilterObserver
+
+# Счётчики, значения которых — размеры одного фильтра, а не приросты.
+_DISTRIBUTIONS = ("leaves", "depth")
+
+
+class OpenTelemetryObserver(FilterObserver):
+    """
+    Наблюдатель, записывающий метрики OpenTelemetry.
+
+    Длительности этапов записываются в гистограмму
+    `fastapi_filter.filter.duration` (секунды) с атрибутами `filtration`
+    и `phase`; `leaves` и `depth` — в гистограммы
+    `fastapi_filter.filter.<имя>`, остальные счётчики — в счётчики
+    с тем же именованием.
+
+    :param Meter meter: Meter OpenTelemetry. По умолчанию
+    `metrics.get_meter("fastapi_filter")`.
+    """
+
+    def __init__(self, meter: Optional[Any] = None) -> None:
+        """
+        Создаёт инструменты метрик.
+
+        :param meter: Meter OpenTelemetry.
+        """
+        self.meter = meter or metrics.get_meter("fastapi_filter")
+        self._duration = self.meter.create_histogram(
+            "fastapi_filter.filter.duration",
+            unit="s",
+            description="Длительность этапов разбора фильтра.",
+        )
+        self._instruments: Dict[str, Any] = {
+            name: self.meter.create_histogram(f"fastapi_filter.filter.{name}")
+            for name in _DISTRIBUTIONS
+        }
+
+    def on_span(self, filtration: type, phase: str, duration: float) -> None:
+        self._duration.record(duration, {
+            "filtration": filtration.__qualname__,
+            "phase": phase,
+        })
+
+    def on_count(self, filtration: type, name: str, value: int = 1) -> None:
+        instrument = self._instruments.get(name)
+        attributes = {"filtration": filtration.__qualname__}
+        if name in _DISTRIBUTIONS:
+            instrument.record(value, attributes)
+            return
+        if instrument is None:
+            instrument = self.meter.create_counter(
+                f"fastapi_filter.filter.{name}",
+            )
+            self._instruments[name] = instrument
+        instrument.add(value, attributes)
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from typing import (
+    Any, Awaitable, Callable, Generic, Hashable, List, Optional, Set,
+    TypeVar, Union,
+)
+
+from pydantic.generics import GenericModel
+
+from .cache import CacheInfo, LRUCache
+from .filters import SimpleFiltration
+from .pagination import CursorPagination, SimplePagination
+from .search import SimpleSearch
+from .sort import SimpleSort
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+FetchPage = Callable[..., Awaitable[List[Any]]]
+Count = Callable[..., Awaitable[int]]
+
+
+class Page(GenericModel, Generic[T]):
+    """
+    Страница результатов с общим количеством строк.
+
+    Используется как `response_model=Page[Модель]`.
+
+    :param List[T] items: Элементы страницы.
+    :param int total: Общее количество строк или None, если оно не
+    запрашивалось.
+    :param bool total_is_estimate: `total` — приближённое значение.
+    :param int offset: Смещение страницы (для `SimplePagination`).
+    :param int limit: Размер страницы.
+    :param str next_cursor: Курсор следующей страницы (для
+    `CursorPagination`).
+    """
+    items: List[T]
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    offset: Optional[int] = None
+    limit: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class CountCache:
+    """
+    Кэш общего количества строк с ограниченным временем жизни.
+
+    Ключ строится по каноническому дереву фильтров (см.
+    `tree.canonical_tree`) и поисковому запросу, поэтому запросы,
+    отличающиеся только порядком или повторами условий, а также
+    пагинацией и сортировкой, делят одну запись.
+
+    :param float ttl: Время жизни записи в секундах.
+    :param int maxsize: Максимальное количество записей.
+    :param Callable timer: Источник времени, по умолчанию
+    `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        maxsize: int = 1024,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Инициализирует пустой кэш.
+
+        :param ttl: Время жизни записи в секундах.
+        :param maxsize: Максимальное количество записей.
+        :param timer: Источник времени.
+        """
+        self.ttl = ttl
+        self.timer = timer
+        self._cache = LRUCache(maxsize)
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def get_key(
+        filtration: Optional[SimpleFiltration] = None,
+        search: Optional[SimpleSearch] = None,
+    ) -> Optional[Hashable]:
+        """
+        Строит ключ кэша.
+
+        :param filtration: Фильтрация.
+        :param search: Поиск.
+        :return: Хешируемый ключ или None, если значения фильтров
+        не хешируемы.
+        """
+        key = (
+            type(filtration) if filtration is not None else None,
+            filtration.get_cache_key() if filtration is not None else None,
+            search.get_cache_key() if search is not None else None,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """
+        Получает количество, если запись ещё не устарела.
+
+        :param key: Ключ кэша.
+        :return: Количество или None.
+        """
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= self.timer():
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: int) -> None:
+        """
+        Сохраняет количество.
+
+        :param key: Ключ кэша.
+        :param int value: Количество строк.
+        """
+        self._cache.set(key, (self.timer() + self.ttl, value))
+
+    def refresh(self, key: Hashable, count: Awaitable[int]) -> None:
+        """
+        Запускает фоновый подсчёт, если для ключа он ещё не идёт.
+
+        :param key: Ключ кэша.
+        :param count: Корутина подсчёта.
+        """
+        if key in self._refreshing:
+            count.close()
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(key, count))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: Hashable, count: Awaitable[int]) -> None:
+        try:
+            self.set(key, await count)
+        except Exception:
+            # Ошибку некому получить: в ответе уже оценка, а запись
+            # остаётся прежней до следующей попытки.
+            logger.exception("Background count for %r failed.", key)
+        finally:
+            self._refreshing.discard(key)
+
+    def info(self) -> CacheInfo:
+        """
+        Возвращает статистику кэша.
+
+        :return: CacheInfo: Попадания, промахи, размер и заполненность.
+        """
+        return self._cache.info()
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self._cache.clear()
+
+
+async def _gather(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    Выполняет awaitables параллельно; при ошибке одного отменяет
+    остальные и дожидается их завершения.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def paginate(
+    fetch_page: FetchPage,
+    count: Optional[Count] = None,
+    filtration: Optional[SimpleFiltration] = None,
+    sort: Optional[SimpleSort] = None,
+    pagination: Union[SimplePagination, CursorPagination, None] = None,
+    search: Optional[SimpleSearch] = None,
+    count_cache: Optional[CountCache] = None,
+    estimate: Optional[Count] = None,
+) -> Page:
+    """
+    Получает страницу и общее количество строк одновременно.
+
+    `fetch_page` вызывается с именованными аргументами `filtration`,
+    `sort`, `pagination` и `search`, `count` и `estimate` — с
+    `filtration` и `search`. Запрос страницы и подсчёт выполняются
+    параллельно; если один из них завершился ошибкой, второй
+    отменяется.
+
+    С `count_cache` точное количество берётся из кэша, пока запись
+    не устарела. Если при промахе передан `estimate` (например, оценка
+    планировщика вместо `COUNT(*)`), возвращается оценка, а точное
+    значение считается в фоне и попадает в кэш для следующих запросов.
+
+    :param fetch_page: Асинхронная функция получения элементов страницы.
+    :param count: Асинхронная функция подсчёта строк. Если не передана,
+    `total` остаётся None.
+    :param filtration: Фильтрация.
+    :param sort: Сортировка.
+    :param pagination: Пагинация.
+    :param search: Поиск.
+    :param count_cache: Кэш количества строк.
+    :param estimate: Асинхронная функция приближённого подсчёта.
+    :return: Page: Страница результатов.
+    """
+    filters = {"filtration": filtration, "search": search}
+    key = count_cache.get_key(**filters) if count_cache is not None else None
+    page = fetch_page(sort=sort, pagination=pagination, **filters)
+    total = None
+    total_is_estimate = False
+    total_awaitable = None
+
+    if count is not None:
+        if key is not None:
+            total = count_cache.get(key)
+        if total is None and key is not None and estimate is not None:
+            count_cache.refresh(key, count(**filters))
+            total_awaitable = estimate(**filters)
+            total_is_estimate = True
+        elif total is None:
+            total_awaitable = count(**filters)
+
+    if total_awaitable is not None:
+        items, total = await _gather(page, total_awaitable)
+        if key is not None and not total_is_estimate:
+            count_cache.set(key, total)
+    else:
+        items = await page
+
+    if isinstance(pagination, CursorPagination):
+        return Page(
+            items=items,
+            total=total,
+            total_is_estimate=total_is_estimate,
+            limit=pagination.limit,
+            next_cursor=pagination.get_next_cursor(items, sort),
+        )
+    return Page(
+        items=items,
+        total=total,
+        total_is_estimate=total_is_estimate,
+        offset=pagination.offset if pagination is not None else None,
+        limit=pagination.limit if pagination is not None else None,
+    )
@@ -1,6 +1,103 @@
-from fastapi import Query
+import base64
+import binascii
+import hashlib
+import hmac
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import (
+    Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence,
+    Tuple, Type,
+)
+from uuid import UUID
 
-from .base import Base
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+
+from . import jsonlib
+from .base import Base, cached_per_class
+from .sort import Order, SimpleSort
+
+WRONG_CURSOR_MESSAGE = "Курсор имеет неверный формат."
+CURSOR_SORT_MISMATCH_MESSAGE = "Курсор не соответствует сортировке."
+SECRET_KEY_REQUIRED_MESSAGE = "Не задан CursorPagination.SECRET_KEY."
+NULL_SORT_VALUE_MESSAGE = (
+    "Поле {field} последней строки страницы равно None: "
+    "keyset-пагинация возможна только по полям без NULL."
+)
+CONFIG_WRONG_LIMITS_MESSAGE \
+    = "LIMIT_DEFAULT и LIMIT_MAX должны быть положительными целыми числами."
+CONFIG_LIMIT_DEFAULT_ABOVE_MAX_MESSAGE = "LIMIT_DEFAULT больше LIMIT_MAX."
+CONFIG_WRONG_OFFSET_MESSAGE \
+    = "OFFSET должен быть неотрицательным целым числом."
+CONFIG_NO_TIEBREAKER_MESSAGE = "Не задан TIEBREAKER_FIELD."
+
+
+# Значения курсора, которые JSON не сохраняет, кодируются как
+# `{"$type": тег, "value": строка}`. Порядок важен: datetime — подкласс
+# date. Типы, которых нет в списке, передаются через `jsonable_encoder`
+# без тега.
+_CURSOR_TYPES: Tuple[
+    Tuple[str, Type, Callable[[Any], str], Callable[[str], Any]], ...
+] = (
+    ("datetime", datetime, datetime.isoformat, datetime.fromisoformat),
+    ("date", date, date.isoformat, date.fromisoformat),
+    ("time", time, time.isoformat, time.fromisoformat),
+    (
+        "timedelta", timedelta,
+        lambda value: repr(value.total_seconds()),
+        lambda value: timedelta(seconds=float(value)),
+    ),
+    ("decimal", Decimal, str, Decimal),
+    ("uuid", UUID, str, UUID),
+)
+_CURSOR_DECODERS: Dict[str, Callable[[str], Any]] = {
+    tag: decode for tag, _, _, decode in _CURSOR_TYPES
+}
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    """
+    Кодирует значение поля для курсора с сохранением типа.
+
+    :param value: Значение поля последней строки.
+    :return: JSON-совместимое значение.
+    """
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    for tag, type_, encode, _ in _CURSOR_TYPES:
+        if isinstance(value, type_):
+            return {"$type": tag, "value": encode(value)}
+    return jsonable_encoder(value)
+
+
+def _decode_cursor_value(value: Any) -> Any:
+    """
+    Восстанавливает значение поля из курсора.
+
+    :param value: Значение из курсора.
+    :return: Значение исходного типа.
+    :raises ValueError: Если тег типа неизвестен или значение повреждено.
+    """
+    if not isinstance(value, dict):
+        return value
+    decode = _CURSOR_DECODERS.get(value.get("$type"))
+    if decode is None or not isinstance(value.get("value"), str):
+        raise ValueError(value)
+    return decode(value["value"])
+
+
+def _get_limit_errors(cls) -> List[str]:
+    """
+    Проверяет LIMIT_DEFAULT и LIMIT_MAX класса пагинации.
+
+    :return: Список описаний найденных ошибок.
+    """
+    limits = (cls.LIMIT_DEFAULT, cls.LIMIT_MAX)
+    if not all(isinstance(value, int) and value > 0 for value in limits):
+        return [CONFIG_WRONG_LIMITS_MESSAGE]
+    if cls.LIMIT_DEFAULT > cls.LIMIT_MAX:
+        return [CONFIG_LIMIT_DEFAULT_ABOVE_MAX_MESSAGE]
+    return []
 
 
 class SimplePagination(Base):
@@ -22,6 +119,18 @@ class SimplePagination(Base):
     LIMIT_MAX = 100
 
     @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет OFFSET, LIMIT_DEFAULT и LIMIT_MAX.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors() + _get_limit_errors(cls)
+        if not isinstance(cls.OFFSET, int) or cls.OFFSET < 0:
+            errors.append(CONFIG_WRONG_OFFSET_MESSAGE)
+        return errors
+
+    @cached_per_class
     def as_dependency(cls):
         """Фабрика для создания зависимости"""
 
@@ -55,3 +164,265 @@ class SimplePagination(Base):
         """
         self.offset = offset
         self.limit = limit
+
+    def get_cache_key(self) -> Tuple[int, int]:
+        """
+        Возвращает смещение и размер страницы для ключей кэша.
+
+        :return: Пара (смещение, размер страницы).
+        """
+        return self.offset, self.limit
+
+
+class Seek(NamedTuple):
+    """
+    Условие keyset-пагинации для бэкендов.
+
+    Строки должны быть упорядочены по `fields`; следующая страница
+    начинается со строк, которые идут строго после `values`, то есть
+    `WHERE (поле, ..., тайбрейкер) > (значение, ...)` с учётом
+    направления сортировки каждого поля.
+
+    :param Tuple fields: Пары (поле, порядок сортировки); последнее поле —
+    уникальный тайбрейкер.
+    :param Tuple values: Значения полей последней строки предыдущей
+    страницы или None для первой страницы.
+    """
+    fields: Tuple[Tuple[str, Order], ...]
+    values: Optional[Tuple[Any, ...]]
+
+
+def _get_value(item: Any, field: str) -> Any:
+    """
+    Получает значение поля строки по пути через точку.
+
+    :param item: Словарь или объект.
+    :param str field: Имя поля.
+    :return: Значение поля.
+    """
+    value = item
+    for key in field.split("."):
+        if isinstance(value, Mapping):
+            value = value[key]
+        else:
+            value = getattr(value, key)
+    return value
+
+
+class CursorPagination(Base):
+    """
+    Класс для keyset-пагинации по курсору.
+
+    Курсор — непрозрачный подписанный токен со значениями полей
+    сортировки и уникального тайбрейкера последней строки страницы.
+    В отличие от `offset`, база данных не перебирает пропущенные
+    строки, поэтому глубокие страницы не дороже первых.
+
+    Поля сортировки и тайбрейкер не должны содержать NULL: условие
+    `WHERE (поле, ...) > (значение, ...)` не выполняется для NULL, и
+    такие строки были бы пропущены. Если None оказывается в последней
+    строке страницы, `get_next_cursor` и `get_next_page` выбрасывают
+    ValueError вместо курсора, после которого страницы пусты.
+
+    :param str cursor: Курсор следующей страницы или None для первой.
+    :param int limit: Максимальное количество элементов на странице.
+    """
+
+    SECRET_KEY: Optional[str] = None
+    TIEBREAKER_FIELD = "id"
+    LIMIT_DEFAULT = 10
+    LIMIT_MAX = 100
+
+    @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет SECRET_KEY, TIEBREAKER_FIELD и ограничения страницы.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors() + _get_limit_errors(cls)
+        if not cls.SECRET_KEY:
+            errors.append(SECRET_KEY_REQUIRED_MESSAGE)
+        if not cls.TIEBREAKER_FIELD:
+            errors.append(CONFIG_NO_TIEBREAKER_MESSAGE)
+        return errors
+
+    @cached_per_class
+    def as_dependency(cls):
+        """Фабрика для создания зависимости"""
+
+        async def wrapper(
+            cursor: Optional[str] = Query(
+                default=None,
+                description="Курсор следующей страницы",
+            ),
+            limit: int = Query(
+                default=cls.LIMIT_DEFAULT,
+                le=cls.LIMIT_MAX,
+                description="Количество возвращаемых элементов",
+            ),
+        ) -> "CursorPagination":
+
+            return cls(cursor=cursor, limit=limit)
+
+        return wrapper
+
+    def __init__(self, cursor: Optional[str] = None, limit: int = 10):
+        """
+        Инициализирует параметры пагинации.
+
+        :param str cursor: Курсор следующей страницы.
+        :param int limit: Максимальное количество элементов на странице.
+        :raises HTTPException: Если курсор повреждён или подделан.
+        """
+        self.limit = limit
+        self.after = self.decode_cursor(cursor) if cursor else None
+
+    def get_cache_key(self) -> Tuple[int, Optional[Tuple[Tuple, Tuple]]]:
+        """
+        Возвращает размер страницы и позицию курсора для ключей кэша.
+
+        :return: Пара (размер страницы, содержимое курсора).
+        """
+        return self.limit, self.after
+
+    @classmethod
+    def _sign(cls, payload: bytes) -> bytes:
+        if not cls.SECRET_KEY:
+            raise RuntimeError(SECRET_KEY_REQUIRED_MESSAGE)
+        return hmac.new(
+            cls.SECRET_KEY.encode("utf-8"), payload, hashlib.sha256,
+        ).digest()[:16]
+
+    @classmethod
+    def encode_cursor(cls, fields, values) -> str:
+        """
+        Создаёт подписанный курсор.
+
+        Даты, время, Decimal и UUID сохраняются с тегом типа и
+        восстанавливаются в `decode_cursor` исходного типа, поэтому
+        курсор по такому полю сравнивается бэкендом корректно.
+
+        :param fields: Пары (поле, порядок сортировки).
+        :param values: Значения полей последней строки.
+        :return: str: Курсор.
+        """
+        payload = jsonlib.dumps([
+            [[field, str(order)] for field, order in fields],
+            [_encode_cursor_value(value) for value in values],
+        ])
+        return ".".join(
+            base64.urlsafe_b64encode(part).rstrip(b"=").decode("ascii")
+            for part in (payload, cls._sign(payload))
+        )
+
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> Tuple[Tuple, Tuple]:
+        """
+        Проверяет подпись курсора и извлекает его содержимое.
+
+        :param str cursor: Курсор.
+        :return: Поля сортировки и значения последней строки.
+        :raises HTTPException: Если курсор повреждён или подделан.
+        """
+        try:
+            payload, signature = (
+                base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+                for part in cursor.split(".")
+            )
+            if not hmac.compare_digest(signature, cls._sign(payload)):
+                raise ValueError(cursor)
+            fields, values = jsonlib.loads(payload)
+            fields = tuple((field, Order(order)) for field, order in fields)
+            if len(fields) != len(values):
+                raise ValueError(cursor)
+            values = [_decode_cursor_value(value) for value in values]
+        except (ValueError, TypeError, ArithmeticError, binascii.Error):
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                WRONG_CURSOR_MESSAGE,
+            )
+        return fields, tuple(values)
+
+    def get_fields(
+        self,
+        sort: Optional[SimpleSort] = None,
+    ) -> Tuple[Tuple[str, Order], ...]:
+        """
+        Получает поля упорядочивания страницы: поля сортировки и
+        уникальный тайбрейкер.
+
+        :param sort: Сортировка.
+        :return: Пары (поле, порядок сортировки).
+        """
+        fields = list(sort.fields) if sort is not None else []
+        if all(field != self.TIEBREAKER_FIELD for field, _ in fields):
+            order = fields[0][1] if fields else Order.asc
+            fields.append((self.TIEBREAKER_FIELD, order))
+        return tuple(fields)
+
+    def get_seek(self, sort: Optional[SimpleSort] = None) -> Seek:
+        """
+        Получает условие keyset-пагинации для бэкенда.
+
+        :param sort: Сортировка, с которой выдавался курсор.
+        :return: Seek: Поля упорядочивания и значения курсора.
+        :raises HTTPException: Если курсор выдан для другой сортировки.
+        """
+        fields = self.get_fields(sort)
+        if self.after is None:
+            return Seek(fields, None)
+        cursor_fields, values = self.after
+        if cursor_fields != fields:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                CURSOR_SORT_MISMATCH_MESSAGE,
+            )
+        return Seek(fields, values)
+
+    def get_next_cursor(
+        self,
+        items: Sequence[Any],
+        sort: Optional[SimpleSort] = None,
+    ) -> Optional[str]:
+        """
+        Создаёт курсор следующей страницы по последнему элементу.
+
+        :param items: Элементы текущей страницы (словари или объекты).
+        :param sort: Сортировка, с которой получена страница.
+        :return: Курсор или None, если страница последняя.
+        :raises ValueError: Если поле упорядочивания последнего элемента
+        равно None.
+        """
+        page = self.get_next_page(items, sort)
+        return None if page is None else self.encode_cursor(*page.after)
+
+    def get_next_page(
+        self,
+        items: Sequence[Any],
+        sort: Optional[SimpleSort] = None,
+    ) -> Optional["CursorPagination"]:
+        """
+        Создаёт пагинацию следующей страницы по последнему элементу.
+
+        В отличие от `get_next_cursor`, позиция не кодируется в курсор,
+        поэтому подходит для обхода всех страниц на сервере (см.
+        `export.iter_batches`) и не требует SECRET_KEY.
+
+        :param items: Элементы текущей страницы (словари или объекты).
+        :param sort: Сортировка, с которой получена страница.
+        :return: Пагинация с тем же размером страницы или None, если
+        страница последняя.
+        :raises ValueError: Если поле упорядочивания последнего элемента
+        равно None.
+        """
+        if not items or len(items) < self.limit:
+            return None
+        fields = self.get_fields(sort)
+        values = tuple(_get_value(items[-1], field) for field, _ in fields)
+        for (field, _), value in zip(fields, values):
+            if value is None:
+                raise ValueError(NULL_SORT_VALUE_MESSAGE.format(field=field))
+        page = type(self)(limit=self.limit)
+        page.after = fields, values
+        return page
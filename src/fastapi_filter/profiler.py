@@ -0,0 +1,304 @@
+import logging
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import (
+    Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple,
+)
+
+from fastapi import APIRouter, Query
+
+from .filters import SimpleFiltration
+from .sort import SimpleSort
+from .tree import FilterGroup, FilterNode
+
+logger = logging.getLogger(__name__)
+
+SLOW_FILTER_MESSAGE = "Slow filter shape %r: %.3f s."
+WRONG_CAPACITY_MESSAGE = "capacity должен быть не меньше 1."
+
+
+def _get_node_shape(node: FilterNode) -> str:
+    if isinstance(node, FilterGroup):
+        return "(" + f" {node.operator} ".join(
+            sorted(_get_children_shapes(node.operator, node.children)),
+        ) + ")"
+    operator = node.operator.value
+    if isinstance(node.value, tuple):
+        return f"{node.field_name} {operator} [?]"
+    return f"{node.field_name} {operator} ?"
+
+
+def _get_children_shapes(
+    operator: str,
+    children: Tuple[FilterNode, ...],
+) -> Iterator[str]:
+    for child in children:
+        if isinstance(child, FilterGroup) and child.operator == operator:
+            yield from _get_children_shapes(operator, child.children)
+        else:
+            yield _get_node_shape(child)
+
+
+def get_shape(
+    filtration: Optional[SimpleFiltration] = None,
+    sort: Optional[SimpleSort] = None,
+) -> str:
+    """
+    Получает форму запроса: дерево фильтров без значений.
+
+    Значения заменяются на `?` (списки — на `[?]`), вложенные группы
+    с тем же оператором раскрываются, условия групп упорядочиваются.
+    Дерево не упрощается: упрощение зависит от значений, а запросы,
+    отличающиеся только значениями, должны иметь одну форму. Если
+    передана сортировка, к форме добавляются поля сортировки, так как
+    они тоже влияют на выбор индекса.
+
+    :param filtration: Фильтрация.
+    :param sort: Сортировка.
+    :return: str: Форма, например `(age gt ? and name eq ?)`.
+    """
+    tree = (
+        filtration.as_tree(optimize=False) if filtration is not None
+        else None
+    )
+    shape = _get_node_shape(tree) if tree is not None else "*"
+    if sort is not None and sort.fields:
+        shape += " order by " + ", ".join(
+            f"{field} {order.value}" for field, order in sort.fields
+        )
+    return shape
+
+
+class HeavyHitter(NamedTuple):
+    """
+    Элемент с наибольшим весом.
+
+    :param key: Элемент.
+    :param float weight: Оценка веса сверху.
+    :param float error: Наибольшая возможная переоценка веса.
+    """
+    key: Hashable
+    weight: float
+    error: float
+
+
+class SpaceSaving:
+    """
+    Приближённый подсчёт самых тяжёлых элементов потока (алгоритм
+    Space-Saving) в ограниченной памяти.
+
+    Хранится не более `capacity` элементов. Новый элемент при
+    заполнении вытесняет самый лёгкий и наследует его вес как
+    погрешность, поэтому любой элемент с весом больше
+    `суммарный вес / capacity` гарантированно присутствует.
+
+    :param int capacity: Количество отслеживаемых элементов.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Инициализирует пустую структуру.
+
+        :param capacity: Количество отслеживаемых элементов.
+        :raises ValueError: Если `capacity` меньше 1.
+        """
+        if capacity < 1:
+            raise ValueError(WRONG_CAPACITY_MESSAGE)
+        self.capacity = capacity
+        self.total = 0.0
+        self._counters: Dict[Hashable, List[float]] = {}
+
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        """
+        Добавляет вес элементу.
+
+        :param key: Элемент.
+        :param float weight: Неотрицательный вес.
+        """
+        self.total += weight
+        counter = self._counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self._counters) < self.capacity:
+            self._counters[key] = [weight, 0.0]
+            return
+        lightest = min(self._counters, key=lambda item: (
+            self._counters[item][0]
+        ))
+        minimum = self._counters.pop(lightest)[0]
+        self._counters[key] = [minimum + weight, minimum]
+
+    def top(self, limit: Optional[int] = None) -> List[HeavyHitter]:
+        """
+        Возвращает самые тяжёлые элементы.
+
+        :param int limit: Количество элементов; по умолчанию все.
+        :return: Элементы по убыванию веса.
+        """
+        hitters = sorted(
+            (
+                HeavyHitter(key, weight, error)
+                for key, (weight, error) in self._counters.items()
+            ),
+            key=lambda hitter: hitter.weight,
+            reverse=True,
+        )
+        return hitters[:limit]
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class FilterProfiler:
+    """
+    Профилировщик форм запросов.
+
+    Для каждой формы (см. `get_shape`) учитываются частота и суммарное
+    время выполнения, сообщённое вызывающим кодом через `measure` или
+    `record`. Память ограничена: формы хранятся в двух структурах
+    `SpaceSaving` — по количеству запросов и по времени. Запросы
+    дольше `slow_threshold` записываются в журнал
+    `fastapi_filter.profiler` с уровнем WARNING.
+
+    :param int capacity: Количество отслеживаемых форм.
+    :param float slow_threshold: Порог медленного запроса в секундах;
+    None отключает журнал.
+    :param Callable timer: Источник времени, по умолчанию
+    `time.perf_counter`.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100,
+        slow_threshold: Optional[float] = None,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """
+        Инициализирует профилировщик.
+
+        :param capacity: Количество отслеживаемых форм.
+        :param slow_threshold: Порог медленного запроса в секундах.
+        :param timer: Источник времени.
+        """
+        self.capacity = capacity
+        self.slow_threshold = slow_threshold
+        self.timer = timer
+        self._lock = Lock()
+        self.frequent = SpaceSaving(capacity)
+        self.slow = SpaceSaving(capacity)
+
+    def record(
+        self,
+        duration: float,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+    ) -> str:
+        """
+        Учитывает выполненный запрос.
+
+        :param float duration: Время выполнения в секундах.
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        :return: str: Форма запроса.
+        """
+        shape = get_shape(filtration, sort)
+        with self._lock:
+            self.frequent.add(shape)
+            self.slow.add(shape, duration)
+        if self.slow_threshold is not None and duration > self.slow_threshold:
+            logger.warning(SLOW_FILTER_MESSAGE, shape, duration)
+        return shape
+
+    @contextmanager
+    def measure(
+        self,
+        filtration: Optional[SimpleFiltration] = None,
+        sort: Optional[SimpleSort] = None,
+    ) -> Iterator[None]:
+        """
+        Измеряет время выполнения блока и учитывает его для формы
+        запроса, в том числе если блок завершился исключением.
+
+        Пример::
+
+            with profiler.measure(filtration, sort):
+                rows = await session.execute(statement)
+
+        :param filtration: Фильтрация.
+        :param sort: Сортировка.
+        """
+        start = self.timer()
+        try:
+            yield
+        finally:
+            self.record(self.timer() - start, filtration, sort)
+
+    def top_frequent(self, limit: Optional[int] = None) -> List[HeavyHitter]:
+        """
+        Возвращает самые частые формы.
+
+        :param int limit: Количество форм.
+        :return: Формы по убыванию количества запросов.
+        """
+        with self._lock:
+            return self.frequent.top(limit)
+
+    def top_slow(self, limit: Optional[int] = None) -> List[HeavyHitter]:
+        """
+        Возвращает формы с наибольшим суммарным временем.
+
+        :param int limit: Количество форм.
+        :return: Формы по убыванию суммарного времени в секундах.
+        """
+        with self._lock:
+            return self.slow.top(limit)
+
+    def reset(self) -> None:
+        """Удаляет накопленную статистику."""
+        with self._lock:
+            self.frequent = SpaceSaving(self.capacity)
+            self.slow = SpaceSaving(self.capacity)
+
+
+def get_router(profiler: FilterProfiler, **kwargs) -> APIRouter:
+    """
+    Создаёт маршруты для просмотра статистики профилировщика.
+
+    `GET /filter-shapes?order=slow|frequent&limit=N` возвращает формы
+    с оценкой веса (количество запросов или секунды) и погрешностью.
+    Маршруты раскрывают структуру запросов, поэтому их стоит
+    подключать только во внутреннем API.
+
+    :param profiler: Профилировщик.
+    :param kwargs: Аргументы `APIRouter`, например `prefix` или
+    `dependencies` для авторизации.
+    :return: APIRouter: Маршрутизатор.
+    """
+    router = APIRouter(**kwargs)
+
+    @router.get("/filter-shapes")
+    async def get_filter_shapes(
+        order: str = Query(default="slow", pattern="^(slow|frequent)$"),
+        limit: int = Query(default=20, ge=1, le=profiler.capacity),
+    ):
+        if order == "slow":
+            hitters, total = profiler.top_slow(limit), profiler.slow.total
+        else:
+            hitters = profiler.top_frequent(limit)
+            total = profiler.frequent.total
+        return {
+            "order": order,
+            "total": total,
+            "shapes": [
+                {
+                    "shape": hitter.key,
+                    "weight": hitter.weight,
+                    "error": hitter.error,
+                }
+                for hitter in hitters
+            ],
+        }
+
+    return router
@@ -0,0 +1,89 @@
+from typing import Any, Callable, Mapping, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from starlette.background import BackgroundTask
+
+from . import jsonlib
+from .include import SimpleInclude
+from .page import Page
+
+
+def serialize_include(
+    content: Any,
+    include: Optional[SimpleInclude] = None,
+) -> Any:
+    """
+    Превращает результат запроса в JSON-совместимые данные с учётом
+    включаемых полей.
+
+    Сериализатор берётся из проекции `include` (см.
+    `SimpleInclude.get_projection`) и кэшируется для каждого набора
+    полей. Поля применяются к каждому элементу списка или к элементам
+    `Page.items`; одиночный элемент сериализуется целиком по проекции.
+    Без включаемых полей используется `jsonable_encoder`.
+
+    :param content: Элемент, список элементов или `Page`.
+    :param include: Включаемые поля.
+    :return: JSON-совместимые данные.
+    """
+    projection = include.get_projection() if include is not None else None
+    if projection is None:
+        return jsonable_encoder(content)
+    return _serialize(content, projection.serialize)
+
+
+def _serialize(content: Any, serialize: Callable[[Any], dict]) -> Any:
+    if isinstance(content, (list, tuple)):
+        return list(map(serialize, content))
+    if isinstance(content, Page):
+        result = jsonable_encoder(content, exclude={"items"})
+        result["items"] = list(map(serialize, content.items))
+        return result
+    return serialize(content)
+
+
+class IncludeResponse(Response):
+    """
+    Ответ JSON, содержащий только запрошенные включаемые поля.
+
+    Элементы не проходят валидацию `response_model` и полное
+    кодирование `jsonable_encoder`: читаются и кодируются только поля
+    из `include` (см. `serialize_include`), результат кодируется
+    бэкендом `jsonlib`.
+
+    :param content: Элемент, список элементов или `Page`.
+    :param SimpleInclude include: Включаемые поля.
+    :param int status_code: Код ответа.
+    :param Mapping headers: Заголовки ответа.
+    :param BackgroundTask background: Фоновая задача.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        include: Optional[SimpleInclude] = None,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        background: Optional[BackgroundTask] = None,
+    ) -> None:
+        """
+        Инициализирует ответ.
+
+        :param content: Элемент, список элементов или `Page`.
+        :param include: Включаемые поля.
+        :param status_code: Код ответа.
+        :param headers: Заголовки ответа.
+        :param background: Фоновая задача.
+        """
+        self.include = include
+        super().__init__(
+            content,
+            status_code=status_code,
+            headers=headers,
+            background=background,
+        )
+
+    def render(self, content: Any) -> bytes:
+        return jsonlib.dumps(serialize_include(content, self.include))
@@ -1,7 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, Query
 
-from .base import Base
+from .base import Base, cached_per_class
+
+CONFIG_NO_SEARCH_FIELDS_MESSAGE = "SEARCH_FIELDS не заданы."
+CONFIG_WRONG_SEARCH_FIELDS_MESSAGE = "SEARCH_FIELDS должен быть списком строк."
 
 
 class SimpleSearch(Base):
@@ -20,6 +23,22 @@ class SimpleSearch(Base):
     SEARCH_FIELDS: List[str] = []
 
     @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет SEARCH_FIELDS.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors()
+        if not cls.SEARCH_FIELDS:
+            errors.append(CONFIG_NO_SEARCH_FIELDS_MESSAGE)
+        elif isinstance(cls.SEARCH_FIELDS, str) or not all(
+            isinstance(field, str) for field in cls.SEARCH_FIELDS
+        ):
+            errors.append(CONFIG_WRONG_SEARCH_FIELDS_MESSAGE)
+        return errors
+
+    @cached_per_class
     def as_dependency(cls):
         """Фабрика для создания зависимости"""
 
@@ -55,3 +74,13 @@ class SimpleSearch(Base):
         else:
             self.value = None
             self.fields = None
+
+    def get_cache_key(self) -> Optional[Tuple[Tuple[str, ...], str]]:
+        """
+        Возвращает поля и строку поиска для ключей кэша.
+
+        :return: Пара (поля, строка) или None, если поиска нет.
+        """
+        if not self.value:
+            return None
+        return tuple(self.fields), self.value
@@ -0,0 +1,214 @@
+import re
+from bisect import bisect_left
+from threading import Lock
+from typing import (
+    Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union,
+)
+
+from .engines.python import PythonEngine
+from .search import SimpleSearch
+
+WRONG_NGRAM_MESSAGE = "ngram должен быть положительным целым числом или None."
+
+_TOKEN = re.compile(r"\w+")
+
+# Граничный символ: текст дополняется им с обеих сторон, поэтому
+# короткие тексты тоже дают n-граммы, а запрос короче n всегда
+# содержится хотя бы в одной n-грамме совпадающего текста.
+_PAD = "\x00"
+
+
+def _intersect(postings: List[List[int]]) -> List[int]:
+    """
+    Пересекает отсортированные списки вхождений.
+
+    Кандидаты берутся из самого короткого списка и ищутся в остальных
+    двоичным поиском от позиции предыдущей находки.
+
+    :param postings: Отсортированные списки номеров документов.
+    :return: Отсортированный список номеров, входящих во все списки.
+    """
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        if not result:
+            break
+        found = []
+        low = 0
+        for number in result:
+            low = bisect_left(other, number, low)
+            if low == len(other):
+                break
+            if other[low] == number:
+                found.append(number)
+        result = found
+    return list(result)
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс для `SimpleSearch` по документам в памяти.
+
+    В режиме n-грамм (по умолчанию, `ngram=3`) индекс отвечает так же,
+    как поиск бэкендов: документ подходит, если строка запроса без учёта
+    регистра входит в значение хотя бы одного поля. Кандидаты
+    находятся пересечением отсортированных списков вхождений n-грамм
+    запроса и затем проверяются на вхождение подстроки.
+
+    При `ngram=None` индексируются слова целиком, а документ подходит,
+    если в нём есть все слова запроса. Такой индекс меньше, но не
+    находит части слов.
+
+    Документы добавляются и удаляются по ключу; результаты поиска
+    возвращаются в порядке добавления. Индекс потокобезопасен.
+
+    :param Sequence[str] fields: Поля документа, обычно `SEARCH_FIELDS`.
+    Вложенные поля задаются через точку, как в `PythonEngine`.
+    :param int ngram: Длина n-грамм или None для индекса слов.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        ngram: Optional[int] = 3,
+    ) -> None:
+        """
+        Инициализирует пустой индекс.
+
+        :param fields: Поля документа.
+        :param ngram: Длина n-грамм или None для индекса слов.
+        """
+        if ngram is not None and ngram < 1:
+            raise ValueError(WRONG_NGRAM_MESSAGE)
+        self.fields = list(fields)
+        self.ngram = ngram
+        engine = PythonEngine()
+        self._getters = [engine.get_getter(field) for field in self.fields]
+        self._postings: Dict[str, List[int]] = {}
+        self._numbers: Dict[Hashable, int] = {}
+        self._documents: Dict[int, Tuple[Hashable, Tuple[str, ...]]] = {}
+        self._next_number = 0
+        self._lock = Lock()
+
+    @classmethod
+    def for_search(
+        cls,
+        search_class: type,
+        documents: Iterable[Tuple[Hashable, Any]] = (),
+        ngram: Optional[int] = 3,
+    ) -> "SearchIndex":
+        """
+        Создаёт индекс по `SEARCH_FIELDS` класса поиска.
+
+        :param search_class: Подкласс `SimpleSearch`.
+        :param documents: Пары (ключ, документ) для начального заполнения.
+        :param ngram: Длина n-грамм или None для индекса слов.
+        :return: SearchIndex: Заполненный индекс.
+        """
+        index = cls(search_class.SEARCH_FIELDS, ngram=ngram)
+        for key, document in documents:
+            index.add(key, document)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._numbers
+
+    def add(self, key: Hashable, document: Any) -> None:
+        """
+        Добавляет документ или заменяет документ с тем же ключом.
+
+        :param key: Ключ документа, например его id.
+        :param document: Словарь или объект.
+        """
+        texts = tuple(self._get_texts(document))
+        terms = {term for text in texts for term in self._get_terms(text)}
+        with self._lock:
+            self._remove(key)
+            number = self._next_number
+            self._next_number += 1
+            self._numbers[key] = number
+            self._documents[number] = (key, texts)
+            for term in terms:
+                self._postings.setdefault(term, []).append(number)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Удаляет документ; отсутствующий ключ игнорируется.
+
+        :param key: Ключ документа.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def search(self, search: Union[SimpleSearch, str, None]) -> List[Hashable]:
+        """
+        Находит документы по запросу.
+
+        :param search: Экземпляр `SimpleSearch` или строка запроса.
+        :return: Ключи подходящих документов в порядке добавления; при
+        пустом запросе — все документы.
+        """
+        value = search.value if isinstance(search, SimpleSearch) else search
+        with self._lock:
+            if not value:
+                numbers = sorted(self._documents)
+            elif self.ngram is None:
+                numbers = self._search_words(value)
+            else:
+                numbers = self._search_ngrams(value.casefold())
+            return [self._documents[number][0] for number in numbers]
+
+    def _search_words(self, value: str) -> List[int]:
+        terms = set(self._get_terms(value.casefold()))
+        postings = [self._postings.get(term, []) for term in terms]
+        return _intersect(postings) if postings else []
+
+    def _search_ngrams(self, value: str) -> List[int]:
+        if len(value) < self.ngram:
+            # Запрос короче n-граммы входит в текст, только если входит
+            # в одну из его n-грамм; такие n-граммы ищутся в словаре.
+            numbers = set()
+            for term, posting in self._postings.items():
+                if value in term:
+                    numbers.update(posting)
+            return sorted(numbers)
+        terms = {
+            value[index:index + self.ngram]
+            for index in range(len(value) - self.ngram + 1)
+        }
+        postings = [self._postings.get(term, []) for term in terms]
+        return [
+            number for number in _intersect(postings)
+            if any(value in text for text in self._documents[number][1])
+        ]
+
+    def _remove(self, key: Hashable) -> None:
+        number = self._numbers.pop(key, None)
+        if number is None:
+            return
+        _, texts = self._documents.pop(number)
+        for term in {term for text in texts for term in self._get_terms(text)}:
+            posting = self._postings[term]
+            del posting[bisect_left(posting, number)]
+            if not posting:
+                del self._postings[term]
+
+    def _get_texts(self, document: Any) -> Iterable[str]:
+        for get in self._getters:
+            value = get(document)
+            for item in value if isinstance(value, list) else (value,):
+                if isinstance(item, str):
+                    yield item.casefold()
+
+    def _get_terms(self, text: str) -> Iterable[str]:
+        if self.ngram is None:
+            return _TOKEN.findall(text)
+        padding = _PAD * (self.ngram - 1)
+        text = f"{padding}{text}{padding}"
+        return (
+            text[index:index + self.ngram]
+            for index in range(len(text) - self.ngram + 1)
+        )
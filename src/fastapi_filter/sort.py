@@ -1,9 +1,18 @@
 from enum import Enum
-from typing import Type, Optional
+from typing import List, Mapping, Optional, Tuple, Type
 
 from fastapi import HTTPException, Query, status
 
-from .base import Base
+from .base import Base, cached_per_class, get_schema_name
+
+WRONG_SORT_ORDER_MESSAGE = "Неверный порядок сортировки '{order}'."
+TOO_MANY_SORT_FIELDS_MESSAGE \
+    = "Сортировка более чем по {max_fields} полям не разрешена."
+CONFIG_SORT_FIELDS_NOT_MAPPING_MESSAGE = "SORT_FIELDS должен быть словарём."
+CONFIG_NOT_SORT_FIELD_MESSAGE \
+    = "SORT_FIELDS['{name}'] не является SortField."
+CONFIG_WRONG_MAX_SORT_FIELDS_MESSAGE \
+    = "MAX_SORT_FIELDS должен быть положительным целым числом."
 
 
 class Order(str, Enum):
@@ -65,25 +74,71 @@ class SimpleSort(Base):
     (по возрастанию или по убыванию). Проверяет, что переданное поле для
     сортировки разрешено, и задаёт порядок сортировки.
 
+    Сортировка по нескольким полям задаётся списком `sort` из значений
+    вида `поле:asc` или `поле:desc`, не более `MAX_SORT_FIELDS` полей.
+    Если задан `TIEBREAKER_FIELD` (псевдоним уникального поля), он
+    добавляется последним, чтобы порядок строк был однозначным.
+
     :param str sort_field: Поле для сортировки. По умолчанию None.
     :param Order sort_order: Порядок сортировки (asc или desc).
     По умолчанию **asc**.
+    :param List[str] sort: Поля сортировки вида `поле:порядок`.
     :raises HTTPException: Если сортировка по переданному полю не разрешена.
     """
 
     SORT_FIELDS = {}
+    MAX_SORT_FIELDS = 3
+    TIEBREAKER_FIELD: Optional[str] = None
+    SORT_SEPARATOR = ":"
 
     @classmethod
+    def get_config_errors(cls) -> List[str]:
+        """
+        Проверяет SORT_FIELDS и MAX_SORT_FIELDS.
+
+        :return: Список описаний найденных ошибок.
+        """
+        errors = super().get_config_errors()
+        if not isinstance(cls.SORT_FIELDS, Mapping):
+            errors.append(CONFIG_SORT_FIELDS_NOT_MAPPING_MESSAGE)
+        else:
+            errors.extend(
+                CONFIG_NOT_SORT_FIELD_MESSAGE.format(name=name)
+                for name, field in cls.SORT_FIELDS.items()
+                if not isinstance(field, SortField)
+            )
+        if not isinstance(cls.MAX_SORT_FIELDS, int) \
+                or cls.MAX_SORT_FIELDS < 1:
+            errors.append(CONFIG_WRONG_MAX_SORT_FIELDS_MESSAGE)
+        return errors
+
+    @cached_per_class
     def _get_sort_fields_enum(cls) -> Type[Enum]:
-        """Динамически создает Enum из ключей INCLUDE_FIELDS"""
+        """Динамически создает Enum из ключей SORT_FIELDS"""
         return Enum(
-            "IncludeFields",
+            get_schema_name(cls, "SortFields"),
             {field: field for field in cls.SORT_FIELDS.keys()},
+            module=cls.__module__,
         )
 
-    @classmethod
+    @cached_per_class
+    def _get_sort_enum(cls) -> Type[Enum]:
+        """Динамически создает Enum значений `поле:порядок`"""
+        values = [
+            f"{field}{cls.SORT_SEPARATOR}{order}"
+            for field in cls.SORT_FIELDS.keys()
+            for order in Order
+        ]
+        return Enum(
+            get_schema_name(cls, "Sort"),
+            {value: value for value in values},
+            module=cls.__module__,
+        )
+
+    @cached_per_class
     def as_dependency(cls):
         SortFieldsEnum = cls._get_sort_fields_enum()
+        SortEnum = cls._get_sort_enum()
 
         async def wrapper(
             sort_field: SortFieldsEnum = Query(
@@ -96,9 +151,20 @@ class SimpleSort(Base):
                 description="Порядок сортировки.",
                 default=Order.asc,
             ),
+            sort: List[SortEnum] = Query(       # type: ignore
+                default=None,
+                description=(
+                    "Сортировать по нескольким полям, "
+                    f"не более {cls.MAX_SORT_FIELDS}."
+                ),
+            ),
         ) -> "SimpleSort":
 
-            return cls(sort_field=sort_field.value, sort_order=sort_order)
+            return cls(
+                sort_field=sort_field and sort_field.value,
+                sort_order=sort_order,
+                sort=sort and [item.value for item in sort],
+            )
 
         return wrapper
 
@@ -106,6 +172,7 @@ class SimpleSort(Base):
         self,
         sort_field,
         sort_order,
+        sort: Optional[List[str]] = None,
     ) -> None:
         """
         Инициализирует параметры сортировки.
@@ -114,18 +181,56 @@ class SimpleSort(Base):
         проверяется, разрешено ли сортировать по этому полю.
         :param Order sort_order: Порядок сортировки. Может быть 'asc'
         (по возрастанию) или 'desc' (по убыванию). По умолчанию **asc**.
+        :param List[str] sort: Дополнительные поля сортировки вида
+        `поле:порядок`.
         :raises HTTPException: Если переданное поле для сортировки не
         разрешено, выбрасывается исключение с кодом 422.
         """
+        requested = []
         if sort_field:
-            sort_class = self.SORT_FIELDS.get(sort_field)
+            requested.append((sort_field, sort_order))
+        for item in sort or []:
+            field, _, order = str(item).rpartition(self.SORT_SEPARATOR)
+            if order not in Order.__members__:
+                raise HTTPException(
+                    status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    WRONG_SORT_ORDER_MESSAGE.format(order=order),
+                )
+            requested.append((field, Order(order)))
+
+        fields = []
+        for field, order in requested:
+            sort_class = self.SORT_FIELDS.get(field)
             if not sort_class:
                 raise HTTPException(
                     status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    f"Sort by field '{sort_field}' is not allowed.",
+                    f"Sort by field '{field}' is not allowed.",
                 )
-            self.field = sort_class.alias
-            self.order = sort_order
+            if all(alias != sort_class.alias for alias, _ in fields):
+                fields.append((sort_class.alias, order))
+        if len(fields) > self.MAX_SORT_FIELDS:
+            raise HTTPException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                TOO_MANY_SORT_FIELDS_MESSAGE.format(
+                    max_fields=self.MAX_SORT_FIELDS,
+                ),
+            )
+
+        if fields:
+            self.field, self.order = fields[0]
         else:
             self.field = None
             self.order = None
+        if self.TIEBREAKER_FIELD and all(
+            alias != self.TIEBREAKER_FIELD for alias, _ in fields
+        ):
+            fields.append((self.TIEBREAKER_FIELD, self.order or Order.asc))
+        self.fields = fields
+
+    def get_cache_key(self) -> Tuple[Tuple[str, Order], ...]:
+        """
+        Возвращает поля сортировки для ключей кэша.
+
+        :return: Пары (поле, порядок сортировки).
+        """
+        return tuple(self.fields)
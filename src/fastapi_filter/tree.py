@@ -0,0 +1,335 @@
+from typing import (
+    Any, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union,
+)
+
+from .filters import FilterOperator
+
+AND = "and"
+OR = "or"
+
+_LOWER_BOUNDS = {FilterOperator.gt, FilterOperator.gte}
+_UPPER_BOUNDS = {FilterOperator.lt, FilterOperator.lte}
+
+
+class FilterCondition(NamedTuple):
+    """
+    Условие фильтрации — лист дерева.
+
+    :param str field_name: Имя поля.
+    :param FilterOperator operator: Оператор фильтрации.
+    :param Any value: Значение; списки хранятся кортежами, поэтому
+    условие хешируемо.
+    """
+    field_name: str
+    operator: FilterOperator
+    value: Any
+
+
+class FilterGroup(NamedTuple):
+    """
+    Группа условий, объединённых одним логическим оператором.
+
+    :param str operator: Логический оператор "and" или "or".
+    :param Tuple children: Дочерние узлы.
+    """
+    operator: str
+    children: Tuple["FilterNode", ...]
+
+
+FilterNode = Union[FilterCondition, FilterGroup]
+
+
+def _freeze_value(value):
+    """
+    Приводит значение к хешируемому виду.
+
+    :param value: Значение условия.
+    :return: Значение, в котором списки заменены кортежами.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_value(item) for item in value)
+    return value
+
+
+def _build_condition(filter_: Mapping) -> FilterCondition:
+    return FilterCondition(
+        field_name=filter_["field_name"],
+        operator=FilterOperator(filter_["operator"]),
+        value=_freeze_value(filter_["value"]),
+    )
+
+
+def _group(operator: str, children: List[FilterNode]) -> FilterNode:
+    if len(children) == 1:
+        return children[0]
+    return FilterGroup(operator, tuple(children))
+
+
+def _combine(filters, nodes: List[FilterNode]) -> FilterNode:
+    """
+    Объединяет узлы группы с учётом приоритета: "and" связывает
+    сильнее, чем "or".
+
+    :param filters: Группа `[условие, "and", условие, ...]`.
+    :param nodes: Узлы, построенные из условий группы.
+    :return: Узел группы.
+    """
+    alternatives = []
+    conjunction = [nodes[0]]
+    for index, node in enumerate(nodes[1:], 1):
+        if filters[2 * index - 1] == OR:
+            alternatives.append(_group(AND, conjunction))
+            conjunction = [node]
+        else:
+            conjunction.append(node)
+    alternatives.append(_group(AND, conjunction))
+    return _group(OR, alternatives)
+
+
+def build_tree(filters) -> Optional[FilterNode]:
+    """
+    Строит дерево из результата `SimpleFiltration.parse_filter`.
+
+    Плоский список `[условие, "and", условие, "or", условие]`
+    разбирается с учётом приоритета: "and" связывает сильнее, чем "or".
+    Вложенные группы обходятся с помощью явного стека, без рекурсии.
+
+    :param filters: Разобранные фильтры (словарь, список или кортеж).
+    :return: Корневой узел или None, если фильтров нет.
+    """
+    if not filters:
+        return None
+    if isinstance(filters, Mapping):
+        return _build_condition(filters)
+
+    result = []
+    stack = [(filters, iter(filters[::2]), [])]
+    while stack:
+        group, items, nodes = stack[-1]
+        for item in items:
+            if not item:
+                nodes.append(None)
+            elif isinstance(item, Mapping):
+                nodes.append(_build_condition(item))
+            else:
+                stack.append((item, iter(item[::2]), []))
+                break
+        else:
+            stack.pop()
+            node = _combine(group, nodes)
+            (stack[-1][2] if stack else result).append(node)
+    return result[0]
+
+
+def _reduce_tree(node: FilterNode, leaf, combine):
+    """
+    Обходит дерево снизу вверх с помощью явного стека, без рекурсии.
+
+    :param node: Корневой узел дерева.
+    :param leaf: Функция, преобразующая условие.
+    :param combine: Функция `(группа, результаты дочерних узлов)`,
+    преобразующая группу.
+    :return: Результат для корневого узла.
+    """
+    if not isinstance(node, FilterGroup):
+        return leaf(node)
+
+    result = []
+    stack = [(node, iter(node.children), [])]
+    while stack:
+        group, items, children = stack[-1]
+        for child in items:
+            if isinstance(child, FilterGroup):
+                stack.append((child, iter(child.children), []))
+                break
+            children.append(leaf(child))
+        else:
+            stack.pop()
+            reduced = combine(group, children)
+            (stack[-1][2] if stack else result).append(reduced)
+    return result[0]
+
+
+def _flatten(operator: str, children) -> List[FilterNode]:
+    result = []
+    for child in children:
+        if isinstance(child, FilterGroup) and child.operator == operator:
+            result.extend(child.children)
+        else:
+            result.append(child)
+    return result
+
+
+def _deduplicate(children: List[FilterNode]) -> List[FilterNode]:
+    try:
+        return list(dict.fromkeys(children))
+    except TypeError:
+        return children
+
+
+def _get_any_values(node: FilterNode) -> Optional[Tuple[Any, ...]]:
+    """
+    Получает значения условия, если оно проверяет совпадение с любым
+    из значений: `eq` со скалярным значением или `contains_any`.
+    """
+    if not isinstance(node, FilterCondition):
+        return None
+    if node.operator == FilterOperator.contains_any:
+        return node.value if isinstance(node.value, tuple) else None
+    if (
+        node.operator == FilterOperator.eq
+        and not isinstance(node.value, tuple)
+    ):
+        return (node.value,)
+    return None
+
+
+def _merge_equalities(children: List[FilterNode]) -> List[FilterNode]:
+    """
+    Объединяет условия `eq` и `contains_any` по одному полю внутри
+    группы "or" в одно условие `contains_any`.
+    """
+    conditions: Dict[str, List[FilterCondition]] = {}
+    for child in children:
+        if _get_any_values(child) is not None:
+            conditions.setdefault(child.field_name, []).append(child)
+
+    result = []
+    for child in children:
+        field_conditions = (
+            _get_any_values(child) is not None
+            and conditions.get(child.field_name)
+        )
+        if not field_conditions or len(field_conditions) < 2:
+            result.append(child)
+            continue
+        if field_conditions[0] is child:
+            values = (
+                value
+                for condition in field_conditions
+                for value in _get_any_values(condition)
+            )
+            result.append(FilterCondition(
+                child.field_name,
+                FilterOperator.contains_any,
+                tuple(dict.fromkeys(values)),
+            ))
+    return result
+
+
+def _is_tighter(condition: FilterCondition, other: FilterCondition) -> bool:
+    """
+    Проверяет, что граница `condition` строже границы `other`.
+
+    :raises TypeError: Если значения несравнимы.
+    """
+    if condition.value == other.value:
+        return condition.operator in (FilterOperator.gt, FilterOperator.lt)
+    if condition.operator in _LOWER_BOUNDS:
+        return condition.value > other.value
+    return condition.value < other.value
+
+
+def _fold_ranges(operator: str, children: List[FilterNode]):
+    """
+    Оставляет по одной нижней и верхней границе для каждого поля.
+
+    В группе "and" остаётся самая строгая граница, в группе "or" —
+    самая широкая.
+    """
+    bounds: Dict[Tuple[str, bool], FilterCondition] = {}
+    for child in children:
+        if not isinstance(child, FilterCondition):
+            continue
+        if child.operator in _LOWER_BOUNDS:
+            key = (child.field_name, True)
+        elif child.operator in _UPPER_BOUNDS:
+            key = (child.field_name, False)
+        else:
+            continue
+        current = bounds.get(key)
+        if current is None:
+            bounds[key] = child
+            continue
+        try:
+            tighter = _is_tighter(child, current)
+        except TypeError:
+            return children
+        if tighter == (operator == AND):
+            bounds[key] = child
+
+    kept = set(map(id, bounds.values()))
+    return [
+        child for child in children
+        if not (
+            isinstance(child, FilterCondition)
+            and (
+                child.operator in _LOWER_BOUNDS
+                or child.operator in _UPPER_BOUNDS
+            )
+        )
+        or id(child) in kept
+    ]
+
+
+def optimize_tree(node: Optional[FilterNode]) -> Optional[FilterNode]:
+    """
+    Упрощает дерево фильтров без изменения его смысла.
+
+    - вложенные группы с тем же оператором разворачиваются;
+    - повторяющиеся узлы удаляются;
+    - условия `eq` и `contains_any` по одному полю внутри "or"
+      объединяются в одно условие `contains_any`;
+    - диапазоны по одному полю сворачиваются до одной границы.
+
+    :param node: Корневой узел дерева.
+    :return: Упрощённый корневой узел.
+    """
+    return _reduce_tree(node, lambda child: child, _optimize_group)
+
+
+def _optimize_group(group: FilterGroup, children) -> FilterNode:
+    children = _flatten(group.operator, children)
+    children = _deduplicate(children)
+    if group.operator == OR:
+        children = _merge_equalities(children)
+    children = _fold_ranges(group.operator, children)
+    return _group(group.operator, children)
+
+
+def canonical_tree(node: Optional[FilterNode]) -> Optional[FilterNode]:
+    """
+    Приводит дерево к каноническому виду для ключей кэша.
+
+    Дерево упрощается `optimize_tree`, а дочерние узлы групп
+    упорядочиваются: "and" и "or" коммутативны, поэтому запросы,
+    отличающиеся только порядком условий, дают одно и то же дерево.
+
+    :param node: Корневой узел дерева.
+    :return: Канонический корневой узел.
+    """
+    return _sort_children(optimize_tree(node))
+
+
+def _sort_children(node: Optional[FilterNode]) -> Optional[FilterNode]:
+    """
+    Упорядочивает дочерние узлы групп по их `repr`.
+
+    `repr` группы собирается из уже посчитанных `repr` дочерних узлов,
+    поэтому глубокие деревья не требуют рекурсии.
+    """
+    _, node = _reduce_tree(
+        node, lambda child: (repr(child), child), _sort_group,
+    )
+    return node
+
+
+def _sort_group(group: FilterGroup, children) -> Tuple[str, FilterGroup]:
+    children = sorted(children, key=lambda child: child[0])
+    keys = ", ".join(key for key, _ in children)
+    if len(children) == 1:
+        keys += ","
+    return (
+        f"FilterGroup(operator={group.operator!r}, children=({keys}))",
+        FilterGroup(group.operator, tuple(node for _, node in children)),
+    )
@@ -0,0 +1,248 @@
+import json
+from typing import List
+
+import pytest
+
+from src.fastapi_filter import (
+    CursorPagination,
+    FilterField,
+    IncludeField,
+    Order,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.backends.mongo import MongoCompiler
+
+DOCUMENTS = [
+    {
+        "_id": 1,
+        "name": "Ann",
+        "age": 20,
+        "players": {"mainTeam": "red"},
+        "tags": ["a", "b"],
+    },
+    {
+        "_id": 2,
+        "name": "Bob",
+        "age": 25,
+        "players": {"mainTeam": "blue"},
+        "tags": ["b"],
+    },
+    {
+        "_id": 3,
+        "name": "Carl",
+        "age": 30,
+        "players": {"mainTeam": "red"},
+        "tags": ["a", "c"],
+    },
+    {
+        "_id": 4,
+        "name": "Dan.",
+        "age": 35,
+        "players": {"mainTeam": "green"},
+        "tags": [],
+    },
+]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "id": FilterField(field_type=int, alias="_id"),
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "tags": FilterField(field_type=List[str]),
+        "players__mainTeam": FilterField(
+            field_type=str,
+            operators=["eq", "ne", "contains_any"],
+        ),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "players.mainTeam"]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="_id"),
+        "name": IncludeField(alias="name"),
+        "players": IncludeField(alias="players"),
+        "players__mainTeam": IncludeField(alias="players.mainTeam"),
+    }
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+@pytest.mark.parametrize(
+    "request_filters,document",
+    (
+        (["age", "gt", 25], {"age": {"$gt": 25}}),
+        (["players__mainTeam", "eq", "red"], {"players.mainTeam": "red"}),
+        (
+            ["name", "has", "n."],
+            {"name": {"$regex": "n\\.", "$options": "i"}},
+        ),
+        (["tags", "contains_any", ["a"]], {"tags": {"$in": ["a"]}}),
+        (["tags", "contains_all", ["a", "c"]], {"tags": {"$all": ["a", "c"]}}),
+        (
+            [["age", "gt", 20], "and", ["age", "lte", 30], "and",
+             ["age", "gt", 10], "and", ["name", "ne", "Bob"]],
+            {"age": {"$gt": 20, "$lte": 30}, "name": {"$ne": "Bob"}},
+        ),
+        (
+            [["id", "eq", 1], "or", ["players__mainTeam", "eq", "red"],
+             "or", ["players__mainTeam", "eq", "blue"]],
+            {"$or": [
+                {"_id": 1},
+                {"players.mainTeam": {"$in": ["red", "blue"]}},
+            ]},
+        ),
+        (
+            [["name", "ne", "Bob"], "and", ["name", "ne", "Ann"]],
+            {"name": {"$ne": "Bob"}, "$and": [{"name": {"$ne": "Ann"}}]},
+        ),
+    ),
+)
+def test_filter_document(request_filters, document):
+    compiler = MongoCompiler()
+    assert compiler.filter(_get_filter(request_filters)) == document
+
+
+def test_prefix_fields():
+    compiler = MongoCompiler(prefix_fields=["name"])
+    assert compiler.filter(_get_filter(["name", "has", "Ca"])) == {
+        "name": {"$regex": "^Ca", "$options": "i"},
+    }
+
+
+def test_compile():
+    compiler = MongoCompiler()
+    query = compiler.compile(
+        filtration=_get_filter(["age", "gte", 25]),
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=1, limit=2),
+        search=Search(search="e"),
+        include=Include(fields={"name", "players", "players__mainTeam"}),
+    )
+    assert query.filter == {
+        "age": {"$gte": 25},
+        "$or": [
+            {"name": {"$regex": "e", "$options": "i"}},
+            {"players.mainTeam": {"$regex": "e", "$options": "i"}},
+        ],
+    }
+    assert query.sort == [("age", -1)]
+    assert (query.skip, query.limit) == (1, 2)
+    assert query.projection == {"name": 1, "players": 1}
+    assert MongoCompiler().compile().as_kwargs() == {"filter": {}, "skip": 0}
+
+
+@pytest.fixture
+def collection():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient().db.players
+    collection.insert_many(DOCUMENTS)
+    return collection
+
+
+@pytest.mark.parametrize(
+    "request_filters,ids",
+    (
+        (["age", "gt", 25], [3, 4]),
+        (["name", "has", "n."], [4]),
+        (["name", "has", "AN"], [1, 4]),
+        (["tags", "contains_any", ["c", "b"]], [1, 2, 3]),
+        (["tags", "contains_all", ["a", "b"]], [1]),
+        (["tags", "eq", "a"], [1, 3]),
+        (
+            [["players__mainTeam", "eq", "red"], "or",
+             ["players__mainTeam", "eq", "green"], "and", ["age", "lt", 35]],
+            [1, 3],
+        ),
+    ),
+)
+def test_find(collection, request_filters, ids):
+    query = MongoCompiler().compile(filtration=_get_filter(request_filters))
+    assert sorted(
+        document["_id"] for document in collection.find(**query.as_kwargs())
+    ) == ids
+
+
+def test_find__sort_pagination_projection(collection):
+    query = MongoCompiler().compile(
+        search=Search(search="R"),
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=1, limit=2),
+        include=Include(fields={"id", "players__mainTeam"}),
+    )
+    assert list(collection.find(**query.as_kwargs())) == [
+        {"_id": 3, "players": {"mainTeam": "red"}},
+        {"_id": 1, "players": {"mainTeam": "red"}},
+    ]
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+    TIEBREAKER_FIELD = "_id"
+
+
+def test_seek_document():
+    sort = Sort(sort_field="age", sort_order=Order.desc)
+    cursor = Cursor.encode_cursor(
+        [("age", Order.desc), ("_id", Order.desc)], [30, 3],
+    )
+    query = MongoCompiler().compile(
+        filtration=_get_filter(["name", "ne", "Bob"]),
+        sort=sort,
+        pagination=Cursor(cursor=cursor, limit=2),
+    )
+    assert query.filter == {
+        "name": {"$ne": "Bob"},
+        "$or": [{"age": {"$lt": 30}}, {"age": 30, "_id": {"$lt": 3}}],
+    }
+    assert query.sort == [("age", -1), ("_id", -1)]
+    assert (query.skip, query.limit) == (0, 2)
+
+
+def test_find__cursor_pagination(collection):
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    cursor = None
+    pages = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=3)
+        query = MongoCompiler().compile(sort=sort, pagination=pagination)
+        documents = list(collection.find(**query.as_kwargs()))
+        pages.append([document["_id"] for document in documents])
+        cursor = pagination.get_next_cursor(documents, sort)
+        if cursor is None:
+            break
+    assert pages == [[1, 2, 3], [4]]
+
+
+def test_find__cursor_pagination_projection(collection):
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    include = Include(fields={"name"})
+    cursor = None
+    pages = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=3)
+        query = MongoCompiler().compile(
+            sort=sort, pagination=pagination, include=include,
+        )
+        assert query.projection == {"name": 1, "age": 1, "_id": 1}
+        documents = list(collection.find(**query.as_kwargs()))
+        pages.append([document["_id"] for document in documents])
+        cursor = pagination.get_next_cursor(documents, sort)
+        if cursor is None:
+            break
+    assert pages == [[1, 2, 3], [4]]
@@ -0,0 +1,371 @@
+import json
+from datetime import date, datetime, timedelta
+from typing import List
+
+import pytest
+from factory.fuzzy import FuzzyText
+
+from src.fastapi_filter import (
+    CursorPagination,
+    FilterField,
+    IncludeField,
+    Order,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+postgresql = pytest.importorskip("sqlalchemy.dialects.postgresql")
+
+from src.fastapi_filter.backends.sqlalchemy import (  # noqa: E402
+    SQLAlchemyCompiler,
+)
+
+metadata = sqlalchemy.MetaData()
+players = sqlalchemy.Table(
+    "players",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("name", sqlalchemy.String),
+    sqlalchemy.Column("age", sqlalchemy.Integer),
+    sqlalchemy.Column("main_team", sqlalchemy.String),
+)
+teams = sqlalchemy.Table(
+    "teams",
+    sqlalchemy.MetaData(),
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("tags", postgresql.ARRAY(sqlalchemy.String)),
+)
+
+ROWS = [
+    {"id": 1, "name": "Ann", "age": 20, "main_team": "red"},
+    {"id": 2, "name": "Bob", "age": 25, "main_team": "blue"},
+    {"id": 3, "name": "Carl", "age": 30, "main_team": "red"},
+    {"id": 4, "name": "Dan_1", "age": 35, "main_team": "green"},
+    {"id": 5, "name": "Eve%", "age": 40, "main_team": None},
+]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "id": FilterField(field_type=int),
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "players__mainTeam": FilterField(
+            field_type=str,
+            operators=["eq", "contains_any", "contains_all"],
+        ),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "players->mainTeam"]
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = sqlalchemy.create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.connect() as connection:
+        connection.execute(players.insert(), ROWS)
+        yield connection
+
+
+@pytest.fixture
+def compiler():
+    return SQLAlchemyCompiler(
+        players,
+        columns={"players->mainTeam": players.c.main_team},
+    )
+
+
+def _get_ids(connection, statement):
+    return [row.id for row in connection.execute(statement)]
+
+
+@pytest.mark.parametrize(
+    "request_filters,ids",
+    (
+        (["age", "gt", 25], [3, 4, 5]),
+        (["age", "lte", 25], [1, 2]),
+        (["name", "ne", "Bob"], [1, 3, 4, 5]),
+        (["name", "has", "_"], [4]),
+        (["name", "has", "%"], [5]),
+        (["name", "has", "AN"], [1, 4]),
+        (["players__mainTeam", "contains_any", ["red", "green"]], [1, 3, 4]),
+        (
+            [
+                ["age", "gt", 20],
+                "and",
+                ["age", "lt", 40],
+                "or",
+                ["id", "eq", 1],
+            ],
+            [1, 2, 3, 4],
+        ),
+        (
+            [
+                ["players__mainTeam", "eq", "red"],
+                "or",
+                ["players__mainTeam", "eq", "blue"],
+            ],
+            [1, 2, 3],
+        ),
+    ),
+)
+def test_filters(connection, compiler, request_filters, ids):
+    filtration = Filters(filter_=json.dumps(request_filters))
+    statement = compiler.compile(filtration=filtration)
+    assert sorted(_get_ids(connection, statement)) == ids
+
+
+def test_sort_pagination_search(connection, compiler):
+    statement = compiler.compile(
+        filtration=Filters(filter_=json.dumps(["age", "gte", 25])),
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=1, limit=2),
+        search=Search(search="E"),
+    )
+    assert _get_ids(connection, statement) == [4, 3]
+
+
+def test_statement_cache(compiler):
+    first, first_params = compiler.compile_with_params(
+        filtration=Filters(filter_=json.dumps(
+            ["players__mainTeam", "contains_any", ["red"]],
+        )),
+        pagination=SimplePagination(offset=0, limit=10),
+    )
+    second, second_params = compiler.compile_with_params(
+        filtration=Filters(filter_=json.dumps(
+            ["players__mainTeam", "contains_any", ["red", "blue", "green"]],
+        )),
+        pagination=SimplePagination(offset=10, limit=10),
+    )
+    assert first is second
+    assert first_params != second_params
+    assert compiler.cache.info().hits == 1
+
+    value = FuzzyText().fuzz()
+    statement = compiler.compile(
+        filtration=Filters(filter_=json.dumps(["name", "eq", value])),
+    )
+    assert value not in str(statement)
+    assert statement.compile().params == {"p0": value}
+    assert (
+        statement._generate_cache_key()
+        == compiler.compile(
+            filtration=Filters(filter_=json.dumps(["name", "eq", "x"])),
+        )._generate_cache_key()
+    )
+
+
+def test_array_operators():
+
+    class TeamFilters(SimpleFiltration):
+        FILTER_FIELDS = {"tags": FilterField(
+            field_type=List[str],
+            operators=["ne", "has", "contains_any", "contains_all"],
+        )}
+
+    compiler = SQLAlchemyCompiler(teams)
+    dialect = postgresql.dialect()
+    for operator, sql in (
+        ("contains_any", "teams.tags && "),
+        ("contains_all", "teams.tags @> "),
+    ):
+        filtration = TeamFilters(
+            filter_=json.dumps(["tags", operator, ["a", "b"]]),
+        )
+        statement = compiler.compile(filtration=filtration)
+        assert sql in str(statement.compile(dialect=dialect))
+
+    filtration = TeamFilters(filter_=json.dumps(["tags", "has", "a"]))
+    statement = compiler.compile(filtration=filtration)
+    assert "FROM unnest(teams.tags) AS anon_1(element)" in str(
+        statement.compile(dialect=dialect),
+    )
+
+    filtration = TeamFilters(filter_=json.dumps(["tags", "ne", "a"]))
+    statement = compiler.compile(filtration=filtration)
+    assert "NOT (%(p0)s::VARCHAR = ANY (teams.tags))" in str(
+        statement.compile(dialect=dialect),
+    )
+
+
+def test_unknown_column():
+    compiler = SQLAlchemyCompiler(players)
+    with pytest.raises(ValueError):
+        compiler.compile(
+            filtration=Filters(filter_=json.dumps(
+                ["players__mainTeam", "eq", "red"],
+            )),
+        )
+
+
+def test_contains_all__not_array(compiler):
+    with pytest.raises(ValueError, match="требует столбец ARRAY"):
+        compiler.compile(
+            filtration=Filters(filter_=json.dumps(
+                ["players__mainTeam", "contains_all", ["red"]],
+            )),
+        )
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+
+
+@pytest.mark.parametrize(
+    "order,pages",
+    (
+        (Order.asc, [[1, 2], [3, 4], [5]]),
+        (Order.desc, [[5, 4], [3, 2], [1]]),
+    ),
+)
+def test_cursor_pagination(connection, compiler, order, pages):
+    sort = Sort(sort_field="age", sort_order=order)
+    cursor = None
+    result = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=2)
+        statement = compiler.compile(sort=sort, pagination=pagination)
+        rows = connection.execute(statement).mappings().all()
+        result.append([row["id"] for row in rows])
+        cursor = pagination.get_next_cursor(rows, sort)
+        if cursor is None:
+            break
+    assert result == pages
+    sql = str(statement)
+    assert "(players.age, players.id) " in sql
+    assert "ORDER BY players.age" in sql
+
+
+def test_cursor_pagination__multiple_fields(connection, compiler):
+
+    class TeamSort(SimpleSort):
+        SORT_FIELDS = {
+            "team": SortField(alias="players->mainTeam"),
+            "age": SortField(alias="age"),
+        }
+        TIEBREAKER_FIELD = "id"
+
+    sort = TeamSort(sort_field=None, sort_order=None, sort=[
+        "team:asc", "age:desc",
+    ])
+    filtration = Filters(filter_=json.dumps(
+        ["players__mainTeam", "contains_any", ["red", "blue", "green"]],
+    ))
+    cursor = None
+    result = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=1)
+        statement = compiler.compile(
+            filtration=filtration, sort=sort, pagination=pagination,
+        )
+        rows = connection.execute(statement).mappings().all()
+        result.extend(row["id"] for row in rows)
+        cursor = pagination.get_next_cursor(
+            [
+                {"id": row["id"], "age": row["age"],
+                 "players->mainTeam": row["main_team"]}
+                for row in rows
+            ],
+            sort,
+        )
+        if cursor is None:
+            break
+    assert result == [2, 4, 3, 1]
+
+
+def test_cursor_pagination__datetime():
+    events = sqlalchemy.Table(
+        "events",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("created", sqlalchemy.DateTime),
+        sqlalchemy.Column("day", sqlalchemy.Date),
+    )
+
+    class EventSort(SimpleSort):
+        SORT_FIELDS = {
+            "created": SortField(alias="created"),
+            "day": SortField(alias="day"),
+        }
+
+    rows = [
+        {
+            "id": index,
+            "created": datetime(2024, 1, 1) + timedelta(hours=index % 4),
+            "day": date(2024, 1, 1 + index % 3),
+        }
+        for index in range(1, 11)
+    ]
+    engine = sqlalchemy.create_engine("sqlite://")
+    events.metadata.create_all(engine)
+    compiler = SQLAlchemyCompiler(events)
+    with engine.connect() as connection:
+        connection.execute(events.insert(), rows)
+        for sort, key in (
+            (
+                EventSort(sort_field="created", sort_order=Order.desc),
+                lambda row: (row["created"], row["id"]),
+            ),
+            (
+                EventSort(None, None, sort=["day:asc", "created:asc"]),
+                lambda row: (row["day"], row["created"], row["id"]),
+            ),
+        ):
+            cursor = None
+            result = []
+            while True:
+                pagination = Cursor(cursor=cursor, limit=3)
+                statement = compiler.compile(sort=sort, pagination=pagination)
+                page = connection.execute(statement).mappings().all()
+                result.extend(row["id"] for row in page)
+                cursor = pagination.get_next_cursor(page, sort)
+                if cursor is None:
+                    break
+            reverse = sort.fields[0][1] == Order.desc
+            assert result == [
+                row["id"] for row in sorted(rows, key=key, reverse=reverse)
+            ]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "name": IncludeField(alias="name"),
+        "team": IncludeField(alias="players->mainTeam"),
+    }
+
+
+def test_include(connection, compiler):
+    include = Include(fields={"name", "team"})
+    statement = compiler.compile(
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=0, limit=2),
+        include=include,
+    )
+    rows = connection.execute(statement).mappings().all()
+    assert [dict(row) for row in rows] == [
+        {"name": "Eve%", "players->mainTeam": None},
+        {"name": "Dan_1", "players->mainTeam": "green"},
+    ]
+
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    pagination = Cursor(limit=2)
+    statement = compiler.compile(
+        sort=sort, pagination=pagination, include=include,
+    )
+    rows = connection.execute(statement).mappings().all()
+    assert list(rows[0]) == ["players->mainTeam", "name", "age", "id"]
+    cursor = pagination.get_next_cursor(rows, sort)
+    assert Cursor(cursor=cursor, limit=2).after[1] == (25, 2)
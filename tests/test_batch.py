@@ -0,0 +1,261 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from src.fastapi_filter import (
+    BatchFiltration,
+    BatchResponse,
+    FilterField,
+    IncludeField,
+    SimpleFiltration,
+    SimpleInclude,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.base import ConfigurationError, validate_and_compile
+from src.fastapi_filter.batch import iter_batch
+
+ROWS = [{"id": index, "age": 20 + index, "name": f"user-{index}"}
+        for index in range(10)]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {"age": FilterField(field_type=int)}
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+    }
+
+
+class Batch(BatchFiltration):
+    FILTRATION = Filters
+    SORT = Sort
+    INCLUDE = Include
+    MAX_SPECS = 5
+
+
+class Backend:
+    def __init__(self, delays=None):
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.delays = delays or {}
+
+    async def fetch(self, filtration, sort, pagination, search, include):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            rows = ROWS
+            tree = filtration.as_tree()
+            if tree is not None:
+                rows = [row for row in rows if row["age"] > tree.value]
+                if tree.value < 0:
+                    raise HTTPException(400, "Negative age.")
+                if tree.value == 99:
+                    raise RuntimeError("secret")
+            await asyncio.sleep(self.delays.get(tree and tree.value, 0.01))
+            if sort is not None:
+                rows = sorted(rows, key=lambda row: -row["age"])
+            return rows[pagination.offset:][:pagination.limit]
+        finally:
+            self.running -= 1
+
+
+def _spec(name, age=None, **kwargs):
+    if age is not None:
+        kwargs["filter"] = json.dumps(["age", "gt", age])
+    return {"name": name, **kwargs}
+
+
+def _get_client(backend, concurrency=8):
+    app = FastAPI()
+
+    @app.post("/batch")
+    async def batch(batch: Batch = Depends(Batch.as_dependency())):
+        return BatchResponse(batch, backend.fetch, concurrency=concurrency)
+
+    return TestClient(app)
+
+
+def _read(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_response():
+    backend = Backend()
+    response = _get_client(backend).post("/batch", json=[
+        _spec("young", 25, limit=2, include=["name"]),
+        _spec("old", 27, sort=["age:desc"], limit=1),
+        _spec("all", offset=8),
+    ])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = {line["name"]: line for line in _read(response)}
+    assert lines == {
+        "young": {
+            "name": "young",
+            "items": [{"name": "user-6"}, {"name": "user-7"}],
+        },
+        "old": {"name": "old", "items": [ROWS[9]]},
+        "all": {"name": "all", "items": ROWS[8:]},
+    }
+
+
+def test_batch_deduplicates():
+    backend = Backend()
+    batch = Batch(specs=[
+        {"name": "a", "filter": json.dumps(["age", "gt", 25]),
+         "offset": 0, "limit": 2},
+        {"name": "b", "filter": json.dumps(["age", "gt", 25]),
+         "offset": 0, "limit": 2},
+        {"name": "c", "filter": json.dumps(
+            [["age", "gt", 25], "and", ["age", "gt", 25]],
+        ), "offset": 0, "limit": 2},
+        {"name": "d", "filter": json.dumps(["age", "gt", 25]),
+         "offset": 2, "limit": 2},
+    ])
+    # Одинаковые строки фильтров разбираются один раз.
+    assert batch.queries[0].filtration is batch.queries[1].filtration
+
+    async def run():
+        return [line async for line in iter_batch(batch, backend.fetch)]
+
+    lines = [json.loads(line) for line in asyncio.run(run())]
+    assert backend.calls == 2
+    assert sorted(line["name"] for line in lines) == ["a", "b", "c", "d"]
+    items = {line["name"]: line["items"] for line in lines}
+    assert items["a"] == items["b"] == items["c"] == ROWS[6:8]
+    assert items["d"] == ROWS[8:]
+
+
+def test_batch_empty_values():
+    class Search(SimpleSearch):
+        SEARCH_FIELDS = ["name"]
+
+    class SearchBatch(Batch):
+        SEARCH = Search
+
+    batch = SearchBatch(specs=[{
+        "name": "a", "sort": [], "search": "", "include": [],
+        "offset": 0, "limit": 1,
+    }])
+    query = batch.queries[0]
+    assert (query.sort, query.search, query.include) == (None, None, None)
+
+    response = _get_client(Backend()).post("/batch", json=[
+        _spec("a", sort=[], include=[], limit=1),
+    ])
+    assert _read(response) == [{"name": "a", "items": ROWS[:1]}]
+
+
+def test_batch_cancels_on_close():
+    backend = Backend(delays={1: 1.0})
+    batch = Batch(specs=[
+        {"name": f"q{age}", "filter": json.dumps(["age", "gt", age]),
+         "offset": 0, "limit": 1}
+        for age in (1, 2)
+    ])
+
+    async def run():
+        lines = iter_batch(batch, backend.fetch)
+        first = await lines.__anext__()
+        await lines.aclose()
+        # Незавершённые запросы отменены и дождались завершения.
+        return first, backend.running
+
+    first, running = asyncio.run(run())
+    assert json.loads(first)["name"] == "q2"
+    assert running == 0
+
+
+def test_batch_concurrency():
+    backend = Backend(delays={1: 0.2})
+    specs = [_spec(f"q{age}", age) for age in range(1, 6)]
+    response = _get_client(backend, concurrency=2).post("/batch", json=specs)
+    names = [line["name"] for line in _read(response)]
+    assert backend.max_running == 2
+    # Результаты отдаются по мере готовности, а не в порядке запросов.
+    assert names[-1] == "q1"
+    assert sorted(names) == [f"q{age}" for age in range(1, 6)]
+
+
+def test_batch_errors():
+    response = _get_client(Backend()).post("/batch", json=[
+        _spec("ok", 1),
+        {"name": "bad_json", "filter": "["},
+        _spec("bad_sort", sort=["name:asc"]),
+        _spec("bad_include", include=["age"]),
+    ])
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert [error["name"] for error in detail] == [
+        "bad_json", "bad_sort", "bad_include",
+    ]
+
+
+def test_batch_validation():
+    client = _get_client(Backend())
+    response = client.post("/batch", json=[_spec("a"), _spec("a")])
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Имена запросов ['a'] повторяются."
+
+    # Лишние запросы отклоняются схемой тела до разбора каждого из них.
+    response = client.post("/batch", json=[{"bad": 1}] * 6)
+    assert response.status_code == 422
+    assert [error["type"] for error in response.json()["detail"]] == [
+        "value_error.list.max_items",
+    ]
+    assert client.app.openapi()["paths"]["/batch"]["post"][
+        "requestBody"
+    ]["content"]["application/json"]["schema"]["maxItems"] == 5
+    with pytest.raises(HTTPException):
+        Batch(specs=[
+            {"name": f"q{index}", "offset": 0, "limit": 1}
+            for index in range(6)
+        ])
+
+    for spec in (
+        _spec("a", limit=1000),
+        _spec("a", offset=-1),
+        _spec("a", search="x"),
+    ):
+        assert client.post("/batch", json=[spec]).status_code == 422
+
+
+def test_batch_fetch_errors(caplog):
+    response = _get_client(Backend()).post("/batch", json=[
+        _spec("ok", 28),
+        _spec("negative", -1),
+        _spec("broken", 99),
+    ])
+    lines = {line["name"]: line for line in _read(response)}
+    assert lines["ok"] == {"name": "ok", "items": [ROWS[9]]}
+    assert lines["negative"] == {"name": "negative", "error": "Negative age."}
+    assert lines["broken"] == {
+        "name": "broken", "error": "Внутренняя ошибка.",
+    }
+    assert "secret" not in response.text
+    assert "broken" in caplog.text
+
+
+def test_batch_config_errors():
+    class Wrong(BatchFiltration):
+        SORT = Filters
+        MAX_SPECS = 0
+
+    with pytest.raises(ConfigurationError) as error:
+        validate_and_compile(Wrong)
+    assert "SORT должен быть подклассом SimpleSort" in str(error.value)
+    assert "MAX_SPECS" in str(error.value)
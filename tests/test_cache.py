@@ -0,0 +1,211 @@
+import asyncio
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.fastapi_filter import (
+    FilterField,
+    IncludeField,
+    MemoryStorage,
+    Order,
+    ResponseCache,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.cache import RedisStorage, get_cache_key
+from tests.test_fields.utils import Timer
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "name": IncludeField(alias="name"),
+        "age": IncludeField(alias="age"),
+    }
+
+
+class FakeRedis:
+    def __init__(self, timer):
+        self.timer = timer
+        self.data = {}
+
+    async def get(self, name):
+        value, expires_at = self.data.get(name, (None, 0))
+        return value if expires_at > self.timer() else None
+
+    async def set(self, name, value, px):
+        assert isinstance(value, bytes)
+        self.data[name] = (value, self.timer() + px / 1000)
+
+
+class Backend:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    async def fetch(self, **params):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return {"items": [self.calls], "params": sorted(params)}
+
+
+def _get_params(request_filters, fields=("name", "age"), offset=0):
+    return dict(
+        filtration=Filters(filter_=json.dumps(request_filters)),
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=offset, limit=10),
+        include=Include(fields=set(fields)),
+    )
+
+
+def test_get_cache_key():
+    key = get_cache_key(**_get_params(
+        [["name", "eq", "a"], "and", ["age", "gt", 1]],
+    ))
+    assert key == get_cache_key(**_get_params(
+        [["age", "gt", 1], "and", ["name", "eq", "a"]],
+        fields=("age", "name"),
+    ))
+    assert key != get_cache_key(**_get_params(
+        [["age", "gt", 1], "and", ["name", "eq", "a"]], offset=10,
+    ))
+    assert key != get_cache_key(**_get_params(["age", "gt", 1]))
+
+
+def test_get_cache_key__stable_between_processes():
+    code = (
+        "from tests.test_cache import _get_params;"
+        "from src.fastapi_filter.cache import get_cache_key;"
+        "print(get_cache_key(**_get_params([['name', 'eq', 'a'], 'or', "
+        "['age', 'gt', 1], 'or', ['name', 'eq', 'b']])))"
+    )
+    keys = {
+        subprocess.check_output(
+            [sys.executable, "-c", code], env={"PYTHONHASHSEED": seed},
+        ).strip()
+        for seed in ("1", "2")
+    }
+    assert len(keys) == 1
+
+
+def test_get_or_fetch__single_flight():
+    backend = Backend()
+    cache = ResponseCache()
+
+    async def run():
+        return await asyncio.gather(*(
+            cache.get_or_fetch(backend.fetch, **_get_params(["age", "gt", 1]))
+            for _ in range(20)
+        ))
+
+    results = asyncio.run(run())
+    assert backend.calls == 1
+    assert all(result == results[0] for result in results)
+
+    asyncio.run(run())
+    assert backend.calls == 1
+    assert results[0]["params"] == [
+        "filtration", "include", "pagination", "sort",
+    ]
+
+
+def test_get_or_fetch__ttl():
+    backend = Backend()
+    timer = Timer()
+    cache = ResponseCache(MemoryStorage(timer=timer), ttl=5)
+    params = _get_params(["age", "gt", 1])
+
+    assert asyncio.run(cache.get_or_fetch(backend.fetch, **params)) == (
+        asyncio.run(cache.get_or_fetch(backend.fetch, **params))
+    )
+    timer.now = 5
+    result = asyncio.run(cache.get_or_fetch(backend.fetch, **params))
+    assert result["items"] == [2]
+
+
+def test_get_or_fetch__error():
+    backend = Backend(error=ValueError("database is down"))
+    cache = ResponseCache()
+
+    async def run():
+        return await asyncio.gather(*(
+            cache.get_or_fetch(backend.fetch, **_get_params(["age", "gt", 1]))
+            for _ in range(3)
+        ), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert backend.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+    asyncio.run(run())
+    assert backend.calls == 2
+    assert cache._pending == {}
+
+
+def test_get_or_fetch__leader_cancelled():
+    backend = Backend()
+    cache = ResponseCache()
+    params = _get_params(["age", "gt", 1])
+
+    async def run():
+        leader = asyncio.ensure_future(
+            cache.get_or_fetch(backend.fetch, **params),
+        )
+        await asyncio.sleep(0)
+        followers = [
+            asyncio.ensure_future(cache.get_or_fetch(backend.fetch, **params))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader, results
+
+    leader, results = asyncio.run(run())
+    assert leader.cancelled()
+    # Один из ожидающих стал первым, остальные дождались его.
+    assert backend.calls == 2
+    assert all(result["items"] == [2] for result in results)
+    assert cache._pending == {}
+
+
+def test_redis_storage():
+    timer = Timer()
+    client = FakeRedis(timer)
+    backend = Backend()
+    cache = ResponseCache(RedisStorage(client, prefix="test:"), ttl=0.5)
+    params = _get_params(["age", "gt", 1])
+
+    first = asyncio.run(cache.get_or_fetch(backend.fetch, **params))
+    second = asyncio.run(cache.get_or_fetch(backend.fetch, **params))
+    assert first == second
+    assert backend.calls == 1
+    assert list(client.data) == [f"test:{get_cache_key(**params)}"]
+
+    timer.now = 1
+    asyncio.run(cache.get_or_fetch(backend.fetch, **params))
+    assert backend.calls == 2
+
+
+@pytest.mark.parametrize("value", (None, 0))
+def test_memory_storage(value):
+    storage = MemoryStorage()
+    asyncio.run(storage.set("key", value, ttl=10))
+    assert asyncio.run(storage.get("key")) == value
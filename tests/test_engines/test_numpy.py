@@ -0,0 +1,209 @@
+import json
+import random
+
+import pytest
+
+from src.fastapi_filter import (
+    CursorPagination,
+    FilterField,
+    IncludeField,
+    Order,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.engines.python import PythonEngine
+
+np = pytest.importorskip("numpy")
+NumpyEngine = pytest.importorskip(
+    "src.fastapi_filter.engines.numpy",
+).NumpyEngine
+
+ROWS = 500
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "id": FilterField(field_type=int),
+        "age": FilterField(field_type=int),
+        "score": FilterField(field_type=float),
+        "name": FilterField(
+            field_type=str, operators=["eq", "ne", "has", "contains_any"],
+        ),
+        "tags": FilterField(field_type=list),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {
+        "id": SortField(alias="id"),
+        "age": SortField(alias="age"),
+        "score": SortField(alias="score"),
+        "name": SortField(alias="name"),
+    }
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name"]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+    }
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+
+
+@pytest.fixture(scope="module")
+def rows():
+    random.seed(0)
+    return [
+        {
+            "id": index,
+            "age": random.randint(18, 60),
+            "score": round(random.uniform(0, 10), 1),
+            "name": random.choice(["Ann", "Bob", "Carl", "Dan", "Eve"])
+            + str(random.randint(0, 9)),
+            "tags": random.sample("abcde", random.randint(0, 3)),
+        }
+        for index in range(ROWS)
+    ]
+
+
+@pytest.fixture(scope="module")
+def engine(rows):
+    columns = {
+        name: np.array([row[name] for row in rows])
+        for name in ("id", "age", "score", "name")
+    }
+    tags = np.empty(len(rows), dtype=object)
+    tags[:] = [row["tags"] for row in rows]
+    columns["tags"] = tags
+    return NumpyEngine(columns)
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+@pytest.mark.parametrize(
+    "request_filters",
+    (
+        ["age", "gt", 40],
+        ["age", "lte", 30],
+        ["score", "gte", 5.5],
+        ["name", "eq", "Bob1"],
+        ["name", "ne", "Bob1"],
+        ["name", "has", "ar"],
+        ["name", "has", "BOB"],
+        ["name", "contains_any", ["Ann1", "Eve2", "Zed"]],
+        ["tags", "contains_any", ["a", "e"]],
+        ["tags", "contains_all", ["a", "b"]],
+        ["tags", "eq", "c"],
+        [["age", "gt", 30], "and", ["name", "has", "a"], "or",
+         ["score", "lt", 1]],
+        [["age", "gt", 30], "and", [["name", "has", "A"], "or",
+                                    ["tags", "contains_any", ["d"]]]],
+    ),
+)
+def test_filter(rows, engine, request_filters):
+    filtration = _get_filter(request_filters)
+    expected = [
+        row["id"] for row in PythonEngine().apply(rows, filtration=filtration)
+    ]
+    assert engine.apply(filtration)["id"].tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "sort",
+    (
+        ["age:asc"],
+        ["age:desc"],
+        ["name:desc", "age:asc"],
+        ["score:desc", "name:asc", "age:desc"],
+    ),
+)
+@pytest.mark.parametrize("offset,limit", ((0, 10), (25, 7), (490, 20)))
+def test_sort_pagination(rows, engine, sort, offset, limit):
+    filtration = _get_filter(["age", "gte", 25])
+    sort = Sort(None, None, sort=sort)
+    pagination = SimplePagination(offset=offset, limit=limit)
+    expected = [row["id"] for row in PythonEngine().apply(
+        rows, filtration=filtration, sort=sort, pagination=pagination,
+    )]
+    assert engine.indices(
+        filtration, sort=sort, pagination=pagination,
+    ).tolist() == expected
+
+
+def test_apply(engine):
+    result = engine.apply(
+        search=Search(search="eVe"),
+        sort=Sort(sort_field="id", sort_order=Order.desc),
+        pagination=SimplePagination(offset=0, limit=3),
+        include=Include(fields={"id", "name"}),
+    )
+    assert set(result) == {"id", "name"}
+    assert len(result["id"]) == 3
+    assert all(name.startswith("Eve") for name in result["name"])
+    assert result["id"].tolist() == sorted(result["id"], reverse=True)
+
+
+def test_cursor_pagination(engine):
+    sort = Sort(None, None, sort=["age:desc"])
+    cursor = None
+    pages = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=40)
+        page = engine.apply(
+            sort=sort, pagination=pagination,
+            include=Include(fields={"name"}),
+        )
+        assert set(page) == {"name", "age", "id"}
+        pages.extend(page["id"].tolist())
+        items = [
+            {"id": id_, "age": age}
+            for id_, age in zip(page["id"].tolist(), page["age"].tolist())
+        ]
+        cursor = pagination.get_next_cursor(items, sort)
+        if cursor is None:
+            break
+    assert pages == engine.indices(sort=Sort(
+        None, None, sort=["age:desc", "id:desc"],
+    )).tolist()
+
+
+def test_column_not_found(engine):
+    with pytest.raises(ValueError):
+        engine.get_column("missing")
+
+
+def test_casefold_and_none():
+    names = ["Straße", None, "STRASSE", "Ann", None, "bob"]
+    rows = [{"id": index, "name": name} for index, name in enumerate(names)]
+    strings = np.array(["Straße", "x", "STRASSE", "Ann", "y", "bob"])
+    objects = np.empty(len(names), dtype=object)
+    objects[:] = names
+    python = PythonEngine()
+    for name in (strings, objects):
+        engine = NumpyEngine({"id": np.arange(len(names)), "name": name})
+        search = Search(search="strasse")
+        assert engine.indices(search=search).tolist() == [0, 2]
+        filtration = _get_filter(["name", "has", "STRASSE"])
+        assert engine.indices(filtration).tolist() == [0, 2]
+
+    for order in ("asc", "desc"):
+        sort = Sort(None, None, sort=[f"name:{order}"])
+        expected = [row["id"] for row in python.apply(rows, sort=sort)]
+        assert engine.indices(sort=sort).tolist() == expected
+        pagination = SimplePagination(offset=0, limit=2)
+        assert engine.indices(
+            sort=sort, pagination=pagination,
+        ).tolist() == expected[:2]
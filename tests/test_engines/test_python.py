@@ -0,0 +1,326 @@
+import json
+import random
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from src.fastapi_filter import (
+    CursorPagination,
+    FilterField,
+    IncludeField,
+    Order,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.engines.python import PythonEngine
+
+DOCUMENTS = [
+    {
+        "_id": 1,
+        "name": "Ann",
+        "age": 20,
+        "players": {"mainTeam": "red"},
+        "tags": ["a", "b"],
+        "teams": [{"id": 1, "name": "x"}, {"id": 2, "name": "y"}],
+    },
+    {
+        "_id": 2,
+        "name": "Bob",
+        "age": 25,
+        "players": {"mainTeam": "blue"},
+        "tags": ["b"],
+        "teams": [{"id": 3, "name": "z"}],
+    },
+    {
+        "_id": 3,
+        "name": "Carl",
+        "age": 30,
+        "players": {"mainTeam": "red"},
+        "tags": ["a", "c"],
+        "teams": [],
+    },
+    {
+        "_id": 4,
+        "name": "Dan.",
+        "age": 35,
+        "players": {"mainTeam": "green"},
+        "tags": [],
+    },
+]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "id": FilterField(field_type=int, alias="_id"),
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "tags": FilterField(field_type=List[str]),
+        "players__mainTeam": FilterField(
+            field_type=str,
+            operators=["eq", "ne", "contains_any"],
+        ),
+        "teams__id": FilterField(field_type=int),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {
+        "age": SortField(alias="age"),
+        "team": SortField(alias="players.mainTeam"),
+    }
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "players.mainTeam"]
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="_id"),
+        "name": IncludeField(alias="name"),
+        "players": IncludeField(alias="players"),
+        "players__mainTeam": IncludeField(alias="players.mainTeam"),
+        "teams__name": IncludeField(alias="teams.name"),
+    }
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+    TIEBREAKER_FIELD = "_id"
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+def _get_ids(items):
+    return [item["_id"] for item in items]
+
+
+@pytest.mark.parametrize(
+    "request_filters,ids",
+    (
+        (["age", "gt", 25], [3, 4]),
+        (["age", "lte", 25], [1, 2]),
+        (["name", "has", "n."], [4]),
+        (["name", "has", "AN"], [1, 4]),
+        (["name", "ne", "Bob"], [1, 3, 4]),
+        (["tags", "contains_any", ["c", "b"]], [1, 2, 3]),
+        (["tags", "contains_all", ["a", "b"]], [1]),
+        (["tags", "contains_all", []], []),
+        (["tags", "eq", "a"], [1, 3]),
+        (["tags", "eq", ["b"]], [2]),
+        (["teams__id", "gte", 2], [1, 2]),
+        (
+            [["players__mainTeam", "eq", "red"], "or",
+             ["players__mainTeam", "eq", "green"], "and", ["age", "lt", 35]],
+            [1, 3],
+        ),
+        (
+            [["id", "eq", 1], "or", [["age", "gt", 20], "and",
+                                     ["tags", "contains_any", ["c"]]]],
+            [1, 3],
+        ),
+    ),
+)
+def test_filter(request_filters, ids):
+    items = PythonEngine().apply(
+        DOCUMENTS, filtration=_get_filter(request_filters),
+    )
+    assert _get_ids(items) == ids
+
+
+def test_filter__objects():
+    objects = [
+        SimpleNamespace(_id=1, age=20, players=SimpleNamespace(mainTeam="a")),
+        SimpleNamespace(_id=2, age=30, players=None),
+    ]
+    engine = PythonEngine()
+    assert [item._id for item in engine.apply(
+        objects, filtration=_get_filter(["age", "gt", 25]),
+    )] == [2]
+    assert [item._id for item in engine.apply(
+        objects, filtration=_get_filter(["players__mainTeam", "eq", "a"]),
+    )] == [1]
+
+
+def test_apply():
+    items = PythonEngine().apply(
+        DOCUMENTS,
+        filtration=_get_filter(["age", "gte", 20]),
+        search=Search(search="R"),
+        sort=Sort(sort_field="age", sort_order=Order.desc),
+        pagination=SimplePagination(offset=1, limit=2),
+        include=Include(fields={"id", "players__mainTeam", "teams__name"}),
+    )
+    assert list(items) == [
+        {"_id": 3, "players": {"mainTeam": "red"}, "teams": []},
+        {
+            "_id": 1,
+            "players": {"mainTeam": "red"},
+            "teams": [{"name": "x"}, {"name": "y"}],
+        },
+    ]
+
+
+def test_apply__lazy():
+    consumed = []
+
+    def source():
+        for index in range(1000):
+            consumed.append(index)
+            yield {"_id": index, "age": index % 10}
+
+    items = PythonEngine().apply(
+        source(),
+        filtration=_get_filter(["age", "eq", 1]),
+        pagination=SimplePagination(offset=1, limit=2),
+    )
+    assert not consumed
+    assert _get_ids(items) == [11, 21]
+    assert len(consumed) == 22
+
+
+def test_sort__mixed_directions():
+    random.seed(0)
+    documents = [
+        {"_id": index, "age": random.randint(1, 5),
+         "players": {"mainTeam": random.choice("abc")}}
+        for index in range(200)
+    ]
+    documents.append({"_id": 200, "age": None})
+    sort = Sort(None, None, sort=["team:desc", "age:asc"])
+    expected = sorted(documents, key=lambda item: item["age"] or 0)
+    expected = sorted(
+        expected,
+        key=lambda item: item.get("players", {}).get("mainTeam", ""),
+        reverse=True,
+    )
+    engine = PythonEngine()
+    assert list(engine.apply(documents, sort=sort)) == expected
+    assert list(engine.apply(
+        documents, sort=sort, pagination=SimplePagination(offset=5, limit=7),
+    )) == expected[5:12]
+
+
+def test_cursor_pagination():
+    engine = PythonEngine()
+    for sort in (
+        Sort(sort_field="age", sort_order=Order.asc),
+        Sort(None, None, sort=["team:desc", "age:asc"]),
+    ):
+        cursor = None
+        pages = []
+        while True:
+            pagination = Cursor(cursor=cursor, limit=3)
+            items = list(engine.apply(
+                DOCUMENTS, sort=sort, pagination=pagination,
+            ))
+            pages.extend(_get_ids(items))
+            cursor = pagination.get_next_cursor(items, sort)
+            if cursor is None:
+                break
+        assert len(pages) == len(DOCUMENTS)
+        assert pages == _get_ids(engine.apply(
+            DOCUMENTS, sort=sort, pagination=Cursor(limit=10),
+        ))
+
+
+def test_cursor_pagination__include():
+    engine = PythonEngine()
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    include = Include(fields={"name"})
+    cursor = None
+    pages = []
+    while True:
+        pagination = Cursor(cursor=cursor, limit=3)
+        items = list(engine.apply(
+            DOCUMENTS, sort=sort, pagination=pagination, include=include,
+        ))
+        assert all(set(item) == {"name", "age", "_id"} for item in items)
+        pages.extend(_get_ids(items))
+        cursor = pagination.get_next_cursor(items, sort)
+        if cursor is None:
+            break
+    assert pages == _get_ids(engine.apply(
+        DOCUMENTS, sort=sort, pagination=Cursor(limit=10),
+    ))
+
+
+def test_cursor_pagination__datetime():
+
+    class DateSort(SimpleSort):
+        SORT_FIELDS = {
+            "created": SortField(alias="created"),
+            "day": SortField(alias="day"),
+        }
+
+    documents = [
+        {
+            "_id": index,
+            "created": datetime(2024, 1, 1) + timedelta(hours=index % 4),
+            "day": date(2024, 1, 1 + index % 3),
+        }
+        for index in range(10)
+    ]
+    engine = PythonEngine()
+    for sort in (
+        DateSort(sort_field="created", sort_order=Order.desc),
+        DateSort(None, None, sort=["day:asc", "created:desc"]),
+    ):
+        cursor = None
+        pages = []
+        while True:
+            pagination = Cursor(cursor=cursor, limit=3)
+            items = list(engine.apply(
+                documents, sort=sort, pagination=pagination,
+            ))
+            pages.extend(_get_ids(items))
+            cursor = pagination.get_next_cursor(items, sort)
+            if cursor is None:
+                break
+        assert pages == _get_ids(engine.apply(
+            documents, sort=sort, pagination=Cursor(limit=10),
+        ))
+
+
+class CodeFilters(Filters):
+    FILTER_FIELDS = {
+        **Filters.FILTER_FIELDS,
+        "codes": FilterField(field_type=List[int]),
+    }
+
+
+@pytest.mark.parametrize(
+    "request_filters,ids",
+    (
+        (["tags", "contains_any", ["c", "b"]], [1, 2, 3]),
+        (["tags", "contains_all", ["a", "c"]], [3]),
+        (["tags", "contains_all", ["a"]], [1, 3, 4, 5]),
+        (["tags", "contains_all", []], []),
+        (["codes", "contains_all", [1, 3]], [1, 3]),
+        (["codes", "contains_all", [3, 5000]], [2, 3]),
+        (["codes", "contains_any", [2, 5000]], [1, 2, 3]),
+    ),
+)
+@pytest.mark.parametrize("row_cache_size", (0, 2, 100))
+def test_contains__collections(request_filters, ids, row_cache_size):
+    documents = [
+        {"_id": 1, "tags": ["a", "b"], "codes": [1, 2, 3]},
+        {"_id": 2, "tags": ("b",), "codes": frozenset({3, 5000})},
+        {"_id": 3, "tags": {"a", "c"}, "codes": [1, 3, 5000]},
+        {"_id": 4, "tags": "a", "codes": 3},
+        {"_id": 5, "tags": [["x"], "a"], "codes": []},
+    ]
+    filtration = CodeFilters(filter_=json.dumps(request_filters))
+    engine = PythonEngine(row_cache_size=row_cache_size)
+    for _ in range(2):
+        assert _get_ids(engine.apply(documents, filtration=filtration)) == ids
+    if row_cache_size:
+        assert len(engine.row_sets) <= row_cache_size
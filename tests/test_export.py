@@ -0,0 +1,272 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from fastapi import Depends, FastAPI, Query
+from fastapi.testclient import TestClient
+
+from src.fastapi_filter import (
+    ExportResponse,
+    FilterField,
+    IncludeField,
+    Order,
+    SimpleFiltration,
+    SimpleInclude,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.engines.python import PythonEngine
+from src.fastapi_filter.export import iter_batches
+
+ROWS = [
+    {
+        "id": index,
+        "age": 20 + index % 7,
+        "name": f"user-{index}",
+        "born": date(2000, 1, 1 + index % 28),
+        "team": {"name": f"team-{index % 3}", "city": "x"},
+    }
+    for index in range(1, 51)
+]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {"age": FilterField(field_type=int)}
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+        "born": IncludeField(alias="born"),
+        "team__name": IncludeField(alias="team.name"),
+    }
+
+
+class Backend:
+    def __init__(self):
+        self.engine = PythonEngine()
+        self.calls = 0
+
+    async def fetch_page(self, filtration, sort, pagination, search, include):
+        self.calls += 1
+        return list(self.engine.apply(
+            ROWS, filtration=filtration, sort=sort, pagination=pagination,
+            include=include,
+        ))
+
+
+def _expected(sort=False, min_age=None):
+    rows = [row for row in ROWS if min_age is None or row["age"] > min_age]
+    if sort:
+        rows = sorted(rows, key=lambda row: (-row["age"], -row["id"]))
+    return rows
+
+
+async def _receive():
+    await asyncio.Event().wait()
+
+
+def _get_client(backend):
+    app = FastAPI()
+
+    @app.get("/export")
+    async def export(
+        filtration: Filters = Depends(Filters.as_dependency()),
+        sort: Sort = Depends(Sort.as_dependency()),
+        include: Include = Depends(Include.as_dependency()),
+        format: str = Query(default="ndjson"),
+    ):
+        return ExportResponse(
+            backend.fetch_page, filtration, sort, include=include,
+            format=format, batch_size=7, filename=f"players.{format}",
+        )
+
+    return TestClient(app)
+
+
+def test_export_ndjson():
+    backend = Backend()
+    response = _get_client(backend).get("/export", params={
+        "filter": json.dumps(["age", "gt", 22]),
+        "sort": "age:desc",
+        "includeFields": ["id", "born"],
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="players.ndjson"'
+    )
+    expected = _expected(sort=True, min_age=22)
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": row["id"], "born": row["born"].isoformat()}
+        for row in expected
+    ]
+    assert backend.calls == len(expected) // 7 + 1
+
+
+def test_export_ndjson_without_include():
+    response = _get_client(Backend()).get("/export")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == list(range(1, 51))
+    assert lines[0]["team"] == {"name": "team-1", "city": "x"}
+
+
+def test_export_csv():
+    response = _get_client(Backend()).get("/export", params={
+        "format": "csv",
+        "includeFields": ["id", "name", "team__name"],
+    })
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "name", "team.name"]
+    assert rows[1:] == [
+        [str(row["id"]), row["name"], row["team"]["name"]] for row in ROWS
+    ]
+
+
+def test_export_csv_nested_and_empty():
+    async def fetch_page(**kwargs):
+        return []
+
+    async def read(response):
+        chunks = []
+
+        async def send(message):
+            chunks.append(message.get("body", b""))
+
+        await response({"type": "http"}, _receive, send)
+        return b"".join(chunks).decode()
+
+    response = ExportResponse(
+        fetch_page, format="csv", columns=["id", "team"],
+    )
+    assert asyncio.run(read(response)) == "id,team\r\n"
+
+    response = ExportResponse(Backend().fetch_page, format="csv")
+    lines = asyncio.run(read(response)).splitlines()
+    assert lines[0] == "id,age,name,born,team"
+    assert lines[1] == (
+        '1,21,user-1,2000-01-02,"{""name"":""team-1"",""city"":""x""}"'
+    )
+
+
+def test_export_backpressure():
+    backend = Backend()
+    calls = []
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message["body"]:
+            calls.append(backend.calls)
+            await asyncio.sleep(0)
+
+    response = ExportResponse(backend.fetch_page, batch_size=10)
+    asyncio.run(response({"type": "http"}, _receive, send))
+    # Следующая пачка запрашивается только после отправки предыдущей.
+    assert calls == [1, 2, 3, 4, 5]
+    assert backend.calls == 6
+
+
+def test_export_wrong_format():
+    with pytest.raises(ValueError, match="Неизвестный формат"):
+        ExportResponse(Backend().fetch_page, format="xml")
+
+
+def test_export_sqlalchemy():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from src.fastapi_filter.backends.sqlalchemy import SQLAlchemyCompiler
+
+    table = sqlalchemy.Table(
+        "players",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("name", sqlalchemy.String),
+        sqlalchemy.Column("age", sqlalchemy.Integer),
+    )
+    engine = sqlalchemy.create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=sqlalchemy.pool.StaticPool,
+    )
+    table.metadata.create_all(engine)
+    compiler = SQLAlchemyCompiler(table)
+    statements = []
+
+    async def fetch_page(**kwargs):
+        statement, params = compiler.compile_with_params(**kwargs)
+        statements.append(statement)
+        with engine.connect() as connection:
+            return connection.execute(statement, params).all()
+
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [
+            {"id": row["id"], "name": row["name"], "age": row["age"]}
+            for row in ROWS
+        ])
+    client = TestClient(FastAPI())
+
+    @client.app.get("/export")
+    async def export(
+        sort: Sort = Depends(Sort.as_dependency()),
+        include: Include = Depends(Include.as_dependency()),
+    ):
+        return ExportResponse(
+            fetch_page, sort=sort, include=include, batch_size=20,
+        )
+
+    response = client.get("/export", params={
+        "sort": "age:desc", "includeFields": ["name"],
+    })
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"name": row["name"]} for row in _expected(sort=True)
+    ]
+    # Первая пачка без условия продолжения, остальные — один запрос.
+    assert len(statements) == 3
+    assert statements[1] is statements[2]
+
+
+def test_export_null_sort_value():
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    from src.fastapi_filter.backends.sqlalchemy import SQLAlchemyCompiler
+
+    table = sqlalchemy.Table(
+        "players",
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+        sqlalchemy.Column("age", sqlalchemy.Integer, nullable=True),
+    )
+    engine = sqlalchemy.create_engine("sqlite://")
+    table.metadata.create_all(engine)
+    compiler = SQLAlchemyCompiler(table)
+    with engine.begin() as connection:
+        connection.execute(table.insert(), [
+            {"id": index, "age": None if index < 4 else index}
+            for index in range(1, 11)
+        ])
+
+    async def fetch_page(**kwargs):
+        with engine.connect() as connection:
+            return connection.execute(
+                *compiler.compile_with_params(**kwargs),
+            ).all()
+
+    async def export():
+        return [
+            [row.id for row in items] async for items in iter_batches(
+                fetch_page, sort=Sort(sort_field="age", sort_order=Order.asc),
+                batch_size=2,
+            )
+        ]
+
+    # SQLite ставит NULL первыми: условие продолжения после NULL не
+    # выполнилось бы ни для одной строки, и выгрузка закончилась бы
+    # после первой пачки.
+    with pytest.raises(ValueError, match="age"):
+        asyncio.run(export())
@@ -3,13 +3,14 @@ from typing import List
 
 import pytest
 from factory.fuzzy import FuzzyInteger, FuzzyText, FuzzyChoice
-from fastapi import status
+from fastapi import HTTPException, status
 
 from src.fastapi_filter import (
     SimpleFiltration,
     FilterOperator,
     FilterField,
 )
+from src.fastapi_filter import jsonlib
 from .utils import get_fastapi_client
 
 
@@ -352,3 +353,266 @@ def test_success__nested_filtering():
     assert response.status_code == status.HTTP_200_OK, response.json()
     content = response.json()
     assert parsed_filters == content.pop("filters")
+
+
+def test_success__filter_cache():
+    field_name = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=str)}
+        FILTER_CACHE_SIZE = 2
+
+    request_filter = json.dumps([field_name, "eq", FuzzyText().fuzz()])
+    first = Filters(filter_=request_filter).filters
+    second = Filters(filter_=request_filter).filters
+
+    assert first is second
+    assert Filters.cache_info() == (1, 1, 2, 1)
+    with pytest.raises(TypeError):
+        second["value"] = FuzzyText().fuzz()
+
+    for _ in range(2):
+        Filters(filter_=json.dumps([field_name, "eq", FuzzyText().fuzz()]))
+    Filters(filter_=request_filter)
+    assert Filters.cache_info().misses == 4
+    assert Filters.cache_info().currsize == 2
+
+    Filters.cache_clear()
+    assert Filters.cache_info() == (0, 0, 2, 0)
+
+
+def test_success__filter_cache_response():
+    field_name = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=List[str])}
+        FILTER_CACHE_SIZE = 10
+
+    request_filters = [
+        [field_name, "contains_any", __get_value_by_type(List[str])],
+        "or",
+        [field_name, "eq", __get_value_by_type(List[str])],
+    ]
+    fastapi_client = get_fastapi_client(Filters)
+    for _ in range(2):
+        response = fastapi_client.get(
+            "/",
+            params={"filters": json.dumps(request_filters)},
+        )
+        assert response.status_code == status.HTTP_200_OK, response.json()
+        assert response.json()["filters"] == [
+            {
+                "field_name": field_name,
+                "operator": request_filters[0][1],
+                "value": request_filters[0][2],
+            },
+            "or",
+            {
+                "field_name": field_name,
+                "operator": request_filters[2][1],
+                "value": request_filters[2][2],
+            },
+        ]
+    assert Filters.cache_info().hits == 1
+
+
+def test_success__filter_cache_disabled():
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {}
+
+    Filters(filter_="[]")
+    assert Filters.cache_info() is None
+
+
+def test_success__compiled_fields():
+    alias = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {
+            "teams__name": FilterField(field_type=str),
+            "ids": FilterField(field_type=List[int], alias=alias),
+            "age": FilterField(
+                field_type=float,
+                operators=[FilterOperator.gt, "lt"],
+            ),
+        }
+
+    compiled = Filters._compiled_fields
+    assert compiled["teams__name"].field_name == "teams->name"
+    assert compiled["teams__name"].operators == {"eq", "ne", "has"}
+    assert compiled["ids"].field_name == alias
+    assert compiled["ids"].converter("7") == 7
+    assert compiled["age"].operators == {"gt", "lt"}
+
+    filters = Filters(filter_=json.dumps(["ids", "contains_all", ["1", 2]]))
+    assert filters.filters == {
+        "field_name": alias,
+        "operator": FilterOperator.contains_all,
+        "value": [1, 2],
+    }
+    assert type(filters.filters["field_name"]) is str
+    assert type(filters.filters["operator"]) is FilterOperator
+
+
+@pytest.mark.parametrize(
+    "max_depth,depth,status_code",
+    (
+        (3, 3, status.HTTP_200_OK),
+        (3, 4, status.HTTP_422_UNPROCESSABLE_ENTITY),
+        (None, 64, status.HTTP_200_OK),
+        (None, 65, status.HTTP_422_UNPROCESSABLE_ENTITY),
+        (100, 65, status.HTTP_422_UNPROCESSABLE_ENTITY),
+    ),
+)
+def test_max_depth(max_depth, depth, status_code):
+    field_name = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=str)}
+        MAX_DEPTH = max_depth
+        MAX_FILTER_BYTES = None
+
+    request_filters = [field_name, "eq", FuzzyText().fuzz()]
+    for _ in range(depth):
+        request_filters = [request_filters]
+
+    fastapi_client = get_fastapi_client(Filters)
+    response = fastapi_client.get(
+        "/",
+        params={"filters": json.dumps(request_filters)},
+    )
+    assert response.status_code == status_code, response.json()
+
+
+def test_config__max_depth_above_limit():
+
+    class Filters(SimpleFiltration):
+        MAX_DEPTH = 65
+
+    assert Filters.get_config_errors() == [
+        "MAX_DEPTH не может превышать 64.",
+    ]
+
+
+def test_fail__too_many_leaves():
+    field_name = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=str)}
+        MAX_LEAVES = 3
+
+    leaf = [field_name, "eq", FuzzyText().fuzz()]
+    request_filters = [leaf, "or", [leaf, "and", leaf]]
+    Filters(filter_=json.dumps(request_filters))
+    with pytest.raises(HTTPException) as error:
+        Filters(filter_=json.dumps(request_filters + ["or", leaf]))
+    assert error.value.detail == (
+        "Количество условий фильтрации превышает 3."
+    )
+
+
+def test_fail__filter_too_large():
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {}
+        MAX_FILTER_BYTES = 16
+
+    with pytest.raises(HTTPException) as error:
+        Filters(filter_="[" * 17)
+    assert error.value.detail == "Размер фильтров превышает 16 байт."
+    with pytest.raises(HTTPException) as error:
+        Filters(filter_="[" + "я" * 8)
+    assert error.value.detail == "Размер фильтров превышает 16 байт."
+
+
+def test_default_limits():
+    field_name = FuzzyText().fuzz()
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=str)}
+
+    leaf = [field_name, "eq", FuzzyText().fuzz()]
+    deep = [leaf]
+    for _ in range(16):
+        deep = [deep]
+    for request_filters, detail in (
+        (deep, "Глубина вложенности фильтров превышает 16."),
+        ([leaf] + ["or", leaf] * 256,
+         "Количество условий фильтрации превышает 256."),
+        ([field_name, "eq", "x" * 65536],
+         "Размер фильтров превышает 65536 байт."),
+    ):
+        with pytest.raises(HTTPException) as error:
+            Filters(filter_=json.dumps(request_filters))
+        assert error.value.detail == detail
+
+    Filters(filter_=json.dumps(deep[0]))
+    Filters(filter_=json.dumps([leaf] + ["or", leaf] * 255))
+
+
+def test_fail__json_recursion():
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {}
+        MAX_FILTER_BYTES = None
+
+    with pytest.raises(HTTPException) as error:
+        Filters(filter_="[" * 100000 + "]" * 100000)
+    assert error.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_success__no_filter():
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {}
+
+    fastapi_client = get_fastapi_client(Filters.as_dependency())
+    response = fastapi_client.get("/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"filters": []}
+
+
+@pytest.mark.parametrize("backend", ("orjson", "ujson", "json"))
+def test_json_backends(backend):
+    pytest.importorskip(backend)
+    field_name = FuzzyText().fuzz()
+    loads, _ = jsonlib.BACKENDS[backend]
+
+    class Filters(SimpleFiltration):
+        FILTER_FIELDS = {field_name: FilterField(field_type=List[int])}
+        JSON_LOADS = loads
+
+    values = list(range(5000))
+    filters = Filters(filter_=json.dumps([field_name, "contains_any", values]))
+    assert filters.filters["value"] == values
+
+    for request_filter in (FuzzyText().fuzz(), "[1,", ""):
+        with pytest.raises(HTTPException) as error:
+            Filters(filter_=request_filter)
+        assert error.value.detail == "Неверный формат фильтров."
+
+    for request_filter in ("[" * 5000, "[" * 5000 + "]" * 5000):
+        with pytest.raises(HTTPException) as error:
+            Filters(filter_=request_filter)
+        assert error.value.detail == (
+            "Глубина вложенности фильтров превышает 16."
+        )
+
+
+def test_json_backend__package_default():
+    previous = jsonlib.BACKEND
+    try:
+        jsonlib.use_backend("json")
+        assert jsonlib.loads is json.loads
+
+        class Filters(SimpleFiltration):
+            FILTER_FIELDS = {}
+
+        with pytest.raises(HTTPException) as error:
+            Filters(filter_=FuzzyText().fuzz())
+        assert error.value.detail == "Неверный формат фильтров."
+        with pytest.raises(ValueError):
+            jsonlib.use_backend(FuzzyText().fuzz())
+    finally:
+        jsonlib.use_backend(previous)
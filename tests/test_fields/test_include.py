@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from factory.fuzzy import FuzzyInteger, FuzzyText, FuzzyChoice
 from fastapi import status
 
@@ -5,6 +7,7 @@ from src.fastapi_filter import (
     SimpleInclude,
     IncludeField,
 )
+from src.fastapi_filter.engines.python import PythonEngine
 from .utils import get_fastapi_client
 
 
@@ -41,3 +44,74 @@ def test_field_not_allowed():
     fastapi_client = get_fastapi_client(Include.as_dependency())
     response = fastapi_client.get("/", params={"includeFields": field})
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TeamInclude(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "teams": IncludeField(alias="teams"),
+        "teams__name": IncludeField(alias="teams.name"),
+        "players__id": IncludeField(alias="players.id"),
+        "players__mainTeam": IncludeField(alias="players->mainTeam"),
+        "captain__name": IncludeField(alias="captain.name"),
+    }
+
+
+def test_projection():
+    include = TeamInclude(fields=set(TeamInclude.INCLUDE_FIELDS))
+    projection = include.get_projection()
+    assert projection.paths == (
+        "id", "teams", "captain.name", "players.id", "players.mainTeam",
+    )
+    assert projection.columns == ("id", "teams", "captain", "players")
+    assert projection.mongo == dict.fromkeys(projection.paths, 1)
+    assert projection.tree["teams"] is None
+
+    document = {
+        "id": 1,
+        "secret": "x",
+        "teams": [{"name": "red", "score": 3}],
+        "players": [{"id": 1, "mainTeam": "red", "age": 20}, "unknown"],
+        "captain": None,
+    }
+    assert projection.prune(document) == {
+        "id": 1,
+        "teams": [{"name": "red", "score": 3}],
+        "players": [{"id": 1, "mainTeam": "red"}],
+    }
+    assert projection.prune({"captain": {"name": "Ann", "age": 30}}) == {
+        "captain": {"name": "Ann"},
+    }
+
+
+def test_projection__cached():
+    first = TeamInclude(fields={"id", "teams__name"}).get_projection()
+    second = TeamInclude(fields={"teams__name", "id"}).get_projection()
+    assert first is second
+    assert first.prune({"id": 1, "teams": {"name": "a", "id": 2}}) == {
+        "id": 1, "teams": {"name": "a"},
+    }
+    assert TeamInclude(fields=set()).get_projection() is None
+
+
+def test_projection__objects():
+    include = TeamInclude(fields={"id", "captain__name", "players__id"})
+    projection = include.get_projection()
+    item = SimpleNamespace(
+        id=b"\x01",
+        secret="x",
+        captain=SimpleNamespace(name="Ann", age=30),
+        players=(SimpleNamespace(id=1, age=20), 7),
+    )
+    assert projection.prune(item) == {
+        "id": b"\x01",
+        "captain": {"name": "Ann"},
+        "players": [{"id": 1}],
+    }
+    # Сериализатор отбирает те же пути, но кодирует значения для JSON.
+    assert projection.serialize(item) == {
+        "id": "\x01",
+        "captain": {"name": "Ann"},
+        "players": [{"id": 1}],
+    }
+    assert PythonEngine().compile_projection(include) is projection.prune
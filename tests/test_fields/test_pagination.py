@@ -1,7 +1,20 @@
-from factory.fuzzy import FuzzyInteger
-from fastapi import status
+import base64
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
 
-from src.fastapi_filter import SimplePagination
+import pytest
+from factory.fuzzy import FuzzyInteger, FuzzyText
+from fastapi import HTTPException, status
+
+from src.fastapi_filter import (
+    CursorPagination,
+    Order,
+    SimplePagination,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter import jsonlib
 from .utils import get_fastapi_client
 
 
@@ -46,3 +59,131 @@ def test_default_offset_and_limit():
     assert content.pop("offset") == default_offset
     assert content.pop("limit") == default_limit
     assert len(content) == 0
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+def test_cursor__next_cursor():
+    sort = Sort(sort_field="age", sort_order=Order.desc)
+    limit = FuzzyInteger(1, 10).fuzz()
+    items = [{"id": index, "age": index * 10} for index in range(limit)]
+
+    pagination = Cursor(limit=limit)
+    assert pagination.get_seek(sort) == (
+        (("age", Order.desc), ("id", Order.desc)),
+        None,
+    )
+    cursor = pagination.get_next_cursor(items, sort)
+    assert pagination.get_next_cursor(items[:-1], sort) is None
+
+    fastapi_client = get_fastapi_client(Cursor.as_dependency())
+    response = fastapi_client.get("/", params={"cursor": cursor})
+    assert response.status_code == status.HTTP_200_OK
+
+    pagination = Cursor(cursor=cursor, limit=limit)
+    assert pagination.get_seek(sort) == (
+        (("age", Order.desc), ("id", Order.desc)),
+        (items[-1]["age"], items[-1]["id"]),
+    )
+    with pytest.raises(HTTPException) as error:
+        pagination.get_seek(Sort(sort_field="age", sort_order=Order.asc))
+    assert error.value.detail == "Курсор не соответствует сортировке."
+
+
+def test_cursor__wrong_cursor():
+    cursor = Cursor.encode_cursor([("id", Order.asc)], [1])
+    payload, signature = cursor.split(".")
+
+    class OtherCursor(CursorPagination):
+        SECRET_KEY = FuzzyText().fuzz()
+
+    fastapi_client = get_fastapi_client(Cursor.as_dependency())
+    for wrong_cursor in (
+        FuzzyText().fuzz(),
+        payload,
+        f"{payload}.{signature[::-1]}",
+        OtherCursor.encode_cursor([("id", Order.asc)], [1]),
+    ):
+        response = fastapi_client.get("/", params={"cursor": wrong_cursor})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_cursor__secret_key_required():
+    with pytest.raises(RuntimeError):
+        CursorPagination.encode_cursor([("id", Order.asc)], [1])
+
+
+def test_cursor__next_page():
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    items = [{"id": index, "age": index * 10} for index in range(3)]
+
+    pagination = CursorPagination(limit=3).get_next_page(items, sort)
+    assert type(pagination) is CursorPagination
+    assert pagination.limit == 3
+    assert pagination.get_seek(sort) == (
+        (("age", Order.asc), ("id", Order.asc)),
+        (20, 2),
+    )
+    assert pagination.get_next_page(items[:-1], sort) is None
+
+
+def test_cursor__null_sort_value():
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    items = [{"id": 1, "age": 10}, {"id": 2, "age": None}]
+    for get_next in (
+        CursorPagination(limit=2).get_next_page,
+        Cursor(limit=2).get_next_cursor,
+    ):
+        with pytest.raises(ValueError, match="age"):
+            get_next(items, sort)
+
+
+@pytest.mark.parametrize("backend", sorted(jsonlib.BACKENDS))
+def test_cursor__typed_values(backend):
+    values = (
+        datetime(2024, 5, 1, 12, 30, 15, 123456),
+        datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=3))),
+        date(2024, 5, 1),
+        time(12, 30),
+        timedelta(days=1, microseconds=5),
+        Decimal("1.10"),
+        UUID("12345678-1234-5678-1234-567812345678"),
+        "text",
+        7,
+        1.5,
+        None,
+    )
+    fields = tuple(
+        (f"field{index}", Order.asc) for index in range(len(values))
+    )
+    previous = jsonlib.BACKEND
+    try:
+        jsonlib.use_backend(backend)
+        cursor = Cursor.encode_cursor(fields, values)
+        decoded_fields, decoded_values = Cursor.decode_cursor(cursor)
+    finally:
+        jsonlib.use_backend(previous)
+    assert decoded_fields == fields
+    assert decoded_values == values
+    assert [type(value) for value in decoded_values] == [
+        type(value) for value in values
+    ]
+
+
+def test_cursor__wrong_typed_value():
+    payload = jsonlib.dumps(
+        [[["id", "asc"]], [{"$type": "datetime", "value": "yesterday"}]],
+    )
+    cursor = ".".join(
+        base64.urlsafe_b64encode(part).rstrip(b"=").decode("ascii")
+        for part in (payload, Cursor._sign(payload))
+    )
+    with pytest.raises(HTTPException) as error:
+        Cursor.decode_cursor(cursor)
+    assert error.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
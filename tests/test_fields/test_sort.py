@@ -1,7 +1,13 @@
+import json
+
+import pytest
 from factory.fuzzy import FuzzyInteger, FuzzyText, FuzzyChoice
-from fastapi import status
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.testclient import TestClient
 
 from src.fastapi_filter import (
+    IncludeField,
+    SimpleInclude,
     SimpleSort,
     SortField,
     Order,
@@ -26,6 +32,7 @@ def test_field():
     content = response.json()
     assert content.pop("field") == sort_fields.get(field).alias
     assert content.pop("order") == Order.asc
+    assert content.pop("fields") == [[sort_fields.get(field).alias, "asc"]]
     assert len(content) == 0
 
 
@@ -58,3 +65,144 @@ def test_wrong_order():
         params={"sortField": field, "sortOrder": FuzzyText().fuzz()},
     )
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_multiple_fields():
+    sort_fields = {
+        FuzzyText().fuzz(): SortField(alias=FuzzyText().fuzz())
+        for _ in range(3)
+    }
+    first, second, third = sort_fields
+    tiebreaker = FuzzyText().fuzz()
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = sort_fields
+        TIEBREAKER_FIELD = tiebreaker
+
+    fastapi_client = get_fastapi_client(Sort.as_dependency())
+    response = fastapi_client.get(
+        "/",
+        params={"sort": [f"{second}:desc", f"{third}:asc", f"{second}:asc"]},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json() == {
+        "field": sort_fields[second].alias,
+        "order": "desc",
+        "fields": [
+            [sort_fields[second].alias, "desc"],
+            [sort_fields[third].alias, "asc"],
+            [tiebreaker, "desc"],
+        ],
+    }
+
+    response = fastapi_client.get(
+        "/",
+        params={"sortField": first, "sort": [f"{third}:desc"]},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json()["fields"] == [
+        [sort_fields[first].alias, "asc"],
+        [sort_fields[third].alias, "desc"],
+        [tiebreaker, "asc"],
+    ]
+
+    response = fastapi_client.get("/")
+    assert response.status_code == status.HTTP_200_OK, response.json()
+    assert response.json() == {
+        "field": None,
+        "order": None,
+        "fields": [[tiebreaker, "asc"]],
+    }
+
+
+def test_multiple_fields__not_allowed():
+    sort_fields = {
+        FuzzyText().fuzz(): SortField(alias=FuzzyText().fuzz())
+        for _ in range(3)
+    }
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = sort_fields
+        MAX_SORT_FIELDS = 2
+
+    fastapi_client = get_fastapi_client(Sort.as_dependency())
+    for params in (
+        {"sort": [f"{field}:asc" for field in sort_fields]},
+        {"sort": [f"{FuzzyText().fuzz()}:asc"]},
+        {"sort": [f"{FuzzyChoice(sort_fields).fuzz()}:up"]},
+    ):
+        response = fastapi_client.get("/", params=params)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    with pytest.raises(HTTPException) as error:
+        Sort(sort_field=None, sort_order=None, sort=[
+            f"{field}:asc" for field in sort_fields
+        ])
+    assert error.value.detail == (
+        "Сортировка более чем по 2 полям не разрешена."
+    )
+
+    with pytest.raises(HTTPException) as error:
+        Sort(sort_field=None, sort_order=None, sort=["age:up"])
+    assert error.value.detail == "Неверный порядок сортировки 'up'."
+
+
+def test_openapi_enum():
+    sort_fields = {
+        FuzzyText().fuzz(): SortField(alias=FuzzyText().fuzz())
+        for _ in range(2)
+    }
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = sort_fields
+
+    fastapi_client = get_fastapi_client(Sort.as_dependency())
+    schema = json.dumps(fastapi_client.get("/openapi.json").json())
+    for field in sort_fields:
+        assert f'"{field}:asc"' in schema
+        assert f'"{field}:desc"' in schema
+
+
+def test_dependency_cache():
+    sort_fields = {FuzzyText().fuzz(): SortField(alias=FuzzyText().fuzz())}
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = sort_fields
+
+    class ChildSort(Sort):
+        pass
+
+    assert Sort.as_dependency() is Sort.as_dependency()
+    assert Sort._get_sort_fields_enum() is Sort._get_sort_fields_enum()
+    assert ChildSort.as_dependency() is not Sort.as_dependency()
+    assert ChildSort._get_sort_enum().__name__.startswith("ChildSortSort")
+
+
+def test_openapi_schema_names():
+
+    def get_sort():
+        class Sort(SimpleSort):
+            SORT_FIELDS = {
+                FuzzyText().fuzz(): SortField(alias=FuzzyText().fuzz()),
+            }
+        return Sort
+
+    class Include(SimpleInclude):
+        INCLUDE_FIELDS = {
+            FuzzyText().fuzz(): IncludeField(alias=FuzzyText().fuzz()),
+        }
+
+    app = FastAPI()
+    for index, sort in enumerate((get_sort(), get_sort())):
+
+        @app.get(f"/{index}")
+        def _(
+            sort=Depends(sort.as_dependency()),
+            include=Depends(Include.as_dependency()),
+        ):
+            return {}
+
+    schemas = TestClient(app).get("/openapi.json").json()
+    schemas = schemas["components"]["schemas"]
+    assert Include._get_include_fields_enum().__name__ in schemas
+    assert len([name for name in schemas if "SortFields" in name]) == 2
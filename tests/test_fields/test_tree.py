@@ -0,0 +1,157 @@
+import json
+from typing import List
+
+from factory.fuzzy import FuzzyText
+
+from src.fastapi_filter import FilterField, FilterOperator, SimpleFiltration
+from src.fastapi_filter.tree import (
+    FilterCondition,
+    FilterGroup,
+    build_tree,
+    canonical_tree,
+    optimize_tree,
+)
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "tags": FilterField(field_type=List[str]),
+    }
+
+
+def _get_tree(request_filters, optimize=True):
+    filters = Filters(filter_=json.dumps(request_filters))
+    return filters.as_tree(optimize=optimize)
+
+
+def test_build__precedence():
+    name = FuzzyText().fuzz()
+    tree = _get_tree(
+        [
+            ["name", "eq", name],
+            "and",
+            ["age", "gt", 5],
+            "or",
+            ["age", "lt", 3],
+        ],
+        optimize=False,
+    )
+    assert tree == FilterGroup("or", (
+        FilterGroup("and", (
+            FilterCondition("name", FilterOperator.eq, name),
+            FilterCondition("age", FilterOperator.gt, 5),
+        )),
+        FilterCondition("age", FilterOperator.lt, 3),
+    ))
+
+
+def test_build__empty():
+    assert build_tree([]) is None
+    assert Filters(filter_="[]").as_tree() is None
+
+
+def test_build__hashable():
+    tags = [FuzzyText().fuzz() for _ in range(3)]
+    tree = _get_tree(["tags", "contains_all", tags])
+    assert tree == FilterCondition(
+        "tags", FilterOperator.contains_all, tuple(tags),
+    )
+    assert hash(tree)
+
+
+def test_optimize__flatten_and_deduplicate():
+    name = FuzzyText().fuzz()
+    tree = _get_tree([
+        ["name", "eq", name],
+        "and",
+        [["age", "ne", 1], "and", ["name", "eq", name]],
+        "and",
+        [["age", "ne", 1]],
+    ])
+    assert tree == FilterGroup("and", (
+        FilterCondition("name", FilterOperator.eq, name),
+        FilterCondition("age", FilterOperator.ne, 1),
+    ))
+
+
+def test_optimize__merge_equalities():
+    names = [FuzzyText().fuzz() for _ in range(3)]
+    tree = _get_tree([
+        ["name", "eq", names[0]],
+        "or",
+        ["age", "gt", 10],
+        "or",
+        [["name", "eq", names[1]], "or", ["name", "eq", names[2]]],
+        "or",
+        ["name", "eq", names[0]],
+    ])
+    assert tree == FilterGroup("or", (
+        FilterCondition("name", FilterOperator.contains_any, tuple(names)),
+        FilterCondition("age", FilterOperator.gt, 10),
+    ))
+
+
+def test_optimize__merge_equalities__only_or():
+    tree = _get_tree([["age", "eq", 1], "and", ["age", "eq", 2]])
+    assert tree == FilterGroup("and", (
+        FilterCondition("age", FilterOperator.eq, 1),
+        FilterCondition("age", FilterOperator.eq, 2),
+    ))
+
+
+def test_optimize__fold_ranges():
+    tree = _get_tree([
+        ["age", "gt", 5],
+        "and",
+        ["age", "gt", 10],
+        "and",
+        ["age", "gte", 10],
+        "and",
+        ["age", "lte", 20],
+        "and",
+        ["age", "lt", 30],
+    ])
+    assert tree == FilterGroup("and", (
+        FilterCondition("age", FilterOperator.gt, 10),
+        FilterCondition("age", FilterOperator.lte, 20),
+    ))
+
+    tree = _get_tree([["age", "gt", 5], "or", ["age", "gte", 10]])
+    assert tree == FilterCondition("age", FilterOperator.gt, 5)
+
+
+def test_optimize__single_condition():
+    condition = FilterCondition("age", FilterOperator.eq, 1)
+    assert optimize_tree(condition) is condition
+    assert optimize_tree(None) is None
+
+
+def test_canonical():
+    first = _get_tree([
+        ["name", "eq", "a"], "or", [["age", "gt", 1], "and", ["age", "lt", 5]],
+    ], optimize=False)
+    second = _get_tree([
+        [["age", "lt", 5], "and", ["age", "gt", 1]], "or", ["name", "eq", "a"],
+    ], optimize=False)
+    assert first != second
+    assert canonical_tree(first) == canonical_tree(second)
+    assert canonical_tree(None) is None
+
+
+def test_deep_tree():
+    leaf = {"field_name": "age", "operator": "eq", "value": 0}
+    filters = leaf
+    for value in range(1, 2000):
+        condition = {"field_name": "age", "operator": "eq", "value": value}
+        filters = [condition, "and" if value % 2 else "or", filters]
+
+    tree = build_tree(filters)
+    for node in (tree, optimize_tree(tree), canonical_tree(tree)):
+        depth = 0
+        while isinstance(node, FilterGroup):
+            depth += 1
+            node = node.children[-1]
+        assert depth == 1999
+        assert node.value in (0, 1)
@@ -9,3 +9,19 @@ def get_fastapi_client(dependency) -> TestClient:
     def _(_=Depends(dependency)):
         return _
     return TestClient(app=app)
+
+
+class Timer:
+    """
+    Управляемый источник времени для тестов.
+
+    :param float step: Сдвиг времени при каждом вызове.
+    """
+
+    def __init__(self, step: float = 0.0):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
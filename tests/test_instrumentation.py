@@ -0,0 +1,166 @@
+import json
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+
+from src.fastapi_filter import (
+    FilterField,
+    FilterObserver,
+    PerfCounterObserver,
+    SimpleFiltration,
+)
+from tests.test_fields.utils import Timer
+
+FILTERS = [
+    [],
+    ["age", "gt", "1"],
+    [
+        ["age", "gt", 1],
+        "and",
+        [["name", "eq", "a"], "or", ["tags", "eq", [1]]],
+    ],
+]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+        "tags": FilterField(field_type=List[int]),
+    }
+
+
+def _get_observed(observer, **attributes):
+    return type("ObservedFilters", (Filters,), {
+        "OBSERVER": observer, **attributes,
+    })
+
+
+@pytest.mark.parametrize("request_filters", FILTERS)
+def test_observed__same_result(request_filters):
+    filter_ = json.dumps(request_filters)
+    observed = _get_observed(PerfCounterObserver())
+    assert observed(filter_=filter_).filters == Filters(filter_).filters
+
+
+def test_perf_counter_observer():
+    observer = PerfCounterObserver()
+    observer.timer = Timer(step=1.0)
+    observed = _get_observed(observer)
+    observed(filter_=json.dumps(FILTERS[2]))
+    observed(filter_=json.dumps(FILTERS[1]))
+
+    spans = observer.spans()
+    assert {phase for _, phase in spans} == {
+        "json_decode", "parse", "validate_field", "convert_value",
+    }
+    # Каждый вызов таймера сдвигает время на секунду: у трёх условий
+    # по одной секунде на проверку поля и на преобразование значения.
+    assert spans["ObservedFilters", "validate_field"].total == 4
+    assert spans["ObservedFilters", "convert_value"].max == 3
+    assert spans["ObservedFilters", "json_decode"].mean == 1
+    assert spans["ObservedFilters", "parse"].count == 2
+    assert observer.counts() == {
+        ("ObservedFilters", "leaves"): 4,
+        ("ObservedFilters", "depth"): 2,
+    }
+
+    observer.reset()
+    assert observer.spans() == observer.counts() == {}
+
+
+def test_observer__cache_and_errors():
+    observer = PerfCounterObserver()
+    observed = _get_observed(observer, FILTER_CACHE_SIZE=10)
+    for _ in range(3):
+        observed(filter_=json.dumps(FILTERS[1]))
+    with pytest.raises(HTTPException):
+        observed(filter_=json.dumps(["unknown", "eq", 1]))
+    with pytest.raises(HTTPException):
+        observed(filter_="[")
+
+    counts = observer.counts()
+    assert counts["ObservedFilters", "cache_hit"] == 2
+    assert counts["ObservedFilters", "cache_miss"] == 3
+    assert counts["ObservedFilters", "errors"] == 2
+    assert observer.spans()["ObservedFilters", "parse"].count == 1
+
+
+def test_observer__subclass_overrides():
+    class Lowercase(Filters):
+        def create_filter(self, filter_):
+            field, operator, value = filter_
+            return super().create_filter([field.lower(), operator, value])
+
+    observer = PerfCounterObserver()
+    observed = type("ObservedFilters", (Lowercase,), {"OBSERVER": observer})
+    filters = observed(filter_=json.dumps(["AGE", "gt", "1"])).filters
+    assert filters == Lowercase(json.dumps(["AGE", "gt", "1"])).filters
+    assert observer.spans()["ObservedFilters", "convert_value"].count == 1
+    assert observer.counts()["ObservedFilters", "leaves"] == 1
+
+
+def test_default_observer():
+    observer = FilterObserver()
+    observer.on_span(Filters, "parse", 1.0)
+    observer.on_count(Filters, "leaves", 1)
+    observed = _get_observed(observer)
+    assert observed(filter_=json.dumps(FILTERS[1])).filters["value"] == 1
+
+
+def test_config_errors():
+    assert _get_observed("observer").get_config_errors() == [
+        "OBSERVER должен быть экземпляром FilterObserver или None.",
+    ]
+
+
+class Instrument:
+    def __init__(self, name):
+        self.name = name
+        self.values = []
+
+    def record(self, value, attributes):
+        self.values.append((value, attributes))
+
+    add = record
+
+
+class Meter:
+    def __init__(self):
+        self.instruments = {}
+
+    def _create(self, name, **kwargs):
+        return self.instruments.setdefault(name, Instrument(name))
+
+    create_histogram = create_counter = _create
+
+
+def test_opentelemetry_observer():
+    pytest.importorskip("opentelemetry")
+    from src.fastapi_filter.otel import OpenTelemetryObserver
+
+    meter = Meter()
+    observed = _get_observed(OpenTelemetryObserver(meter))
+    observed(filter_=json.dumps(FILTERS[2]))
+    with pytest.raises(HTTPException):
+        observed(filter_="[")
+
+    instruments = meter.instruments
+    assert [
+        attributes["phase"]
+        for _, attributes in instruments[
+            "fastapi_filter.filter.duration"
+        ].values
+    ] == ["json_decode", "parse", "validate_field", "convert_value"]
+    assert instruments["fastapi_filter.filter.leaves"].values == [
+        (3, {"filtration": "ObservedFilters"}),
+    ]
+    assert instruments["fastapi_filter.filter.errors"].values == [
+        (1, {"filtration": "ObservedFilters"}),
+    ]
+
+    # Meter по умолчанию берётся из глобального MeterProvider.
+    default = OpenTelemetryObserver()
+    default.on_span(Filters, "parse", 1.0)
+    default.on_count(Filters, "errors")
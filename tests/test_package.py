@@ -0,0 +1,160 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.fastapi_filter import (
+    ConfigurationError,
+    CursorPagination,
+    FilterField,
+    FilterOperator,
+    IncludeField,
+    SimpleFiltration,
+    SimpleInclude,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+    validate_and_compile,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Собственное время импорта пакета без FastAPI — около миллисекунды;
+# запас оставлен на медленные машины CI.
+IMPORT_BUDGET_US = 50_000
+
+
+def test_import_time():
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime",
+            "-c", "import src.fastapi_filter",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+
+    assert "src.fastapi_filter" in modules
+    assert "fastapi" not in modules
+    assert "pydantic" not in modules
+    assert modules["src.fastapi_filter"] < IMPORT_BUDGET_US
+
+
+def test_lazy_exports():
+    import src.fastapi_filter as package
+
+    assert set(package.__all__) <= set(dir(package))
+    assert package.SimpleSort is SimpleSort
+    with pytest.raises(AttributeError):
+        package.Missing
+
+
+def test_validate_and_compile():
+
+    class Filtration(SimpleFiltration):
+        FILTER_FIELDS = {
+            "name": FilterField(field_type=str),
+        }
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = {"name": SortField(alias="name")}
+
+    class Search(SimpleSearch):
+        SEARCH_FIELDS = ["name"]
+
+    class Include(SimpleInclude):
+        INCLUDE_FIELDS = {"name": IncludeField(alias="name")}
+
+    class Cursor(CursorPagination):
+        SECRET_KEY = "secret"
+
+    classes = (Filtration, Sort, Search, Include, SimplePagination, Cursor)
+    validate_and_compile(*classes)
+    for cls in classes:
+        assert "_cached_as_dependency" in cls.__dict__
+
+
+def test_validate_and_compile__errors():
+
+    class Filtration(SimpleFiltration):
+        FILTER_FIELDS = {
+            "created": FilterField(field_type=bytes),
+            "name": FilterField(field_type=str, operators=["like"]),
+            "phone": "str",
+        }
+        LOGICAL_OPERATORS = {"and", "xor"}
+        MAX_DEPTH = -1
+
+    class Sort(SimpleSort):
+        SORT_FIELDS = {"name": "name"}
+        MAX_SORT_FIELDS = 0
+
+    class Search(SimpleSearch):
+        pass
+
+    class Pagination(SimplePagination):
+        LIMIT_DEFAULT = 200
+
+    class Cursor(CursorPagination):
+        TIEBREAKER_FIELD = None
+
+    with pytest.raises(ConfigurationError) as error:
+        validate_and_compile(Filtration, Sort, Search, Pagination, Cursor)
+
+    errors = error.value.errors
+    assert len(errors) == 11
+    assert all(
+        error.startswith(f"{__name__}.test_validate_and_compile__errors.")
+        for error in errors
+    )
+    assert "'created'" in str(error.value)
+    assert "_cached_as_dependency" not in Filtration.__dict__
+
+
+def test_validate_and_compile__abstract():
+
+    class BaseSearch(SimpleSearch):
+        ABSTRACT = True
+
+    class Search(BaseSearch):
+        SEARCH_FIELDS = ["name"]
+
+    class BaseCursor(CursorPagination):
+        ABSTRACT = True
+
+    validate_and_compile(BaseSearch, Search, BaseCursor)
+    assert "_cached_as_dependency" not in BaseSearch.__dict__
+    assert "_cached_as_dependency" in Search.__dict__
+    assert not Search.is_abstract()
+
+    class Cursor(BaseCursor):
+        pass
+
+    with pytest.raises(ConfigurationError):
+        validate_and_compile(Cursor)
+
+
+def test_validate_and_compile__recompiles_fields():
+
+    class Filtration(SimpleFiltration):
+        FILTER_FIELDS = {}
+
+    Filtration.FILTER_FIELDS = {"name": FilterField(field_type=str)}
+    validate_and_compile(Filtration)
+    filtration = Filtration(filter_='[["name", "eq", "a"]]')
+    assert filtration.filters == [{
+        "field_name": "name",
+        "operator": FilterOperator.eq,
+        "value": "a",
+    }]
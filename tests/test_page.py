@@ -0,0 +1,252 @@
+import asyncio
+import json
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.fastapi_filter import (
+    CountCache,
+    CursorPagination,
+    FilterField,
+    Order,
+    Page,
+    SimpleFiltration,
+    SimplePagination,
+    SimpleSearch,
+    SimpleSort,
+    SortField,
+    paginate,
+)
+from src.fastapi_filter.engines.python import PythonEngine
+from tests.test_fields.utils import Timer
+
+ROWS = [{"id": index, "age": 20 + index % 10} for index in range(25)]
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {"age": FilterField(field_type=int)}
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name"]
+
+
+class Cursor(CursorPagination):
+    SECRET_KEY = "secret"
+
+
+class Backend:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.counts = 0
+        self.estimates = 0
+
+    async def fetch_page(self, filtration, sort, pagination, search):
+        await asyncio.sleep(self.delay)
+        return list(PythonEngine().apply(
+            ROWS, filtration=filtration, sort=sort, pagination=pagination,
+        ))
+
+    async def count(self, filtration, search):
+        await asyncio.sleep(self.delay)
+        self.counts += 1
+        return sum(1 for _ in PythonEngine().apply(
+            ROWS, filtration=filtration,
+        ))
+
+    async def estimate(self, filtration, search):
+        self.estimates += 1
+        return 100
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+def test_paginate():
+    backend = Backend(delay=0.05)
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        page = await paginate(
+            backend.fetch_page,
+            backend.count,
+            filtration=_get_filter(["age", "gte", 25]),
+            sort=Sort(sort_field="age", sort_order=Order.desc),
+            pagination=SimplePagination(offset=2, limit=3),
+        )
+        return page, asyncio.get_running_loop().time() - started
+
+    page, elapsed = asyncio.run(run())
+    assert elapsed < 0.09
+    assert [item["age"] for item in page.items] == [28, 28, 27]
+    assert (page.total, page.total_is_estimate) == (10, False)
+    assert (page.offset, page.limit, page.next_cursor) == (2, 3, None)
+
+
+def test_paginate__without_count():
+    page = asyncio.run(paginate(Backend().fetch_page))
+    assert len(page.items) == len(ROWS)
+    assert page.total is None
+
+
+def test_paginate__cursor():
+    backend = Backend()
+    sort = Sort(sort_field="age", sort_order=Order.asc)
+    page = asyncio.run(paginate(
+        backend.fetch_page, backend.count,
+        sort=sort, pagination=Cursor(limit=10),
+    ))
+    assert page.total == len(ROWS)
+    assert page.offset is None
+    assert Cursor(cursor=page.next_cursor, limit=10).after[1] == (23, 3)
+
+
+def test_paginate__count_cache():
+    backend = Backend()
+    timer = Timer()
+    cache = CountCache(ttl=10, timer=timer)
+
+    async def run(request_filters, **kwargs):
+        return await paginate(
+            backend.fetch_page, backend.count,
+            filtration=_get_filter(request_filters),
+            count_cache=cache, **kwargs,
+        )
+
+    page = asyncio.run(run([["age", "gt", 25], "and", ["age", "lt", 28]]))
+    assert (page.total, backend.counts) == (4, 1)
+
+    page = asyncio.run(run(
+        [["age", "lt", 28], "and", ["age", "gt", 25], "and",
+         ["age", "gt", 24]],
+        pagination=SimplePagination(offset=5, limit=1),
+    ))
+    assert (page.total, backend.counts) == (4, 1)
+
+    timer.now = 11
+    page = asyncio.run(run([["age", "gt", 25], "and", ["age", "lt", 28]]))
+    assert (page.total, backend.counts) == (4, 2)
+    assert cache.info().hits == 2
+
+
+def test_paginate__estimate():
+    backend = Backend()
+    cache = CountCache()
+
+    async def run():
+        kwargs = dict(
+            filtration=_get_filter(["age", "eq", 20]),
+            count_cache=cache,
+            estimate=backend.estimate,
+        )
+        first = await paginate(backend.fetch_page, backend.count, **kwargs)
+        await asyncio.gather(*cache._tasks)
+        second = await paginate(backend.fetch_page, backend.count, **kwargs)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert (first.total, first.total_is_estimate) == (100, True)
+    assert (second.total, second.total_is_estimate) == (3, False)
+    assert (backend.estimates, backend.counts) == (1, 1)
+
+
+def test_paginate__estimate_refresh_error(caplog):
+    backend = Backend()
+    cache = CountCache()
+
+    async def count(filtration, search):
+        raise RuntimeError("database is gone")
+
+    async def run():
+        page = await paginate(
+            backend.fetch_page, count,
+            filtration=_get_filter(["age", "eq", 20]),
+            count_cache=cache,
+            estimate=backend.estimate,
+        )
+        await asyncio.gather(*cache._tasks)
+        return page
+
+    page = asyncio.run(run())
+    assert (page.total, page.total_is_estimate) == (100, True)
+    assert "Background count" in caplog.text
+    assert "database is gone" in caplog.text
+    assert not cache._refreshing
+
+
+def test_paginate__cancels_sibling_on_error():
+    cancelled = []
+
+    async def fetch_page(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def count(filtration, search):
+        raise RuntimeError("count failed")
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await paginate(fetch_page, count)
+        # Запрос страницы отменён до возврата ошибки, а не при
+        # остановке цикла событий.
+        return list(cancelled)
+
+    assert asyncio.run(run()) == [True]
+
+
+def test_paginate__key_error_before_fetch():
+    calls = []
+
+    class BrokenSearch(Search):
+        def get_cache_key(self):
+            raise NotImplementedError
+
+    def fetch_page(**kwargs):
+        calls.append(kwargs)
+        return Backend().fetch_page(**kwargs)
+
+    with pytest.raises(NotImplementedError):
+        asyncio.run(paginate(
+            fetch_page, Backend().count,
+            search=BrokenSearch(search=None),
+            count_cache=CountCache(),
+        ))
+    assert calls == []
+
+
+def test_response_model():
+    class Item(BaseModel):
+        id: int
+
+    app = FastAPI()
+    backend = Backend()
+
+    @app.get("/", response_model=Page[Item])
+    async def items(
+        pagination=SimplePagination.as_dependency(),
+    ):
+        return await paginate(
+            backend.fetch_page, backend.count,
+            pagination=SimplePagination(offset=0, limit=2),
+        )
+
+    response = TestClient(app).get("/")
+    assert response.json() == {
+        "items": [{"id": 0}, {"id": 1}],
+        "total": 25,
+        "total_is_estimate": False,
+        "offset": 0,
+        "limit": 2,
+        "next_cursor": None,
+    }
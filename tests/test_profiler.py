@@ -0,0 +1,149 @@
+import json
+import logging
+import random
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.fastapi_filter import (
+    FilterField,
+    FilterProfiler,
+    Order,
+    SimpleFiltration,
+    SimpleSort,
+    SortField,
+)
+from src.fastapi_filter.profiler import SpaceSaving, get_router, get_shape
+from tests.test_fields.utils import Timer
+
+
+class Filters(SimpleFiltration):
+    FILTER_FIELDS = {
+        "name": FilterField(field_type=str),
+        "age": FilterField(field_type=int),
+    }
+
+
+class Sort(SimpleSort):
+    SORT_FIELDS = {"age": SortField(alias="age")}
+
+
+def _get_filter(request_filters):
+    return Filters(filter_=json.dumps(request_filters))
+
+
+def test_get_shape():
+    first = _get_filter([
+        ["age", "gt", 20], "and", [["name", "eq", "a"], "or",
+                                   ["name", "eq", "b"]],
+    ])
+    second = _get_filter([["name", "eq", "c"], "and", ["age", "gt", 30]])
+    assert get_shape(first) == "((name eq ? or name eq ?) and age gt ?)"
+    assert get_shape(second) == "(age gt ? and name eq ?)"
+    assert get_shape(_get_filter(["age", "lt", 1])) == "age lt ?"
+    assert get_shape(_get_filter([])) == "*"
+    assert get_shape(
+        second, Sort(sort_field="age", sort_order=Order.desc),
+    ) == "(age gt ? and name eq ?) order by age desc"
+
+
+@pytest.mark.parametrize("variants", (
+    (
+        [["age", "gt", 5], "and", ["age", "gte", 10]],
+        [["age", "gt", 5], "and", ["age", "gte", 5]],
+    ),
+    (
+        [["age", "eq", 1], "and", ["age", "eq", 1]],
+        [["age", "eq", 1], "and", ["age", "eq", 2]],
+    ),
+    (
+        [["age", "eq", 1], "or", ["age", "eq", 2]],
+        [["age", "eq", 1], "or", ["age", "eq", 1]],
+    ),
+    (
+        [["age", "gt", 1], "and", [["name", "eq", "a"], "and",
+                                   ["age", "lt", 9]]],
+        [["age", "lt", 2], "and", ["age", "gt", 2], "and",
+         ["name", "eq", "b"]],
+    ),
+))
+def test_get_shape__values_only(variants):
+    first, second = (_get_filter(variant) for variant in variants)
+    assert get_shape(first) == get_shape(second)
+
+
+def test_space_saving():
+    generator = random.Random(0)
+    stream = [0] * 300 + [1] * 200 + [
+        generator.randrange(2, 1000) for _ in range(500)
+    ]
+    generator.shuffle(stream)
+    sketch = SpaceSaving(10)
+    for key in stream:
+        sketch.add(key)
+
+    assert len(sketch) == 10
+    top = sketch.top(2)
+    assert [hitter.key for hitter in top] == [0, 1]
+    for hitter, exact in zip(top, (300, 200)):
+        assert hitter.weight - hitter.error <= exact <= hitter.weight
+    assert sketch.total == len(stream)
+
+    with pytest.raises(ValueError):
+        SpaceSaving(0)
+
+
+def test_profiler(caplog):
+    timer = Timer()
+    profiler = FilterProfiler(capacity=5, slow_threshold=1.0, timer=timer)
+    fast = _get_filter(["name", "eq", "a"])
+    slow = _get_filter(["age", "gt", 1])
+
+    for value in range(3):
+        with profiler.measure(_get_filter(["name", "eq", str(value)])):
+            timer.now += 0.1
+    with caplog.at_level(logging.WARNING, logger="fastapi_filter"):
+        with pytest.raises(RuntimeError):
+            with profiler.measure(slow):
+                timer.now += 2.0
+                raise RuntimeError
+    assert profiler.record(0.5, fast) == "name eq ?"
+
+    assert [
+        (hitter.key, hitter.weight) for hitter in profiler.top_frequent()
+    ] == [("name eq ?", 4), ("age gt ?", 1)]
+    shape, seconds, _ = profiler.top_slow(1)[0]
+    assert (shape, seconds) == ("age gt ?", pytest.approx(2.0))
+    assert [record.args for record in caplog.records] == [
+        ("age gt ?", pytest.approx(2.0)),
+    ]
+
+    profiler.reset()
+    assert profiler.top_slow() == []
+
+
+def test_router():
+    profiler = FilterProfiler()
+    profiler.record(0.15, _get_filter(["age", "gt", 1]))
+    profiler.record(0.1, _get_filter(["name", "eq", "a"]))
+    profiler.record(0.1, _get_filter(["name", "eq", "b"]))
+    app = FastAPI()
+    app.include_router(get_router(profiler, prefix="/debug"))
+    client = TestClient(app)
+
+    content = client.get("/debug/filter-shapes").json()
+    assert content["order"] == "slow"
+    assert [shape["shape"] for shape in content["shapes"]] == [
+        "name eq ?", "age gt ?",
+    ]
+
+    content = client.get(
+        "/debug/filter-shapes", params={"order": "frequent", "limit": 1},
+    ).json()
+    assert content["total"] == 3
+    assert content["shapes"] == [
+        {"shape": "name eq ?", "weight": 2, "error": 0},
+    ]
+    response = client.get("/debug/filter-shapes", params={"order": "x"})
+    assert response.status_code == 422
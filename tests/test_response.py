@@ -0,0 +1,121 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.fastapi_filter import (
+    IncludeField,
+    IncludeResponse,
+    Page,
+    SimpleInclude,
+)
+from src.fastapi_filter.response import serialize_include
+
+
+class Player(BaseModel):
+    id: int
+    name: str
+    birthday: date
+
+
+class Team(BaseModel):
+    id: int
+    name: str
+    founded: date
+    players: List[Player]
+    captain: Optional[Player] = None
+
+
+class Include(SimpleInclude):
+    INCLUDE_FIELDS = {
+        "id": IncludeField(alias="id"),
+        "name": IncludeField(alias="name"),
+        "founded": IncludeField(alias="founded"),
+        "players": IncludeField(alias="players"),
+        "players__name": IncludeField(alias="players.name"),
+        "captain__birthday": IncludeField(alias="captain.birthday"),
+    }
+
+
+def _get_team(index, captain=True):
+    players = [
+        Player(id=player, name=f"player-{player}", birthday=date(2000, 1, 1))
+        for player in range(2)
+    ]
+    return Team(
+        id=index,
+        name=f"team-{index}",
+        founded=date(1900 + index, 1, 1),
+        players=players,
+        captain=players[0] if captain else None,
+    )
+
+
+def test_serialize_include():
+    teams = [_get_team(1), _get_team(2, captain=False)]
+    include = Include(fields={"id", "players__name", "captain__birthday"})
+    assert serialize_include(teams, include) == [
+        {
+            "id": 1,
+            "players": [{"name": "player-0"}, {"name": "player-1"}],
+            "captain": {"birthday": "2000-01-01"},
+        },
+        {
+            "id": 2,
+            "players": [{"name": "player-0"}, {"name": "player-1"}],
+        },
+    ]
+
+    include = Include(fields={"founded", "players", "players__name"})
+    assert serialize_include(teams[0].dict(), include) == {
+        "founded": "1901-01-01",
+        "players": [
+            {"id": 0, "name": "player-0", "birthday": "2000-01-01"},
+            {"id": 1, "name": "player-1", "birthday": "2000-01-01"},
+        ],
+    }
+
+
+def test_serialize_include__all_fields():
+    team = _get_team(1)
+    assert serialize_include(team, Include(fields=set())) == (
+        serialize_include(team)
+    )
+    assert serialize_include(team)["players"][0]["birthday"] == "2000-01-01"
+
+
+def test_serialize_include__page():
+    page = Page[Team](items=[_get_team(1)], total=1, offset=0, limit=10)
+    assert serialize_include(page, Include(fields={"name"})) == {
+        "items": [{"name": "team-1"}],
+        "total": 1,
+        "total_is_estimate": False,
+        "offset": 0,
+        "limit": 10,
+        "next_cursor": None,
+    }
+
+
+def test_include_response():
+    app = FastAPI()
+
+    @app.get("/teams", response_model=List[Team])
+    def get_teams(include: Include = Depends(Include.as_dependency())):
+        return IncludeResponse(
+            [_get_team(index) for index in range(3)], include=include,
+        )
+
+    client = TestClient(app)
+    response = client.get(
+        "/teams", params={"includeFields": ["id", "captain__birthday"]},
+    )
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [
+        {"id": index, "captain": {"birthday": "2000-01-01"}}
+        for index in range(3)
+    ]
+
+    response = client.get("/teams")
+    assert response.json()[0]["players"][1]["name"] == "player-1"
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from src.fastapi_filter import SimpleSearch
+from src.fastapi_filter.search_index import SearchIndex, _intersect
+
+
+class Search(SimpleSearch):
+    SEARCH_FIELDS = ["name", "team.title"]
+
+
+def _random_document(index):
+    def word():
+        return "".join(random.choices("abcdeABC", k=random.randint(1, 6)))
+
+    return {
+        "id": index,
+        "name": " ".join(word() for _ in range(random.randint(0, 3))),
+        "team": {"title": word()} if index % 3 else [
+            {"title": word()}, {"title": word()},
+        ],
+    }
+
+
+def _scan(documents, value):
+    value = value.casefold()
+    result = []
+    for document in documents:
+        team = document["team"]
+        titles = [
+            item["title"] for item in (team if isinstance(team, list)
+                                       else [team])
+        ]
+        if any(value in text.casefold() for text in [document["name"]]
+               + titles):
+            result.append(document["id"])
+    return result
+
+
+@pytest.mark.parametrize("ngram", (1, 2, 3))
+def test_search__substring(ngram):
+    random.seed(ngram)
+    documents = [_random_document(index) for index in range(300)]
+    index = SearchIndex.for_search(
+        Search,
+        ((document["id"], document) for document in documents),
+        ngram=ngram,
+    )
+    assert len(index) == len(documents)
+    for value in ["a", "B", "ab", "cA", "abc", "e a", "bad", "zz"] + [
+        "".join(random.choices("abcde", k=random.randint(1, 5)))
+        for _ in range(30)
+    ]:
+        assert index.search(Search(search=value)) == _scan(documents, value)
+
+
+def test_search__words():
+    index = SearchIndex(["name"], ngram=None)
+    index.add(1, {"name": "Red Dragons"})
+    index.add(2, {"name": "red foxes"})
+    index.add(3, {"name": "Blue dragons"})
+    assert index.search("red") == [1, 2]
+    assert index.search("dragons RED") == [1]
+    assert index.search("drag") == []
+    assert index.search(None) == [1, 2, 3]
+
+
+def test_add_remove():
+    index = SearchIndex(["name"])
+    index.add("a", {"name": "Alpha"})
+    index.add("b", {"name": "Alphabet"})
+    index.add("c", {"name": "Beta"})
+    assert index.search("alpha") == ["a", "b"]
+
+    index.remove("a")
+    index.remove("missing")
+    assert "a" not in index
+    assert index.search("alpha") == ["b"]
+
+    index.add("b", {"name": "Gamma"})
+    assert index.search("alpha") == []
+    assert index.search("ga") == ["b"]
+    assert index.search("") == ["c", "b"]
+
+    for key in ("b", "c"):
+        index.remove(key)
+    assert len(index) == 0
+    assert index._postings == {}
+
+
+def test_intersect():
+    assert _intersect([[1, 3, 5, 7], [3, 4, 5], [0, 3, 5, 9]]) == [3, 5]
+    assert _intersect([[1, 2], []]) == []
+
+
+def test_wrong_ngram():
+    with pytest.raises(ValueError):
+        SearchIndex(["name"], ngram=0)